@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todo_project.settings")
 
 application = get_asgi_application()
+
+# Periodic jobs, when TODO_SCHEDULER=1 (see todos.scheduler).
+from todos.scheduler import start_if_enabled  # noqa: E402
+
+start_if_enabled()
@@ -0,0 +1,270 @@
+"""
+Opt-in request instrumentation.
+
+InstrumentationMiddleware records per-request query count, SQL time,
+template render time and view time. It reports them in a Server-Timing
+header, aggregates them into histograms per view (served by
+metrics_view in Prometheus text format), and logs likely N+1 query
+patterns. The template time comes from the InstrumentedDjangoTemplates
+backend. Enable everything with TODO_METRICS=1 (see settings.py).
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_metrics", default=None)
+
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, float("inf"))
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"%s(?:\s*,\s*%s)+")
+
+
+def sql_shape(sql):
+    """Normalize SQL so queries differing only in parameters compare equal."""
+    sql = _LITERAL_RE.sub("?", sql)
+    return _PLACEHOLDER_LIST_RE.sub("%s", sql).replace("%s", "?")
+
+
+class RequestMetrics:
+    """Timings collected while handling one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_ms = 0.0
+        self.total_ms = 0.0
+        self.query_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.shapes = Counter()
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.sql_ms += duration * 1000
+        if not sql.startswith(
+            ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+        ):
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated_queries(self, threshold):
+        """Return (shape, count) pairs executed at least ``threshold`` times."""
+        return [
+            (shape, count) for shape, count in self.shapes.items() if count >= threshold
+        ]
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.sql_ms:.2f};desc="{self.query_count} queries"',
+                f'tpl;dur={self.template_ms:.2f};desc="templates"',
+                f'view;dur={self.view_ms:.2f};desc="view"',
+                f'total;dur={self.total_ms:.2f};desc="total"',
+            ]
+        )
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - start)
+
+
+def _install_query_wrapper(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class Histogram:
+    """A cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class MetricsRegistry:
+    """Histograms of request metrics keyed by (metric, view name)."""
+
+    METRICS = {
+        "request_duration_ms": BUCKETS_MS,
+        "view_duration_ms": BUCKETS_MS,
+        "sql_duration_ms": BUCKETS_MS,
+        "template_duration_ms": BUCKETS_MS,
+        "sql_queries": QUERY_BUCKETS,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, view_name, metrics):
+        values = {
+            "request_duration_ms": metrics.total_ms,
+            "view_duration_ms": metrics.view_ms,
+            "sql_duration_ms": metrics.sql_ms,
+            "template_duration_ms": metrics.template_ms,
+            "sql_queries": metrics.query_count,
+        }
+        with self._lock:
+            for name, value in values.items():
+                key = (name, view_name)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(self.METRICS[name])
+                self._histograms[key].observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """Return the histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in self.METRICS:
+                lines.append(f"# TYPE todo_{name} histogram")
+                for (metric, view_name), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    label = f'view="{view_name}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(
+                            f'todo_{name}_bucket{{{label},le="{le}"}} {cumulative}'
+                        )
+                    lines.append(f"todo_{name}_sum{{{label}}} {histogram.sum:.3f}")
+                    lines.append(f"todo_{name}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentationMiddleware:
+    """Collect per-request SQL, template and view timings. Place it first in MIDDLEWARE."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.n_plus_one_threshold = getattr(
+            settings, "TODO_METRICS_N_PLUS_ONE_THRESHOLD", 5
+        )
+        # Queries may run on any thread (async views use a thread pool), so
+        # every connection gets a wrapper that reports to the current request.
+        connection_created.connect(
+            _install_query_wrapper, dispatch_uid="todo_metrics_queries"
+        )
+        for connection in connections.all(initialized_only=True):
+            _install_query_wrapper(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    def _finish(self, request, response, metrics):
+        now = time.perf_counter()
+        metrics.total_ms = (now - metrics.started) * 1000
+        if metrics.view_started is not None:
+            metrics.view_ms = (now - metrics.view_started) * 1000
+        response["Server-Timing"] = metrics.server_timing()
+
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else "unresolved"
+        registry.observe(view_name, metrics)
+        for shape, count in metrics.repeated_queries(self.n_plus_one_threshold):
+            logger.warning(
+                "Possible N+1 query in %s: %d executions of %s", view_name, count, shape
+            )
+        return response
+
+
+class InstrumentedTemplate(Template):
+    """Backend template that adds its render time to the current request."""
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if metrics.template_depth == 0:
+                metrics.template_ms += (time.perf_counter() - start) * 1000
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose templates report their render time."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+def metrics_view(request):
+    """Serve the request histograms in the Prometheus text format."""
+    if not getattr(settings, "TODO_METRICS", False):
+        raise Http404("Metrics are disabled.")
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4")
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -70,13 +73,117 @@ TEMPLATES = [
 WSGI_APPLICATION = "todo_project.wsgi.application"
 
 
+# Deployment profile. TODO_ENV=production turns DEBUG off, reads the secret
+# key and allowed hosts from the environment, and lists the template loaders
+# explicitly so compiled templates are always kept in memory by the cached
+# loader (Django only does this implicitly while DEBUG is off).
+TODO_ENV = os.environ.get("TODO_ENV", "development")
+
+if TODO_ENV == "production":
+    DEBUG = False
+    try:
+        SECRET_KEY = os.environ["TODO_SECRET_KEY"]
+    except KeyError:
+        raise ImproperlyConfigured("TODO_ENV=production requires TODO_SECRET_KEY.")
+    ALLOWED_HOSTS = [
+        host.strip()
+        for host in os.environ.get("TODO_ALLOWED_HOSTS", "").split(",")
+        if host.strip()
+    ]
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        ),
+    ]
+elif TODO_ENV != "development":
+    raise ImproperlyConfigured(
+        f"TODO_ENV must be 'development' or 'production', got {TODO_ENV!r}."
+    )
+
+
+# Request instrumentation (todo_project.instrumentation), off by default.
+# TODO_METRICS=1 adds Server-Timing headers, per-view histograms at
+# /metrics/ and N+1 query warnings in the logs.
+TODO_METRICS = os.environ.get("TODO_METRICS", "") == "1"
+TODO_METRICS_N_PLUS_ONE_THRESHOLD = 5
+
+if TODO_METRICS:
+    MIDDLEWARE.insert(0, "todo_project.instrumentation.InstrumentationMiddleware")
+    TEMPLATES[0]["BACKEND"] = "todo_project.instrumentation.InstrumentedDjangoTemplates"
+
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# TODO_DB_ENGINE selects the profile: "sqlite" (default) or "postgresql",
+# so the same app can be benchmarked on both.
+
+TODO_DB_ENGINE = os.environ.get("TODO_DB_ENGINE", "sqlite")
+
+if TODO_DB_ENGINE == "postgresql":
+    # Requires psycopg with the pool extra: pip install "psycopg[binary,pool]".
+    # Pooled connections replace persistent ones, so CONN_MAX_AGE stays 0.
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "todos"),
+            "USER": os.environ.get("POSTGRES_USER", "todos"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "10")),
+                    "timeout": 10,
+                },
+            },
+        }
+    }
+elif TODO_DB_ENGINE == "sqlite":
+    # WAL lets readers run alongside a writer, and IMMEDIATE transactions
+    # take the write lock up front so concurrent writers wait for the busy
+    # timeout instead of failing with "database is locked".
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": int(os.environ.get("TODO_CONN_MAX_AGE", "600")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "timeout": 20,
+                "transaction_mode": "IMMEDIATE",
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA mmap_size=134217728;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                ),
+            },
+            # A file-backed test database lets tests use several connections
+            # at once (the in-memory default is single-connection).
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+        }
+    }
+else:
+    raise ImproperlyConfigured(
+        f"TODO_DB_ENGINE must be 'sqlite' or 'postgresql', got {TODO_DB_ENGINE!r}."
+    )
+
 
-DATABASES = {
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "todos",
     }
 }
 
@@ -121,3 +228,57 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Todos app
+
+# How the task list dashboard computes its statistics:
+# "aggregate" runs one conditional-aggregate query per page load,
+# "counter" reads a denormalized TaskCounter row kept up to date by signals
+# (run `manage.py rebuild_task_counters` after enabling it on existing data).
+TODOS_STATS_BACKEND = "aggregate"
+
+# Default and maximum number of tasks per page of the task list.
+TODOS_PAGE_SIZE = 20
+TODOS_MAX_PAGE_SIZE = 100
+
+# Maximum number of items accepted by one call to the bulk API endpoints.
+TODOS_API_MAX_BULK_ITEMS = 10000
+
+# Rows fetched per database round trip (and per streamed chunk) by the
+# export endpoint and the export_tasks command.
+TODOS_EXPORT_CHUNK_SIZE = 2000
+
+# Cache alias and lifetime (in seconds) of rendered task list pages. Entries
+# are also invalidated whenever a task is written.
+TODOS_CACHE_ALIAS = "default"
+TODOS_LIST_CACHE_TIMEOUT = 300
+
+# Lifetime (in seconds) of rendered task cards. Cards are keyed by the
+# task's updated_at, so they outlive list page invalidations.
+TODOS_CARD_CACHE_TIMEOUT = 3600
+
+# Task admin changelist: counts above this many rows are estimated rather
+# than counted, and the date hierarchy links are cached for this many seconds.
+TODOS_ADMIN_EXACT_COUNT_LIMIT = 10000
+TODOS_ADMIN_DATE_HIERARCHY_TIMEOUT = 600
+
+# Periodic jobs (todos.jobs) are run by `manage.py run_scheduler`, or by a
+# thread that wsgi.py/asgi.py start inside each web process when
+# TODO_SCHEDULER=1. The overdue check reports tasks whose due date passed
+# since its previous run, in batches.
+TODOS_SCHEDULER_IN_PROCESS = os.environ.get("TODO_SCHEDULER", "") == "1"
+TODOS_OVERDUE_CHECK_INTERVAL = 60
+TODOS_OVERDUE_BATCH_SIZE = 500
+
+# Resolved tasks not updated for this many days are moved to the
+# ArchivedTask table (shown under the "Archived" filter) by the
+# archive_resolved job every TODOS_ARCHIVE_INTERVAL seconds, or on demand
+# with `manage.py archive_tasks`.
+TODOS_ARCHIVE_AFTER_DAYS = 90
+TODOS_ARCHIVE_BATCH_SIZE = 1000
+TODOS_ARCHIVE_INTERVAL = 3600
+
+# Serve the todos pages with the async views (todos.async_views). Enable this
+# when running under an ASGI server, e.g. `uvicorn todo_project.asgi:application`.
+TODOS_ASYNC_VIEWS = os.environ.get("TODO_ASYNC_VIEWS", "") == "1"
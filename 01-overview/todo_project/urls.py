@@ -15,10 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from .instrumentation import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", include("todos.urls")),
+    path("metrics/", metrics_view, name="metrics"),
+    path("", include("todos.async_urls" if settings.TODOS_ASYNC_VIEWS else "todos.urls")),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todo_project.settings")
 
 application = get_wsgi_application()
+
+# Periodic jobs, when TODO_SCHEDULER=1 (see todos.scheduler).
+from todos.scheduler import start_if_enabled  # noqa: E402
+
+start_if_enabled()
@@ -1,5 +1,136 @@
-from django.contrib import admin
-from .models import Task
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.utils import DatabaseError
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+from .bulk import bulk_delete_tasks, bulk_set_resolved
+from .models import ArchivedTask, Task, TaskCounter
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import search_tasks
+from .stats import get_stats_backend
+
+CURSOR_VAR = 'cursor'
+
+
+def table_row_estimate(model, using):
+    """
+    Return the planner's estimate of the rows in ``model``'s table, or None.
+
+    Reads pg_class on PostgreSQL and sqlite_stat1 (written by ANALYZE) on
+    SQLite; both are instant but only as fresh as the last statistics run.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids a full COUNT(*) on large tables.
+
+    When ``estimate`` is set, counts are exact up to
+    TODOS_ADMIN_EXACT_COUNT_LIMIT rows. Beyond that, the unfiltered table
+    size comes from the task counters or the database statistics, and
+    filtered counts are reported as the limit itself; ``count_is_estimate``
+    is set in both cases. Only cursor pages may use an estimate: numbered
+    pages past an estimated count could not be reached.
+    """
+    estimate = False
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not self.estimate:
+            return super().count
+        limit = getattr(settings, 'TODOS_ADMIN_EXACT_COUNT_LIMIT', 10000)
+        queryset = self.object_list
+        counted = queryset.order_by()[:limit + 1].count()
+        if counted <= limit:
+            return counted
+        self.count_is_estimate = True
+        if not queryset.query.where:
+            estimate = self._table_estimate(queryset)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return limit
+
+    @staticmethod
+    def _table_estimate(queryset):
+        if queryset.model is Task and get_stats_backend() == 'counter':
+            return TaskCounter.get_counts()['total']
+        return table_row_estimate(queryset.model, queryset.db)
+
+
+class TaskChangeList(ChangeList):
+    """
+    Changelist that pages the default newest-first ordering with cursors.
+
+    A ``?cursor=`` token replaces the page number, so deep pages do not
+    need an OFFSET scan. Sorting by a column falls back to numbered pages.
+    """
+    keyset_page = None
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        if ORDER_VAR in self.params or self.show_all:
+            super().get_results(request)
+        else:
+            self._get_keyset_results(request)
+        # Filter and sort links must start again from the first page.
+        self.params.pop(CURSOR_VAR, None)
+        self.count_is_estimate = self.paginator.count_is_estimate
+
+    def _get_keyset_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        # The count is only displayed here, never used to address a page.
+        paginator.estimate = True
+        try:
+            page = KeysetPaginator(
+                self.queryset.only('id', 'created_at'), self.list_per_page
+            ).get_page(request.GET.get(CURSOR_VAR, ''))
+        except InvalidCursor:
+            raise IncorrectLookupParameters
+        self.keyset_page = page
+        # list_editable needs a queryset, so the page is reloaded by primary key.
+        self.result_list = self.queryset.filter(pk__in=[task.pk for task in page])
+        self.result_count = paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = page.has_next or page.has_previous
+        self.paginator = paginator
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.keyset_page.next_cursor})
+
+    @property
+    def previous_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.keyset_page.previous_cursor})
 
 
 @admin.register(Task)
@@ -10,6 +141,12 @@ class TaskAdmin(admin.ModelAdmin):
     list_editable = ['is_resolved']
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
+    # Counting every row (for "N total" and facet counts) is the slowest
+    # part of the changelist on large tables.
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    paginator = EstimatedCountPaginator
+    actions = ['resolve_selected', 'reopen_selected', 'delete_selected_tasks']
     
     fieldsets = (
         ('Task Information', {
@@ -26,3 +163,60 @@ class TaskAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at', 'updated_at']
 
+    def get_changelist(self, request, **kwargs):
+        return TaskChangeList
+
+    def get_actions(self, request):
+        # The built-in action loads and deletes the selected tasks one by one.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search with the full-text index instead of LIKE scans over search_fields."""
+        if not search_term.strip():
+            return queryset, False
+        return search_tasks(queryset, search_term), False
+
+    @admin.action(description="Mark selected tasks as resolved", permissions=['change'])
+    def resolve_selected(self, request, queryset):
+        count = bulk_set_resolved(queryset, True)
+        self.message_user(request, f"{count} task(s) marked as resolved.", messages.SUCCESS)
+
+    @admin.action(description="Reopen selected tasks", permissions=['change'])
+    def reopen_selected(self, request, queryset):
+        count = bulk_set_resolved(queryset, False)
+        self.message_user(request, f"{count} task(s) reopened.", messages.SUCCESS)
+
+    @admin.action(description="Delete selected tasks", permissions=['delete'])
+    def delete_selected_tasks(self, request, queryset):
+        """Delete with one DELETE statement after confirming the number of tasks."""
+        if request.POST.get('post') != 'yes':
+            return TemplateResponse(request, 'admin/todos/task/delete_selected_confirmation.html', {
+                **self.admin_site.each_context(request),
+                'title': "Delete selected tasks",
+                'opts': self.model._meta,
+                'count': queryset.count(),
+                'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+                'select_across': request.POST.get('select_across', '0'),
+                'action_checkbox_name': ACTION_CHECKBOX_NAME,
+            })
+        count = bulk_delete_tasks(queryset)
+        self.message_user(request, f"{count} task(s) deleted.", messages.SUCCESS)
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ['title', 'due_date', 'created_at', 'updated_at', 'archived_at']
+    search_fields = ['title']
+    ordering = ['-created_at']
+    readonly_fields = [
+        'id', 'title', 'description', 'due_date', 'is_resolved',
+        'created_at', 'updated_at', 'archived_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,31 @@
+"""Conversion between Task instances and JSON-compatible dicts."""
+
+from django.forms.models import model_to_dict
+
+from ..forms import TaskForm
+
+
+def task_to_dict(task):
+    """Serialize a task for API responses."""
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'description': task.description,
+        'due_date': task.due_date.isoformat() if task.due_date else None,
+        'is_resolved': task.is_resolved,
+        'is_overdue': task.is_overdue(),
+        'created_at': task.created_at.isoformat(),
+        'updated_at': task.updated_at.isoformat(),
+    }
+
+
+def validate_task(data, instance=None):
+    """
+    Validate task data with the TaskForm rules.
+
+    When ``instance`` is given, fields missing from ``data`` keep their
+    current values, so partial updates are possible. Returns the bound form.
+    """
+    if instance is not None:
+        data = {**model_to_dict(instance, fields=TaskForm._meta.fields), **data}
+    return TaskForm(data=data, instance=instance)
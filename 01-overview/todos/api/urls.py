@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('tasks/', views.task_list, name='task_list'),
+    path('tasks/bulk/', views.task_bulk, name='task_bulk'),
+    path('tasks/<int:pk>/', views.task_detail, name='task_detail'),
+]
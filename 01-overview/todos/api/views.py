@@ -0,0 +1,221 @@
+"""JSON API views for tasks.
+
+The app has no user accounts, so the API is exempt from CSRF checks like
+any other token-less JSON endpoint would be. Request bodies must be sent as
+``application/json``: browsers only send that content type cross-site after
+a CORS preflight, so other sites cannot write tasks with a simple form POST.
+"""
+
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from ..bulk import bulk_create_tasks, bulk_delete_tasks, bulk_update_tasks
+from ..models import Task
+from ..pagination import InvalidCursor, KeysetPage, KeysetPaginator, get_page_size
+from ..search import ranked_search
+from .serializers import task_to_dict, validate_task
+
+
+def _error(message, status=400, **extra):
+    return JsonResponse({'error': message, **extra}, status=status)
+
+
+def _is_id(value):
+    """Return True for integer ids (booleans are not ids)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _require_json(view):
+    """Reject requests with a body that is not ``application/json`` with 415."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.body and request.content_type != 'application/json':
+            return _error("Request body must be application/json.", status=415)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def _parse_body(request):
+    """Decode the JSON request body, raising ValueError on malformed input."""
+    try:
+        return json.loads(request.body or b'null')
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Malformed JSON: {exc}") from exc
+
+
+def _parse_items(request):
+    """Decode a JSON array of objects for the bulk endpoints."""
+    items = _parse_body(request)
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ValueError("Expected a JSON array of objects.")
+    max_items = getattr(settings, 'TODOS_API_MAX_BULK_ITEMS', 10000)
+    if len(items) > max_items:
+        raise ValueError(f"At most {max_items} items can be sent in one request.")
+    return items
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+@_require_json
+def task_list(request):
+    """
+    List tasks newest first with cursor pagination, or create one task.
+
+    With a ``q`` parameter, the best-ranked page of search results is
+    returned instead.
+    """
+    if request.method == 'POST':
+        try:
+            data = _parse_body(request)
+        except ValueError as exc:
+            return _error(str(exc))
+        if not isinstance(data, dict):
+            return _error("Expected a JSON object.")
+        form = validate_task(data)
+        if not form.is_valid():
+            return _error("Validation failed.", errors=form.errors.get_json_data())
+        task = form.save()
+        return JsonResponse(task_to_dict(task), status=201)
+    
+    tasks = Task.objects.for_filter(request.GET.get('filter', 'all'))
+    page_size = get_page_size(request.GET.get('page_size'))
+    search_query = request.GET.get('q', '').strip()
+    if search_query:
+        page = KeysetPage(ranked_search(tasks, search_query, page_size), page_size)
+    else:
+        try:
+            page = KeysetPaginator(tasks, page_size).get_page(request.GET.get('cursor'))
+        except InvalidCursor as exc:
+            return _error(str(exc))
+    return JsonResponse({
+        'results': [task_to_dict(task) for task in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'PATCH', 'DELETE'])
+@_require_json
+def task_detail(request, pk):
+    """Retrieve, partially update or delete a single task."""
+    task = get_object_or_404(Task, pk=pk)
+    
+    if request.method == 'PATCH':
+        try:
+            data = _parse_body(request)
+        except ValueError as exc:
+            return _error(str(exc))
+        if not isinstance(data, dict):
+            return _error("Expected a JSON object.")
+        form = validate_task(data, instance=task)
+        if not form.is_valid():
+            return _error("Validation failed.", errors=form.errors.get_json_data())
+        # Only write the fields that were sent.
+        fields = [field for field in data if field in form.fields]
+        task = form.save(commit=False)
+        if fields:
+            task.save(update_fields=fields + ['updated_at'])
+    elif request.method == 'DELETE':
+        task.delete()
+        return HttpResponse(status=204)
+    
+    return JsonResponse(task_to_dict(task))
+
+
+@csrf_exempt
+@require_http_methods(['POST', 'PATCH', 'DELETE'])
+@_require_json
+def task_bulk(request):
+    """
+    Create, update or delete many tasks in one request.
+
+    - POST: an array of task objects to create.
+    - PATCH: an array of objects with an "id" and the fields to change.
+    - DELETE: an object {"ids": [...]} or an array of ids.
+
+    Every item is validated before anything is written; if any item fails,
+    nothing is changed and the per-item errors are returned.
+    """
+    if request.method == 'DELETE':
+        return _bulk_delete(request)
+    
+    try:
+        items = _parse_items(request)
+    except ValueError as exc:
+        return _error(str(exc))
+    if request.method == 'POST':
+        return _bulk_create(items)
+    return _bulk_update(items)
+
+
+def _bulk_create(items):
+    tasks = []
+    errors = []
+    for index, item in enumerate(items):
+        form = validate_task(item)
+        if form.is_valid():
+            tasks.append(form.save(commit=False))
+        else:
+            errors.append({'index': index, 'errors': form.errors.get_json_data()})
+    if errors:
+        return _error("Validation failed.", errors=errors)
+    
+    created = bulk_create_tasks(tasks)
+    return JsonResponse({'created': len(created), 'ids': [task.pk for task in created]}, status=201)
+
+
+def _bulk_update(items):
+    ids = [item.get('id') for item in items]
+    if not all(_is_id(pk) for pk in ids):
+        return _error('Every item needs an integer "id".')
+    if len(set(ids)) != len(ids):
+        return _error("Each task can only appear once per request.")
+    
+    existing = Task.objects.in_bulk(ids)
+    missing = [pk for pk in ids if pk not in existing]
+    if missing:
+        return _error("Some tasks do not exist.", missing=missing, status=404)
+    
+    previous_resolved = {pk: task.is_resolved for pk, task in existing.items()}
+    # Tasks are grouped by the fields they were sent with, so no task has
+    # its other columns written back from the values read above.
+    groups = {}
+    errors = []
+    for index, item in enumerate(items):
+        changes = {key: value for key, value in item.items() if key != 'id'}
+        form = validate_task(changes, instance=existing[item['id']])
+        if form.is_valid():
+            fields = tuple(sorted(field for field in changes if field in form.fields))
+            groups.setdefault(fields, []).append(form.save(commit=False))
+        else:
+            errors.append({'index': index, 'errors': form.errors.get_json_data()})
+    if errors:
+        return _error("Validation failed.", errors=errors)
+    
+    updated = 0
+    with transaction.atomic():
+        for fields, tasks in groups.items():
+            if fields:
+                updated += bulk_update_tasks(tasks, fields, previous_resolved)
+    return JsonResponse({'updated': updated})
+
+
+def _bulk_delete(request):
+    try:
+        data = _parse_body(request)
+    except ValueError as exc:
+        return _error(str(exc))
+    ids = data.get('ids') if isinstance(data, dict) else data
+    if not isinstance(ids, list) or not all(_is_id(pk) for pk in ids):
+        return _error('Expected {"ids": [...]} with integer ids.')
+    
+    deleted = bulk_delete_tasks(Task.objects.filter(pk__in=ids))
+    return JsonResponse({'deleted': deleted})
@@ -0,0 +1,16 @@
+"""URL patterns routing the todos app to its async views (see TODOS_ASYNC_VIEWS)."""
+
+from django.urls import include, path
+from . import async_views
+
+app_name = 'todos'
+
+urlpatterns = [
+    path('', async_views.task_list, name='task_list'),
+    path('create/', async_views.task_create, name='task_create'),
+    path('<int:pk>/edit/', async_views.task_edit, name='task_edit'),
+    path('<int:pk>/delete/', async_views.task_delete, name='task_delete'),
+    path('<int:pk>/toggle/', async_views.task_toggle_resolved, name='task_toggle_resolved'),
+    path('export/', async_views.task_export, name='task_export'),
+    path('api/', include('todos.api.urls')),
+]
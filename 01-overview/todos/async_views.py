@@ -0,0 +1,156 @@
+"""Async versions of the task views for ASGI deployments.
+
+These mirror ``todos.views`` but use Django's async ORM, so under an ASGI
+server a worker can serve many concurrent slow clients without a thread
+per request. Select them with the TODOS_ASYNC_VIEWS setting.
+"""
+
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .bulk import toggle_resolved
+from .caching import (
+    afragment_timeout, aget_last_modified, aget_list_version, aget_overdue_boundary,
+    get_cache, list_cache_key
+)
+from .forms import TaskForm
+from .models import Task
+from .pagination import InvalidCursor, KeysetPage, KeysetPaginator
+from .search import ranked_search
+from .stats import aget_task_stats
+from .transfer import astream_export
+from .views import (
+    _export_params, _export_response, _format_validators, _list_params, _list_rows,
+    _render_list_fragment
+)
+
+
+async def _task_list_validators(request, version):
+    if len(messages.get_messages(request)):
+        return None, None
+    return _format_validators(
+        version.token, await aget_overdue_boundary(), await aget_last_modified(version)
+    )
+
+
+async def task_list(request):
+    """Display a page of tasks, newest first, using cursor pagination."""
+    version = await aget_list_version()
+    etag, last_modified = await _task_list_validators(request, version)
+    last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+    
+    filter_type, search_query, cursor, page_size = _list_params(request)
+    cache = get_cache()
+    cache_key = list_cache_key(version.token, filter_type, search_query, cursor, page_size)
+    cached = await cache.aget(cache_key)
+    if cached is None:
+        now = timezone.now()
+        tasks = _list_rows(filter_type, now)
+        if search_query:
+            results = await sync_to_async(ranked_search)(tasks, search_query, page_size)
+            page = KeysetPage(results, page_size)
+        else:
+            try:
+                page = await KeysetPaginator(tasks, page_size).aget_page(cursor)
+            except InvalidCursor:
+                raise Http404("Invalid page cursor.")
+        
+        stats = await aget_task_stats(now)
+        # Template rendering is synchronous CPU work (and reads the card
+        # cache), so it runs in a worker thread instead of on the event loop.
+        cached = await sync_to_async(_render_list_fragment)(
+            page, filter_type, search_query, stats
+        )
+        await cache.aset(cache_key, cached, await afragment_timeout(now))
+    
+    context = {**cached['context'], 'task_list_html': cached['html']}
+    response = await sync_to_async(render)(request, 'todos/home.html', context)
+    if etag:
+        response.headers.setdefault('ETag', etag)
+    if last_modified:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
+
+
+async def task_create(request):
+    """Create a new task."""
+    if request.method == 'POST':
+        form = TaskForm(request.POST)
+        if form.is_valid():
+            task = form.save(commit=False)
+            await task.asave()
+            messages.success(request, f'Task "{task.title}" created successfully!')
+            return redirect('todos:task_list')
+    else:
+        form = TaskForm()
+    
+    return await sync_to_async(render)(request, 'todos/task_form.html', {
+        'form': form,
+        'title': 'Create New Task'
+    })
+
+
+async def task_edit(request, pk):
+    """Edit an existing task."""
+    task = await aget_object_or_404(Task, pk=pk)
+    
+    if request.method == 'POST':
+        form = TaskForm(request.POST, instance=task)
+        if form.is_valid():
+            task = form.save(commit=False)
+            if form.changed_data:
+                # Only write the columns the user actually changed.
+                await task.asave(update_fields=[*form.changed_data, 'updated_at'])
+            messages.success(request, f'Task "{task.title}" updated successfully!')
+            return redirect('todos:task_list')
+    else:
+        form = TaskForm(instance=task)
+    
+    return await sync_to_async(render)(request, 'todos/task_form.html', {
+        'form': form,
+        'task': task,
+        'title': 'Edit Task'
+    })
+
+
+async def task_delete(request, pk):
+    """Delete a task."""
+    task = await aget_object_or_404(Task, pk=pk)
+    
+    if request.method == 'POST':
+        task_title = task.title
+        await task.adelete()
+        messages.success(request, f'Task "{task_title}" deleted successfully!')
+        return redirect('todos:task_list')
+    
+    return await sync_to_async(render)(request, 'todos/task_confirm_delete.html', {'task': task})
+
+
+async def task_toggle_resolved(request, pk):
+    """Toggle the resolved status of a task."""
+    # The toggle runs in a transaction together with the signal receivers,
+    # which have no async API, so it runs in the ORM's thread.
+    result = await sync_to_async(toggle_resolved)(pk)
+    if result is None:
+        raise Http404("No Task matches the given query.")
+    title, is_resolved = result
+    
+    status = 'completed' if is_resolved else 'reopened'
+    messages.success(request, f'Task "{title}" marked as {status}!')
+    return redirect('todos:task_list')
+
+
+async def task_export(request):
+    """Stream all tasks (optionally filtered) as CSV or NDJSON."""
+    format_name, fmt, tasks = _export_params(request)
+    return _export_response(astream_export(tasks, format_name), fmt)
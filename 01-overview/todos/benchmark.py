@@ -0,0 +1,228 @@
+"""Benchmark scenarios for the todos app.
+
+Each scenario issues one request through the Django test client against
+whatever data is in the current database and is measured for latency,
+query count and peak Python memory. Use the ``benchmark_todos``
+management command to run them at several table sizes.
+"""
+
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .caching import get_cache
+from .models import Task
+from .pagination import NEXT, encode_cursor
+from .views import _render_task_cards
+
+SCENARIOS = {}
+
+# Rows loaded by the projection scenarios, the largest page the list allows.
+LIST_PAGE_SIZE = 100
+
+
+@dataclass
+class Scenario:
+    """A named benchmark; ``run`` takes a BenchmarkContext and returns a response."""
+    name: str
+    run: object
+    description: str = ''
+    clear_cache: bool = True
+
+
+def scenario(name, description='', clear_cache=True):
+    """Register a function as a benchmark scenario."""
+    def decorator(func):
+        SCENARIOS[name] = Scenario(name, func, description, clear_cache)
+        return func
+    return decorator
+
+
+@dataclass
+class FetchResult:
+    """Result of a scenario that reads the database without a request."""
+    fetched_bytes: int
+    status_code: int = 200
+
+
+def _text_bytes(objects, fields):
+    """Return the UTF-8 size of the given text attributes across ``objects``."""
+    return sum(
+        len(value.encode()) for obj in objects for name in fields
+        if (value := getattr(obj, name)) is not None
+    )
+
+
+@dataclass
+class BenchmarkContext:
+    """Clients and precomputed values shared by the scenarios."""
+    client: Client
+    admin_client: Client
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def create(cls):
+        admin_client = Client()
+        user, _ = get_user_model().objects.get_or_create(
+            username='benchmark-admin', defaults={'is_staff': True, 'is_superuser': True}
+        )
+        admin_client.force_login(user)
+        context = cls(client=Client(), admin_client=admin_client)
+        # A cursor in the middle of the table, for the deep-page scenario.
+        middle = (
+            Task.objects.order_by('-created_at', '-id')
+            .values_list('created_at', 'pk')[Task.objects.count() // 2:][:1]
+        )
+        context.extra['deep_cursor'] = encode_cursor(NEXT, *middle[0]) if middle else ''
+        return context
+
+
+@scenario('task_list', "First page of the task list, all tasks.")
+def _task_list(context):
+    return context.client.get(reverse('todos:task_list'))
+
+
+@scenario('task_list_cached', "Task list served from the fragment cache.", clear_cache=False)
+def _task_list_cached(context):
+    return context.client.get(reverse('todos:task_list'))
+
+
+@scenario('task_list_active', "First page of active tasks.")
+def _task_list_active(context):
+    return context.client.get(reverse('todos:task_list'), {'filter': 'active'})
+
+
+@scenario('task_list_overdue', "First page of overdue tasks.")
+def _task_list_overdue(context):
+    return context.client.get(reverse('todos:task_list'), {'filter': 'overdue'})
+
+
+@scenario('task_list_deep_page', "A page from the middle of the task list.")
+def _task_list_deep_page(context):
+    return context.client.get(reverse('todos:task_list'), {'cursor': context.extra['deep_cursor']})
+
+
+@scenario('task_list_search', "Full-text search from the task list.")
+def _task_list_search(context):
+    return context.client.get(reverse('todos:task_list'), {'q': 'invoice quarterly'})
+
+
+@scenario('api_task_list', "First page of the JSON API task list.")
+def _api_task_list(context):
+    return context.client.get(reverse('todos:api:task_list'))
+
+
+@scenario('admin_changelist', "Admin task changelist.")
+def _admin_changelist(context):
+    return context.admin_client.get(reverse('admin:todos_task_changelist'))
+
+
+@scenario('admin_search', "Admin task changelist search.")
+def _admin_search(context):
+    return context.admin_client.get(reverse('admin:todos_task_changelist'), {'q': 'invoice'})
+
+
+@scenario('list_page_models', "Load one page of the list as full Task instances.")
+def _list_page_models(context):
+    tasks = list(Task.objects.with_overdue().order_by('-created_at', '-id')[:LIST_PAGE_SIZE])
+    return FetchResult(_text_bytes(tasks, ['title', 'description']))
+
+
+@scenario('list_page_rows', "Load one page of the list as TaskRow projections.")
+def _list_page_rows(context):
+    rows = list(Task.objects.list_rows().order_by('-created_at', '-id')[:LIST_PAGE_SIZE])
+    return FetchResult(_text_bytes(rows, ['title', 'description_preview']))
+
+
+def _render_cards(context):
+    rows = list(Task.objects.list_rows().order_by('-created_at', '-id')[:LIST_PAGE_SIZE])
+    return HttpResponse(''.join(_render_task_cards(rows)))
+
+
+@scenario('task_cards_render', "Load and render one page of task cards with an empty card cache.")
+def _task_cards_render(context):
+    return _render_cards(context)
+
+
+@scenario('task_cards_cached', "Load one page of task cards from the card cache.", clear_cache=False)
+def _task_cards_cached(context):
+    return _render_cards(context)
+
+
+def measure(scenario, context, repeat=5):
+    """
+    Run ``scenario`` ``repeat`` times and return its measurements.
+
+    Latency comes from the timed runs; query count and peak traced memory
+    come from one extra run, since tracing slows execution down.
+    Scenarios returning a FetchResult also report the text bytes fetched.
+    """
+    cache = get_cache()
+    if not scenario.clear_cache:
+        scenario.run(context)  # warm the cache
+    timings = []
+    for _ in range(repeat):
+        if scenario.clear_cache:
+            cache.clear()
+        start = time.perf_counter()
+        response = scenario.run(context)
+        timings.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"{scenario.name} returned HTTP {response.status_code}")
+
+    if scenario.clear_cache:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = scenario.run(context)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'scenario': scenario.name,
+        'latency_ms': {
+            'median': round(statistics.median(timings) * 1000, 3),
+            'min': round(min(timings) * 1000, 3),
+            'max': round(max(timings) * 1000, 3),
+        },
+        'queries': len(queries),
+        'sql_ms': round(sum(float(query['time']) for query in queries.captured_queries) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+    if isinstance(response, FetchResult):
+        result['fetched_kb'] = round(response.fetched_bytes / 1024, 1)
+    return result
+
+
+def run_scenarios(names=None, repeat=5):
+    """Measure the named scenarios (all by default) on the current database."""
+    context = BenchmarkContext.create()
+    return [measure(SCENARIOS[name], context, repeat) for name in (names or SCENARIOS)]
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Yield (size, scenario, ratio) for results slower than ``baseline``.
+
+    Both arguments are lists of result dicts as written by the
+    ``benchmark_todos`` command; a result regresses when its median
+    latency exceeds the baseline's by more than ``threshold``.
+    """
+    previous = {(row['rows'], row['scenario']): row for row in baseline}
+    for row in results:
+        old = previous.get((row['rows'], row['scenario']))
+        if not old or not old['latency_ms']['median']:
+            continue
+        ratio = row['latency_ms']['median'] / old['latency_ms']['median']
+        if ratio > 1 + threshold:
+            yield row['rows'], row['scenario'], ratio
@@ -0,0 +1,139 @@
+"""Set-based write operations on tasks.
+
+These helpers touch many tasks with a handful of SQL statements and send
+``tasks_changed`` so derived data (such as the dashboard counters) stays in
+sync even though per-instance model signals are not fired.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import ArchivedTask, Task
+from .signals import tasks_changed
+
+BATCH_SIZE = 500
+
+
+def _resolved_delta(tasks, sign=1):
+    completed = sum(1 for task in tasks if task.is_resolved)
+    active = len(tasks) - completed
+    return {'total': sign * len(tasks), 'active': sign * active, 'completed': sign * completed}
+
+
+def bulk_create_tasks(tasks):
+    """Insert unsaved Task instances in batches and return them."""
+    with transaction.atomic():
+        created = Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+        tasks_changed.send(sender=Task, delta=_resolved_delta(created))
+    return created
+
+
+def bulk_update_tasks(tasks, fields, previous_resolved=None):
+    """
+    Write ``fields`` of already-saved Task instances in batches.
+
+    ``previous_resolved`` maps task ids to their stored ``is_resolved``
+    value; it is needed to keep the counters exact when ``is_resolved`` is
+    among the updated fields.
+    """
+    fields = list(dict.fromkeys([*fields, 'updated_at']))
+    now = timezone.now()
+    for task in tasks:
+        task.updated_at = now
+    delta = {'total': 0, 'active': 0, 'completed': 0}
+    if 'is_resolved' in fields:
+        if previous_resolved is None:
+            delta = None
+        else:
+            for task in tasks:
+                if previous_resolved[task.pk] != task.is_resolved:
+                    change = 1 if task.is_resolved else -1
+                    delta['completed'] += change
+                    delta['active'] -= change
+    with transaction.atomic():
+        updated = Task.objects.bulk_update(tasks, fields, batch_size=BATCH_SIZE)
+        tasks_changed.send(sender=Task, delta=delta)
+    return updated
+
+
+def bulk_set_resolved(queryset, is_resolved):
+    """Resolve or reopen every task in ``queryset`` with one UPDATE."""
+    with transaction.atomic():
+        changed = queryset.exclude(is_resolved=is_resolved)
+        count = changed.update(is_resolved=is_resolved, updated_at=timezone.now())
+        change = count if is_resolved else -count
+        tasks_changed.send(
+            sender=Task, delta={'total': 0, 'active': -change, 'completed': change}
+        )
+    return count
+
+
+def toggle_resolved(pk):
+    """
+    Atomically flip the resolved state of one task.
+
+    Returns ``(title, is_resolved)`` after the change, or None if the task
+    does not exist.
+    """
+    with transaction.atomic():
+        result = Task.objects.toggle_resolved(pk)
+        if result is not None:
+            change = 1 if result[1] else -1
+            tasks_changed.send(
+                sender=Task, delta={'total': 0, 'active': -change, 'completed': change}
+            )
+    return result
+
+
+def bulk_delete_tasks(queryset):
+    """
+    Delete every task in ``queryset`` with a single ``DELETE ... WHERE``.
+
+    Task has no related models, so the deletion collector (which would load
+    each row to send per-instance signals) is bypassed.
+    """
+    with transaction.atomic():
+        counts = queryset.aggregate(
+            total=Count('pk'),
+            completed=Count('pk', filter=Q(is_resolved=True)),
+        )
+        deleted = queryset._raw_delete(queryset.db)
+        tasks_changed.send(sender=Task, delta={
+            'total': -counts['total'],
+            'active': counts['completed'] - counts['total'],
+            'completed': -counts['completed'],
+        })
+    return deleted
+
+
+ARCHIVED_FIELDS = ['id', 'title', 'description', 'due_date', 'is_resolved', 'created_at', 'updated_at']
+
+
+def archive_resolved_tasks(cutoff, batch_size=1000, limit=None):
+    """
+    Move tasks resolved before ``cutoff`` into the ArchivedTask table.
+
+    A task's last update stands in for its resolution time. Tasks are
+    moved ``batch_size`` at a time, each batch copied and deleted in one
+    transaction, so a run can be interrupted safely. Returns the number of
+    tasks archived (at most ``limit`` if given).
+    """
+    archived = 0
+    candidates = Task.objects.completed().filter(updated_at__lt=cutoff).order_by()
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        with transaction.atomic():
+            pks = list(candidates.values_list('pk', flat=True)[:size])
+            if not pks:
+                break
+            now = timezone.now()
+            rows = Task.objects.filter(pk__in=pks).values(*ARCHIVED_FIELDS)
+            ArchivedTask.objects.bulk_create(
+                [ArchivedTask(**row, archived_at=now) for row in rows], batch_size=BATCH_SIZE
+            )
+            bulk_delete_tasks(Task.objects.filter(pk__in=pks))
+        archived += len(pks)
+        if len(pks) < size:
+            break
+    return archived
@@ -0,0 +1,145 @@
+"""Caching of rendered task list fragments.
+
+Cached pages are keyed by a global task-table version, stored in the
+database (``TaskListVersion``) so every worker process sees the same one.
+Every write to the tasks table bumps the version (see ``todos.signals``),
+so stale fragments are never served; they simply stop being read and
+expire.
+
+Individual task cards are cached as well, keyed by the task's own
+``updated_at``, so a write only costs re-rendering the cards that changed.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Task, TaskListVersion
+
+# Bump when todos/includes/task_card.html changes, so old markup is not served.
+CARD_TEMPLATE_VERSION = 1
+
+
+def get_cache():
+    """Return the cache configured by TODOS_CACHE_ALIAS."""
+    return caches[getattr(settings, 'TODOS_CACHE_ALIAS', 'default')]
+
+
+def get_list_cache_timeout():
+    return getattr(settings, 'TODOS_LIST_CACHE_TIMEOUT', 300)
+
+
+def get_card_cache_timeout():
+    return getattr(settings, 'TODOS_CARD_CACHE_TIMEOUT', 3600)
+
+
+def get_admin_date_hierarchy_timeout():
+    return getattr(settings, 'TODOS_ADMIN_DATE_HIERARCHY_TIMEOUT', 600)
+
+
+def get_list_version():
+    """Return the current TaskListVersion; its ``token`` keys the cached pages."""
+    return TaskListVersion.current()
+
+
+async def aget_list_version():
+    """Async version of get_list_version()."""
+    return await TaskListVersion.acurrent()
+
+
+def bump_tasks_version():
+    """Invalidate every cached fragment by moving to a new version."""
+    TaskListVersion.bump()
+
+
+def get_last_modified(version):
+    """
+    Return when the tasks table last changed, given the current version.
+
+    This is the time of the last version bump, which deletions also make.
+    Until the first bump it is the latest ``updated_at`` (an indexed MAX).
+    """
+    if version.changed_at is not None:
+        return version.changed_at
+    return Task.objects.aggregate(latest=Max('updated_at'))['latest']
+
+
+async def aget_last_modified(version):
+    """Async version of get_last_modified()."""
+    if version.changed_at is not None:
+        return version.changed_at
+    return (await Task.objects.aaggregate(latest=Max('updated_at')))['latest']
+
+
+def get_overdue_boundary(now=None):
+    """
+    Return the latest due date that has already passed among unresolved tasks.
+
+    Pages change when a task becomes overdue even without a write, so this
+    value (an indexed range MAX) is folded into the validators.
+    """
+    return Task.objects.overdue(now).aggregate(latest=Max('due_date'))['latest']
+
+
+async def aget_overdue_boundary(now=None):
+    """Async version of get_overdue_boundary()."""
+    return (await Task.objects.overdue(now).aaggregate(latest=Max('due_date')))['latest']
+
+
+def list_cache_key(version, filter_type, search_query, cursor, page_size):
+    """Build the cache key of one rendered task list page."""
+    digest = hashlib.md5(
+        f"{filter_type}|{search_query}|{cursor}|{page_size}".encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"todos:list:{version}:{digest}"
+
+
+def card_cache_key(task, archived=False):
+    """
+    Build the cache key of one rendered task card.
+
+    ``task`` is a TaskRow. The overdue flag is part of the key because it
+    changes with time rather than with a write.
+    """
+    changed = task.updated_at.timestamp() if task.updated_at else 0
+    return (
+        f"todos:card:{CARD_TEMPLATE_VERSION}:{task.pk}:{changed}:"
+        f"{int(bool(task.overdue))}:{int(archived)}"
+    )
+
+
+def fragment_timeout(now=None):
+    """
+    Return how long a rendered list page stays valid.
+
+    Overdue badges depend on the current time, so a page must not outlive
+    the moment the next unresolved task becomes overdue.
+    """
+    if now is None:
+        now = timezone.now()
+    return _timeout_until(_next_due_queryset(now).first(), now)
+
+
+async def afragment_timeout(now=None):
+    """Async version of fragment_timeout()."""
+    if now is None:
+        now = timezone.now()
+    return _timeout_until(await _next_due_queryset(now).afirst(), now)
+
+
+def _next_due_queryset(now):
+    return (
+        Task.objects.filter(is_resolved=False, due_date__gt=now)
+        .order_by('due_date')
+        .values_list('due_date', flat=True)
+    )
+
+
+def _timeout_until(next_due, now):
+    timeout = get_list_cache_timeout()
+    if next_due is not None:
+        timeout = min(timeout, max(1, int((next_due - now).total_seconds())))
+    return timeout
@@ -0,0 +1,87 @@
+"""Synthetic task data for benchmarks and load tests."""
+
+import random
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Task
+from .signals import tasks_changed
+
+VERBS = [
+    'Review', 'Write', 'Fix', 'Update', 'Plan', 'Call', 'Email', 'Prepare', 'Deploy',
+    'Test', 'Refactor', 'Schedule', 'Organize', 'Research', 'Submit', 'Book', 'Buy',
+]
+NOUNS = [
+    'report', 'invoice', 'meeting notes', 'release', 'budget', 'presentation',
+    'dentist appointment', 'groceries', 'roadmap', 'bug tracker', 'newsletter',
+    'database migration', 'tax return', 'team offsite', 'onboarding docs', 'backlog',
+]
+FILLER = (
+    'the of and to for with on before after about next week team client draft final '
+    'review notes follow up check confirm send update details priority blocked waiting '
+    'quarterly monthly project customer feedback issue deadline schedule'
+).split()
+
+
+def random_task_row(rng, now):
+    """
+    Return the column values of one synthetic task.
+
+    Tasks are created over the past year; about 45% are resolved, 70%
+    have a due date within a month of creation (so a share of the open
+    ones are overdue), 30% have no description and 5% have a long one of
+    a few kilobytes.
+    """
+    created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+    due_date = None
+    if rng.random() < 0.7:
+        due_date = created_at + timedelta(hours=rng.randint(1, 30 * 24))
+    is_resolved = rng.random() < 0.45
+    description = None
+    roll = rng.random()
+    if roll >= 0.95:
+        description = ' '.join(rng.choices(FILLER, k=rng.randint(300, 1500)))
+    elif roll >= 0.3:
+        description = ' '.join(rng.choices(FILLER, k=rng.randint(5, 80)))
+    updated_at = created_at + (now - created_at) * rng.random()
+    title = f"{rng.choice(VERBS)} {rng.choice(NOUNS)} #{rng.randint(1, 9999)}"
+    return title, description, due_date, is_resolved, created_at, updated_at
+
+
+def generate_tasks(count, seed=None, batch_size=5000, now=None):
+    """
+    Insert ``count`` synthetic tasks and return the number inserted.
+
+    Rows are written with batched executemany() INSERTs rather than
+    bulk_create(), because bulk_create() would overwrite the spread-out
+    created_at values with auto_now_add.
+    """
+    rng = random.Random(seed)
+    if now is None:
+        now = timezone.now()
+    opts = Task._meta
+    columns = ['title', 'description', 'due_date', 'is_resolved', 'created_at', 'updated_at']
+    fields = [opts.get_field(name) for name in columns]
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(opts.db_table)} ({', '.join(quote(f.column) for f in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+    inserted = 0
+    with connection.cursor() as cursor:
+        while inserted < count:
+            size = min(batch_size, count - inserted)
+            rows = [
+                [
+                    field.get_db_prep_value(value, connection)
+                    for field, value in zip(fields, random_task_row(rng, now))
+                ]
+                for _ in range(size)
+            ]
+            with transaction.atomic():
+                cursor.executemany(sql, rows)
+            inserted += size
+    tasks_changed.send(sender=Task, delta=None)
+    return inserted
@@ -0,0 +1,54 @@
+"""Periodic jobs of the todos app (see todos.scheduler)."""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+
+from .bulk import archive_resolved_tasks
+from .models import Task
+from .scheduler import job
+from .signals import tasks_overdue
+
+logger = logging.getLogger(__name__)
+
+
+@job('detect_overdue', interval='TODOS_OVERDUE_CHECK_INTERVAL')
+def detect_overdue(watermark, now):
+    """
+    Send ``tasks_overdue`` for open tasks whose due date passed since ``watermark``.
+
+    Each run reads only the (watermark, now] range of the
+    (is_resolved, due_date) index, so its cost follows the number of newly
+    overdue tasks rather than the table size. The first run starts at
+    ``now``: tasks already overdue when the job is enabled are not
+    reported, and neither are tasks later given a due date in the past.
+    """
+    if watermark is None:
+        return now
+    batch_size = getattr(settings, 'TODOS_OVERDUE_BATCH_SIZE', 500)
+    tasks = Task.objects.active().filter(due_date__gt=watermark, due_date__lte=now)
+    position = None
+    while True:
+        batch = tasks.order_by('due_date', 'id')
+        if position is not None:
+            batch = batch.filter(
+                Q(due_date__gt=position[0]) | Q(due_date=position[0], id__gt=position[1])
+            )
+        rows = list(batch.list_rows(now)[:batch_size])
+        if rows:
+            tasks_overdue.send(sender=Task, tasks=rows, now=now)
+        if len(rows) < batch_size:
+            return now
+        position = (rows[-1].due_date, rows[-1].pk)
+
+
+@job('archive_resolved', interval='TODOS_ARCHIVE_INTERVAL', lease=3600)
+def archive_resolved(watermark, now):
+    """Move tasks resolved more than TODOS_ARCHIVE_AFTER_DAYS ago to the archive."""
+    cutoff = now - timedelta(days=settings.TODOS_ARCHIVE_AFTER_DAYS)
+    archived = archive_resolved_tasks(cutoff, settings.TODOS_ARCHIVE_BATCH_SIZE)
+    if archived:
+        logger.info("Archived %d resolved task(s) last updated before %s", archived, cutoff)
+    return watermark
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from todos.bulk import archive_resolved_tasks
+from todos.models import Task
+
+
+class Command(BaseCommand):
+    help = "Move resolved tasks older than a given age into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TODOS_ARCHIVE_AFTER_DAYS,
+            help="Archive tasks resolved (last updated) more than this many days ago.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TODOS_ARCHIVE_BATCH_SIZE,
+            help="Tasks moved per transaction.",
+        )
+        parser.add_argument('--limit', type=int, default=None, help="Archive at most this many tasks.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the tasks that would be archived.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--days must be >= 0 and --batch-size >= 1.")
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            count = Task.objects.completed().filter(updated_at__lt=cutoff).count()
+            self.stdout.write(f"{count} tasks would be archived.")
+            return
+        archived = archive_resolved_tasks(cutoff, options['batch_size'], options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} tasks."))
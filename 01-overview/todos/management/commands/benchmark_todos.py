@@ -0,0 +1,107 @@
+"""
+Benchmark the todos views at several table sizes.
+
+Every size runs in a freshly created test database (the configured
+database is never touched), filled by todos.datagen. Results are written
+as JSON so runs from different commits can be compared:
+
+    python manage.py benchmark_todos --sizes 1000 100000 --output before.json
+    python manage.py benchmark_todos --sizes 1000 100000 --compare before.json
+"""
+
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from todos.benchmark import SCENARIOS, compare, run_scenarios
+from todos.datagen import generate_tasks
+
+
+class Command(BaseCommand):
+    help = "Measure latency, query count and peak memory of the todos views at several table sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+            help="Table sizes to benchmark (default: 1k, 100k and 1M rows).",
+        )
+        parser.add_argument(
+            '--scenarios', nargs='+', choices=sorted(SCENARIOS),
+            help="Scenarios to run (default: all).",
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per scenario.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for the generated data.")
+        parser.add_argument('--output', help="Write the results to this JSON file.")
+        parser.add_argument('--compare', help="Report regressions against a previous results file.")
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help="Relative slowdown reported as a regression (default: 0.2).",
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)['results']
+
+        environment = {
+            'commit': _git_commit(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+        }
+        results = []
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            loaded = 0
+            for size in sorted(options['sizes']):
+                start = time.perf_counter()
+                generate_tasks(size - loaded, seed=options['seed'] + size)
+                loaded = size
+                self.stderr.write(f"{size} rows loaded in {time.perf_counter() - start:.1f}s")
+                for row in run_scenarios(options['scenarios'], options['repeat']):
+                    row['rows'] = size
+                    results.append(row)
+                    fetched = f" {row['fetched_kb']:>8.1f} KB fetched" if 'fetched_kb' in row else ''
+                    self.stderr.write(
+                        f"  {row['scenario']:<22} {row['latency_ms']['median']:>10.2f} ms "
+                        f"{row['queries']:>4} queries {row['peak_memory_kb']:>10.1f} KB{fetched}"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = json.dumps({'environment': environment, 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report)
+        else:
+            self.stdout.write(report)
+
+        if baseline is not None:
+            regressions = list(compare(results, baseline, options['threshold']))
+            for size, name, ratio in regressions:
+                self.stderr.write(self.style.WARNING(
+                    f"Regression: {name} at {size} rows is {ratio:.2f}x slower"
+                ))
+            if not regressions:
+                self.stderr.write(self.style.SUCCESS("No regressions."))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from todos.models import Task
+from todos.transfer import FORMATS, get_export_chunk_size, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream all tasks to a CSV or NDJSON file (or stdout) with flat memory use."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', default='-', help="Output file, '-' for stdout.")
+        parser.add_argument(
+            '--filter', default='all', choices=['all', 'active', 'completed', 'overdue'],
+            help="Only export tasks matching this list filter.",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=get_export_chunk_size(),
+            help="Rows fetched per database round trip.",
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be >= 1.")
+        tasks = Task.objects.for_filter(options['filter'], timezone.now())
+        chunks = stream_export(tasks, options['format'], options['chunk_size'])
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        newline = '' if options['format'] == 'csv' else None
+        with open(options['output'], 'w', encoding='utf-8', newline=newline) as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(f"Exported tasks to {options['output']}.")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todos.bulk import bulk_delete_tasks
+from todos.datagen import generate_tasks
+from todos.models import Task
+
+
+class Command(BaseCommand):
+    help = "Insert synthetic tasks with realistic due-date and resolved distributions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help="Number of tasks to create.")
+        parser.add_argument('--seed', type=int, default=None, help="Random seed for repeatable data.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT batch.")
+        parser.add_argument('--clear', action='store_true', help="Delete all existing tasks first.")
+
+    def handle(self, *args, **options):
+        if options['count'] < 0 or options['batch_size'] < 1:
+            raise CommandError("count must be >= 0 and --batch-size >= 1.")
+        if options['clear']:
+            deleted = bulk_delete_tasks(Task.objects.all())
+            self.stdout.write(f"Deleted {deleted} existing tasks.")
+        created = generate_tasks(
+            options['count'], seed=options['seed'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {created} tasks."))
@@ -0,0 +1,46 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from todos.transfer import FORMATS, import_tasks
+
+
+class Command(BaseCommand):
+    help = "Import tasks from a CSV or NDJSON file, validating each record and inserting in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, '-' for stdin.")
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS),
+            help="Input format; guessed from the file extension by default.",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tasks per INSERT transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; insert nothing.")
+        parser.add_argument(
+            '--strict', action='store_true',
+            help="Exit with an error if any record is invalid (valid batches are still imported).",
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be >= 1.")
+        format_name = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if format_name not in FORMATS:
+            raise CommandError("Cannot guess the input format; pass --format.")
+
+        if options['path'] == '-':
+            result = import_tasks(sys.stdin, format_name, options['batch_size'], options['dry_run'])
+        else:
+            with open(options['path'], encoding='utf-8', newline='') as stream:
+                result = import_tasks(stream, format_name, options['batch_size'], options['dry_run'])
+
+        for number, errors in result.errors:
+            messages = '; '.join(
+                f"{name}: {error['message']}" for name, items in errors.items() for error in items
+            )
+            self.stderr.write(f"Record {number} skipped: {messages}")
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {result.created} tasks ({len(result.errors)} invalid)."))
+        if options['strict'] and result.errors:
+            raise CommandError(f"{len(result.errors)} invalid records.")
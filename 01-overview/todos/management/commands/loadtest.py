@@ -0,0 +1,107 @@
+"""
+Measure throughput of a running todos server.
+
+Run it against the same data once per deployment mode, e.g.:
+
+    python manage.py runserver --noreload          # or: gunicorn todo_project.wsgi -w 1
+    python manage.py loadtest --url http://127.0.0.1:8000/
+
+    TODO_ASYNC_VIEWS=1 uvicorn todo_project.asgi:application --workers 1
+    python manage.py loadtest --url http://127.0.0.1:8000/ --label asgi
+"""
+
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Send concurrent GET requests to a running server and report throughput and latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/', help="URL to request.")
+        parser.add_argument('--concurrency', type=int, default=50, help="Number of concurrent clients.")
+        parser.add_argument('--duration', type=float, default=10.0, help="Test length in seconds.")
+        parser.add_argument('--label', default='', help="Label stored with the results, e.g. wsgi or asgi.")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme not in ('http', 'https'):
+            raise CommandError("--url must be an http(s) URL.")
+        path = url.path or '/'
+        if url.query:
+            path = f"{path}?{url.query}"
+        deadline = time.perf_counter() + options['duration']
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def client():
+            connection_class = (
+                http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+            )
+            connection = connection_class(url.netloc, timeout=30)
+            local_latencies = []
+            local_errors = 0
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', path)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        local_errors += 1
+                    else:
+                        local_latencies.append(time.perf_counter() - start)
+                except (OSError, http.client.HTTPException):
+                    local_errors += 1
+                    connection.close()
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for _ in range(options['concurrency']):
+                executor.submit(client)
+        elapsed = time.perf_counter() - started
+
+        results = {
+            'label': options['label'],
+            'url': options['url'],
+            'concurrency': options['concurrency'],
+            'duration_s': round(elapsed, 3),
+            'requests': len(latencies),
+            'errors': sum(errors),
+            'requests_per_s': round(len(latencies) / elapsed, 1),
+            'latency_ms': _percentiles(latencies),
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+            return
+        self.stdout.write(f"{results['label'] or 'run'}: {results['requests']} requests, "
+                          f"{results['errors']} errors in {results['duration_s']}s")
+        self.stdout.write(f"  throughput: {results['requests_per_s']} req/s")
+        self.stdout.write("  latency (ms): " + ", ".join(
+            f"{name}={value}" for name, value in results['latency_ms'].items()
+        ))
+
+
+def _percentiles(latencies):
+    if len(latencies) < 2:
+        return {}
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        'p50': round(cuts[49] * 1000, 2),
+        'p95': round(cuts[94] * 1000, 2),
+        'p99': round(cuts[98] * 1000, 2),
+        'max': round(max(latencies) * 1000, 2),
+    }
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from todos.models import TaskCounter
+
+
+class Command(BaseCommand):
+    help = "Recount all tasks and store the result in the TaskCounter row."
+
+    def handle(self, *args, **options):
+        counter = TaskCounter.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Task counters rebuilt: {counter}"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todos.scheduler import JOBS, default_worker_id, run_due_jobs, run_forever
+
+
+class Command(BaseCommand):
+    help = "Run the periodic todos jobs (overdue detection and others) from the database-backed scheduler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run the due jobs once and exit.")
+        parser.add_argument('--poll-interval', type=float, default=5, help="Seconds between polls.")
+        parser.add_argument('--worker-id', default=None, help="Name recorded on claimed jobs.")
+
+    def handle(self, *args, **options):
+        if options['poll_interval'] <= 0:
+            raise CommandError("--poll-interval must be positive.")
+        worker_id = options['worker_id'] or default_worker_id()
+        if options['once']:
+            ran = run_due_jobs(worker_id)
+            self.stdout.write(f"Ran {len(ran)} job(s): {', '.join(ran) or 'none due'}.")
+            return
+        self.stdout.write(f"Scheduler {worker_id} running {', '.join(JOBS)}; press Ctrl+C to stop.")
+        try:
+            run_forever(options['poll_interval'], worker_id=worker_id)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todos", "0002_task_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total", models.BigIntegerField(default=0)),
+                ("active", models.BigIntegerField(default=0)),
+                ("completed", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Task counter",
+                "verbose_name_plural": "Task counters",
+            },
+        ),
+    ]
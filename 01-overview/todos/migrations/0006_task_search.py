@@ -0,0 +1,88 @@
+"""Full-text search index for task titles and descriptions.
+
+SQLite gets an external-content FTS5 table kept in sync by triggers;
+PostgreSQL gets a GIN index on the weighted search vector used by
+todos.search. Other backends fall back to LIKE scans and need nothing.
+"""
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE todos_task_fts USING fts5(
+        title, description,
+        content='todos_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Title matches weigh ten times more than description matches.
+    "INSERT INTO todos_task_fts(todos_task_fts, rank) VALUES('rank', 'bm25(10.0, 1.0)')",
+    """
+    CREATE TRIGGER todos_task_fts_insert AFTER INSERT ON todos_task BEGIN
+        INSERT INTO todos_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_task_fts_delete AFTER DELETE ON todos_task BEGIN
+        INSERT INTO todos_task_fts(todos_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_task_fts_update AFTER UPDATE OF title, description ON todos_task BEGIN
+        INSERT INTO todos_task_fts(todos_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO todos_task_fts(todos_task_fts) VALUES('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS todos_task_fts_update",
+    "DROP TRIGGER IF EXISTS todos_task_fts_delete",
+    "DROP TRIGGER IF EXISTS todos_task_fts_insert",
+    "DROP TABLE IF EXISTS todos_task_fts",
+]
+
+
+def postgresql_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Must match todos.search.postgresql_search_vector() for queries to use it.
+    vector = SearchVector("title", weight="A", config="english") + SearchVector(
+        "description", weight="B", config="english"
+    )
+    return GinIndex(vector, name="todos_task_search_idx")
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for statement in SQLITE_FORWARD:
+            schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("todos", "Task"), postgresql_index())
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for statement in SQLITE_BACKWARD:
+            schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("todos", "Task"), postgresql_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todos", "0005_task_updated_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
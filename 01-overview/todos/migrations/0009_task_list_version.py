@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todos", "0008_archived_task"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskListVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=32)),
+                ("changed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Task list version",
+                "verbose_name_plural": "Task list versions",
+            },
+        ),
+    ]
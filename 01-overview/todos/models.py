@@ -1,6 +1,198 @@
-from django.db import models
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.db import connections, models, transaction
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, Q, Value
+from django.db.models.functions import Substr
+from django.db.models.query import ValuesIterable
 from django.utils import timezone
 
+# Characters of the description loaded for the task list cards.
+DESCRIPTION_PREVIEW_CHARS = 200
+
+
+class TaskRow:
+    """
+    The columns of a task shown on the task list, without model overhead.
+
+    Produced by TaskQuerySet.list_rows(). ``description_preview`` holds at
+    most DESCRIPTION_PREVIEW_CHARS characters of the description, ending in
+    an ellipsis when the description was cut.
+    """
+    __slots__ = (
+        'id', 'title', 'description_preview', 'due_date', 'is_resolved',
+        'created_at', 'updated_at', 'overdue', 'search_rank',
+    )
+    fields = __slots__[:-1]
+
+    def __init__(self, id, title, description_preview, due_date, is_resolved,
+                 created_at, updated_at, overdue, search_rank=None, **extra):
+        self.id = id
+        self.title = title
+        if description_preview and len(description_preview) > DESCRIPTION_PREVIEW_CHARS:
+            description_preview = description_preview[:DESCRIPTION_PREVIEW_CHARS].rstrip() + '…'
+        self.description_preview = description_preview
+        self.due_date = due_date
+        self.is_resolved = is_resolved
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.overdue = overdue
+        self.search_rank = search_rank
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f"<TaskRow {self.id}: {self.title}>"
+
+
+class TaskRowIterable(ValuesIterable):
+    """Yield TaskRow objects for a values() queryset."""
+
+    def __iter__(self):
+        for row in super().__iter__():
+            yield TaskRow(**row)
+
+
+def _can_return_rows_from_update(connection):
+    """
+    Whether the backend supports ``UPDATE ... RETURNING``.
+
+    Django's ``can_return_columns_from_insert`` only covers INSERT: MariaDB
+    has RETURNING on INSERT and DELETE but not on UPDATE.
+    """
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35, 0)
+    return False
+
+
+class TaskQuerySet(models.QuerySet):
+    """QuerySet with the task filters used by the list views."""
+
+    def active(self):
+        """Return tasks that are not resolved."""
+        return self.filter(is_resolved=False)
+
+    def completed(self):
+        """Return tasks that are resolved."""
+        return self.filter(is_resolved=True)
+
+    def overdue(self, now=None):
+        """
+        Return unresolved tasks whose due date has passed.
+
+        Runs as a single range query on the (is_resolved, due_date) index
+        instead of evaluating Task.is_overdue() for every row in Python.
+        """
+        if now is None:
+            now = timezone.now()
+        return self.filter(is_resolved=False, due_date__lt=now)
+
+    def for_filter(self, filter_type, now=None):
+        """Apply one of the task list filters: all, active, completed or overdue."""
+        if filter_type == 'active':
+            return self.active()
+        if filter_type == 'completed':
+            return self.completed()
+        if filter_type == 'overdue':
+            return self.overdue(now)
+        return self
+
+    def with_overdue(self, now=None):
+        """
+        Annotate each task with an ``overdue`` boolean computed by the database.
+
+        Templates should read ``task.overdue`` rather than calling the
+        ``is_overdue()`` method per row.
+        """
+        if now is None:
+            now = timezone.now()
+        return self.annotate(
+            overdue=ExpressionWrapper(
+                Q(is_resolved=False, due_date__lt=now),
+                output_field=BooleanField(),
+            )
+        )
+
+    def list_rows(self, now=None):
+        """
+        Return the tasks as TaskRow objects holding only what the list shows.
+
+        The description is cut in the database, so long descriptions are
+        never transferred or decoded, and rows skip model instantiation.
+        """
+        queryset = self.with_overdue(now).annotate(
+            # One character more than shown tells TaskRow whether it was cut.
+            description_preview=Substr('description', 1, DESCRIPTION_PREVIEW_CHARS + 1),
+        ).values(*TaskRow.fields)
+        queryset._iterable_class = TaskRowIterable
+        return queryset
+
+    def toggle_resolved(self, pk):
+        """
+        Flip ``is_resolved`` of one task with a single UPDATE statement.
+
+        The negation happens in the database, so concurrent toggles never
+        lose an update, and only ``is_resolved`` and ``updated_at`` are
+        written. Returns ``(title, is_resolved)`` after the change, or None
+        if the task does not exist. Where the backend supports
+        ``UPDATE ... RETURNING`` the new state comes back with the UPDATE;
+        elsewhere it is read back in the same transaction.
+        """
+        connection = connections[self.db]
+        if not _can_return_rows_from_update(connection):
+            with transaction.atomic(using=self.db):
+                updated = self.filter(pk=pk).update(
+                    is_resolved=~F('is_resolved'), updated_at=timezone.now()
+                )
+                if not updated:
+                    return None
+                return self.filter(pk=pk).values_list('title', 'is_resolved').get()
+
+        opts = self.model._meta
+        quote = connection.ops.quote_name
+        is_resolved = quote(opts.get_field('is_resolved').column)
+        updated_at_field = opts.get_field('updated_at')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {quote(opts.db_table)} "
+                f"SET {is_resolved} = NOT {is_resolved}, {quote(updated_at_field.column)} = %s "
+                f"WHERE {quote(opts.pk.column)} = %s "
+                f"RETURNING {quote(opts.get_field('title').column)}, {is_resolved}",
+                [updated_at_field.get_db_prep_value(timezone.now(), connection), pk],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return row[0], bool(row[1])
+
+    def stats(self, now=None):
+        """
+        Return total/active/completed/overdue counts in a single query.
+
+        Uses conditional aggregation so the dashboard does not issue one
+        COUNT per statistic.
+        """
+        return self.aggregate(**self._stats_aggregates(now))
+
+    async def astats(self, now=None):
+        """Async version of stats()."""
+        return await self.aaggregate(**self._stats_aggregates(now))
+
+    @staticmethod
+    def _stats_aggregates(now=None):
+        if now is None:
+            now = timezone.now()
+        return {
+            'total': Count('pk'),
+            'active': Count('pk', filter=Q(is_resolved=False)),
+            'completed': Count('pk', filter=Q(is_resolved=True)),
+            'overdue': Count('pk', filter=Q(is_resolved=False, due_date__lt=now)),
+        }
+
 
 class Task(models.Model):
     """
@@ -21,11 +213,28 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, help_text="When the task was created")
     updated_at = models.DateTimeField(auto_now=True, help_text="When the task was last updated")
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']  # Order by newest first
+        indexes = [
+            models.Index(fields=['is_resolved', 'due_date'], name='todos_task_resolved_due_idx'),
+            models.Index(fields=['is_resolved', 'created_at'], name='todos_task_resolved_crt_idx'),
+            models.Index(fields=['created_at', 'id'], name='todos_task_created_id_idx'),
+            models.Index(fields=['updated_at'], name='todos_task_updated_idx'),
+        ]
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored resolved state so the counter signals can tell
+        # whether a save moved the task between active and completed.
+        if 'is_resolved' in field_names:
+            instance._loaded_is_resolved = instance.is_resolved
+        return instance
+
     def __str__(self):
         status = "✓" if self.is_resolved else "○"
         return f"{status} {self.title}"
@@ -35,3 +244,197 @@ class Task(models.Model):
         if self.due_date and not self.is_resolved:
             return timezone.now() > self.due_date
         return False
+
+
+class TaskCounter(models.Model):
+    """
+    Denormalized task counts kept up to date by Task save/delete signals.
+
+    There is a single row (pk=1). It is only maintained when
+    TODOS_STATS_BACKEND is "counter"; run ``manage.py rebuild_task_counters``
+    after switching the setting on for an existing database.
+    """
+    total = models.BigIntegerField(default=0)
+    active = models.BigIntegerField(default=0)
+    completed = models.BigIntegerField(default=0)
+
+    SINGLETON_PK = 1
+
+    class Meta:
+        verbose_name = "Task counter"
+        verbose_name_plural = "Task counters"
+
+    def __str__(self):
+        return f"{self.total} tasks ({self.active} active, {self.completed} completed)"
+
+    @classmethod
+    def rebuild(cls):
+        """Recount all tasks and store the result in the counter row."""
+        counts = Task.objects.stats()
+        counter, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_PK,
+            defaults={
+                'total': counts['total'],
+                'active': counts['active'],
+                'completed': counts['completed'],
+            },
+        )
+        return counter
+
+    @classmethod
+    def get_counts(cls):
+        """Return the stored counts, rebuilding the row if it does not exist yet."""
+        counter = cls.objects.filter(pk=cls.SINGLETON_PK).first()
+        if counter is None:
+            counter = cls.rebuild()
+        return counter.as_dict()
+
+    @classmethod
+    async def aget_counts(cls):
+        """Async version of get_counts()."""
+        counter = await cls.objects.filter(pk=cls.SINGLETON_PK).afirst()
+        if counter is None:
+            counter = await sync_to_async(cls.rebuild)()
+        return counter.as_dict()
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'active': self.active,
+            'completed': self.completed,
+        }
+
+    @classmethod
+    def apply_delta(cls, total=0, active=0, completed=0):
+        """Atomically add the given deltas to the stored counts."""
+        updated = cls.objects.filter(pk=cls.SINGLETON_PK).update(
+            total=F('total') + total,
+            active=F('active') + active,
+            completed=F('completed') + completed,
+        )
+        if not updated:
+            cls.rebuild()
+
+
+class TaskListVersion(models.Model):
+    """
+    Version of the tasks table, moved on by the Task write signals.
+
+    Cached task list pages and their ETags are keyed by ``token``. It lives
+    in the database rather than in the cache, so a write handled by one
+    worker process invalidates the pages cached by every worker. There is a
+    single row (pk=1); ``changed_at`` is the time of the last write.
+    """
+    token = models.CharField(max_length=32)
+    changed_at = models.DateTimeField(blank=True, null=True)
+
+    SINGLETON_PK = 1
+
+    class Meta:
+        verbose_name = "Task list version"
+        verbose_name_plural = "Task list versions"
+
+    def __str__(self):
+        return self.token
+
+    @classmethod
+    def current(cls):
+        """Return the version row, creating it if it does not exist yet."""
+        version = cls.objects.filter(pk=cls.SINGLETON_PK).first()
+        if version is None:
+            version, _ = cls.objects.get_or_create(
+                pk=cls.SINGLETON_PK, defaults={'token': uuid.uuid4().hex}
+            )
+        return version
+
+    @classmethod
+    async def acurrent(cls):
+        """Async version of current()."""
+        version = await cls.objects.filter(pk=cls.SINGLETON_PK).afirst()
+        if version is None:
+            version, _ = await cls.objects.aget_or_create(
+                pk=cls.SINGLETON_PK, defaults={'token': uuid.uuid4().hex}
+            )
+        return version
+
+    @classmethod
+    def bump(cls):
+        """
+        Move to a new token with a single UPDATE.
+
+        Inside a transaction the new token becomes visible to other
+        connections together with the write that caused it.
+        """
+        token, now = uuid.uuid4().hex, timezone.now()
+        updated = cls.objects.filter(pk=cls.SINGLETON_PK).update(token=token, changed_at=now)
+        if not updated:
+            cls.objects.update_or_create(
+                pk=cls.SINGLETON_PK, defaults={'token': token, 'changed_at': now}
+            )
+
+
+class ArchivedTaskQuerySet(models.QuerySet):
+    """QuerySet of archived tasks, listed like live ones."""
+
+    def list_rows(self, now=None):
+        """Return the archived tasks as TaskRow objects (never overdue)."""
+        queryset = self.annotate(
+            description_preview=Substr('description', 1, DESCRIPTION_PREVIEW_CHARS + 1),
+            overdue=Value(False, output_field=BooleanField()),
+        ).values(*TaskRow.fields)
+        queryset._iterable_class = TaskRowIterable
+        return queryset
+
+
+class ArchivedTask(models.Model):
+    """
+    A resolved task moved out of the live Task table by todos.bulk.archive_resolved_tasks().
+
+    Keeping old resolved tasks here keeps the working set of the task list
+    and its counts small. The primary key is the task's original id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    due_date = models.DateTimeField(blank=True, null=True)
+    is_resolved = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    objects = ArchivedTaskQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='todos_archived_created_id_idx'),
+        ]
+        verbose_name = "Archived task"
+        verbose_name_plural = "Archived tasks"
+
+    def __str__(self):
+        return f"✓ {self.title}"
+
+
+class ScheduledJob(models.Model):
+    """
+    State of a periodic job run by todos.scheduler.
+
+    Workers claim a due job by atomically setting ``locked_until``, so
+    several scheduler processes can share one database without running a
+    job twice. ``watermark`` records how far the job has processed.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    watermark = models.DateTimeField(blank=True, null=True)
+    next_run_at = models.DateTimeField()
+    last_run_at = models.DateTimeField(blank=True, null=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Scheduled job"
+        verbose_name_plural = "Scheduled jobs"
+
+    def __str__(self):
+        return self.name
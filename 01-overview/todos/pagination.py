@@ -0,0 +1,138 @@
+"""Keyset (cursor) pagination for task listings."""
+
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(direction, created_at, pk):
+    """Encode a position in the (created_at, id) ordering as an opaque token."""
+    raw = f"{direction}|{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a token produced by encode_cursor() into (direction, created_at, pk)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from exc
+
+
+def get_page_size(value):
+    """
+    Parse a requested page size, falling back to TODOS_PAGE_SIZE.
+
+    Values are clamped to 1..TODOS_MAX_PAGE_SIZE.
+    """
+    default = getattr(settings, 'TODOS_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'TODOS_MAX_PAGE_SIZE', 100)
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(1, page_size), maximum)
+
+
+@dataclass
+class KeysetPage:
+    """A single page of results with cursors to its neighbours."""
+    object_list: list
+    page_size: int
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset newest first by (created_at, id) using cursors.
+
+    Each page is fetched with a range condition on the ordering columns
+    instead of an OFFSET, so deep pages cost the same as the first one.
+    """
+
+    def __init__(self, queryset, page_size):
+        self.queryset = queryset
+        self.page_size = page_size
+
+    def get_page(self, cursor=None):
+        """Return the KeysetPage for the given cursor (the first page if empty)."""
+        queryset, position, forward = self._page_query(cursor)
+        return self._build_page(list(queryset), position, forward)
+
+    async def aget_page(self, cursor=None):
+        """Async version of get_page()."""
+        queryset, position, forward = self._page_query(cursor)
+        return self._build_page([row async for row in queryset], position, forward)
+
+    def _page_query(self, cursor):
+        """
+        Return (queryset, position, forward) for one page.
+
+        The queryset fetches one extra row to tell whether more rows follow.
+        Pages before a cursor are read in ascending order and reversed.
+        """
+        if not cursor:
+            queryset = self.queryset.order_by('-created_at', '-id')
+            return queryset[:self.page_size + 1], None, True
+        direction, created_at, pk = decode_cursor(cursor)
+        if direction == NEXT:
+            queryset = self.queryset.order_by('-created_at', '-id').filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+        else:
+            queryset = self.queryset.order_by('created_at', 'id').filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            )
+        return queryset[:self.page_size + 1], (created_at, pk), direction == NEXT
+
+    def _build_page(self, rows, position, forward):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if forward:
+            return KeysetPage(
+                object_list=rows,
+                page_size=self.page_size,
+                next_cursor=self._cursor(NEXT, rows[-1]) if has_more else None,
+                previous_cursor=self._cursor(PREVIOUS, rows[0]) if position and rows else None,
+            )
+        rows = rows[::-1]
+        return KeysetPage(
+            object_list=rows,
+            page_size=self.page_size,
+            next_cursor=self._cursor(NEXT, rows[-1]) if rows else None,
+            previous_cursor=self._cursor(PREVIOUS, rows[0]) if has_more else None,
+        )
+
+    @staticmethod
+    def _cursor(direction, row):
+        return encode_cursor(direction, row.created_at, row.pk)
@@ -0,0 +1,163 @@
+"""A small database-backed scheduler for periodic task jobs.
+
+Jobs are registered with the ``@job`` decorator and their state lives in
+the ScheduledJob table, so no message broker is needed. Any number of
+workers (the ``run_scheduler`` command, or the in-process thread that the
+WSGI/ASGI entry points start when TODOS_SCHEDULER_IN_PROCESS is set) may
+poll the same database: a due job is claimed with a single conditional
+UPDATE and only the claiming worker runs it.
+
+A job function is called as ``func(watermark, now)`` and returns the new
+watermark, which is stored for its next run.
+"""
+
+import logging
+import os
+import socket
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+JOBS = {}
+
+
+@dataclass
+class Job:
+    """A registered periodic job; ``interval`` is a setting name or seconds."""
+    name: str
+    func: object
+    interval: object
+    lease: int = 300
+
+    def get_interval(self):
+        if isinstance(self.interval, str):
+            return getattr(settings, self.interval)
+        return self.interval
+
+
+def job(name, interval, lease=300):
+    """Register a function as a periodic job run every ``interval`` seconds."""
+    def decorator(func):
+        JOBS[name] = Job(name, func, interval, lease)
+        return func
+    return decorator
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def claim(job, worker_id, now):
+    """
+    Try to take the lock of a due job and return its ScheduledJob row.
+
+    Returns None if the job is not due or another worker holds a live lock.
+    """
+    ScheduledJob.objects.get_or_create(name=job.name, defaults={'next_run_at': now})
+    claimed = ScheduledJob.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        name=job.name,
+        next_run_at__lte=now,
+    ).update(locked_until=now + timedelta(seconds=job.lease), locked_by=worker_id)
+    if not claimed:
+        return None
+    return ScheduledJob.objects.get(name=job.name)
+
+
+def run_job(job, state, now):
+    """
+    Run a claimed job, record the outcome and release its lock.
+
+    The outcome is only written while this worker still holds the lease. If
+    the job outlived its lease and another worker claimed it, the result is
+    dropped and False is returned.
+    """
+    try:
+        watermark = job.func(state.watermark, now)
+        last_error = ''
+    except Exception as exc:
+        logger.exception("Scheduled job %s failed", job.name)
+        watermark = state.watermark
+        last_error = f"{type(exc).__name__}: {exc}"
+    outcome = {
+        'watermark': watermark,
+        'last_error': last_error,
+        'last_run_at': now,
+        'next_run_at': now + timedelta(seconds=job.get_interval()),
+        'locked_until': None,
+        'locked_by': '',
+    }
+    released = ScheduledJob.objects.filter(
+        pk=state.pk, locked_by=state.locked_by, locked_until=state.locked_until,
+    ).update(**outcome)
+    if not released:
+        logger.warning("Scheduled job %s lost its lease; its result was dropped", job.name)
+        return False
+    for name, value in outcome.items():
+        setattr(state, name, value)
+    return not last_error
+
+
+def run_due_jobs(worker_id=None, now=None):
+    """Run every registered job that is due; return the names of the jobs run."""
+    worker_id = worker_id or default_worker_id()
+    ran = []
+    for registered in JOBS.values():
+        now_for_job = now or timezone.now()
+        state = claim(registered, worker_id, now_for_job)
+        if state is not None:
+            run_job(registered, state, now_for_job)
+            ran.append(registered.name)
+    return ran
+
+
+def run_forever(poll_interval=5, stop_event=None, worker_id=None):
+    """Poll for due jobs until ``stop_event`` is set."""
+    stop_event = stop_event or threading.Event()
+    worker_id = worker_id or default_worker_id()
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            run_due_jobs(worker_id)
+        except Exception:
+            logger.exception("Scheduler poll failed")
+        finally:
+            close_old_connections()
+        stop_event.wait(poll_interval)
+
+
+_thread = None
+
+
+def start_if_enabled():
+    """
+    Start the in-process scheduler if TODOS_SCHEDULER_IN_PROCESS is set.
+
+    Called from the WSGI and ASGI entry points rather than AppConfig.ready(),
+    so management commands such as migrate, test and shell never start it,
+    and the runserver autoreloader starts it only in the serving process.
+    """
+    if getattr(settings, 'TODOS_SCHEDULER_IN_PROCESS', False):
+        return start_in_process()
+    return None
+
+
+def start_in_process(poll_interval=5):
+    """Start the scheduler in a daemon thread of this process (once)."""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(
+            target=run_forever, kwargs={'poll_interval': poll_interval},
+            name='todos-scheduler', daemon=True,
+        )
+        _thread.start()
+    return _thread
@@ -0,0 +1,130 @@
+"""Full-text search over task titles and descriptions.
+
+On SQLite this queries the FTS5 table created by migration 0006; on
+PostgreSQL it uses a weighted search vector backed by a GIN index. Other
+backends, and archived tasks on SQLite, fall back to case-insensitive
+LIKE matching.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'english'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def postgresql_search_vector():
+    """Return the search vector indexed on PostgreSQL (titles weigh more)."""
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def fts5_query(text):
+    """
+    Turn free text into a safe FTS5 query.
+
+    Every word becomes a quoted prefix term, so FTS5 operators and
+    punctuation in user input cannot cause syntax errors.
+    """
+    return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(text))
+
+
+def _has_fts_index(queryset):
+    # The FTS5 table mirrors todos_task only; archived tasks use LIKE.
+    return queryset.model._meta.db_table == 'todos_task'
+
+
+def search_tasks(queryset, text):
+    """
+    Filter ``queryset`` to tasks matching ``text``.
+
+    The result keeps the queryset's ordering; use ranked_search() for the
+    best matches first.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and _has_fts_index(queryset):
+        query = fts5_query(text)
+        if not query:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            "SELECT rowid FROM todos_task_fts WHERE todos_task_fts MATCH %s", (query,)
+        ))
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery
+
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.alias(search_vector=postgresql_search_vector()).filter(
+            search_vector=query
+        )
+
+    words = _TOKEN_RE.findall(text)
+    if not words:
+        return queryset.none()
+    condition = Q()
+    for word in words:
+        condition &= Q(title__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(condition)
+
+
+def ranked_search(queryset, text, limit):
+    """
+    Return up to ``limit`` tasks from ``queryset`` matching ``text``, best first.
+
+    Each task gets a ``search_rank`` attribute (higher is better). On SQLite
+    the FTS5 table produces the ranking itself and rows are loaded by
+    primary key, so the cost does not grow with the size of the tasks table.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and _has_fts_index(queryset):
+        return _fts5_ranked_search(connection, queryset, text, limit)
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return list(
+            search_tasks(queryset, text)
+            .annotate(search_rank=SearchRank(postgresql_search_vector(), query))
+            .order_by('-search_rank', '-created_at', '-id')[:limit]
+        )
+
+    tasks = list(search_tasks(queryset, text).order_by('-created_at', '-id')[:limit])
+    for task in tasks:
+        task.search_rank = 0
+    return tasks
+
+
+def _fts5_ranked_search(connection, queryset, text, limit):
+    query = fts5_query(text)
+    if not query or limit <= 0:
+        return []
+    sql = "SELECT rowid, -rank FROM todos_task_fts WHERE todos_task_fts MATCH %s"
+    params = [query]
+    if queryset.query.where:
+        # Restrict the matches to the filtered tasks inside the same query,
+        # so FTS5 ranks and limits only rows the page can actually show.
+        subquery, subquery_params = queryset.order_by().values('pk').query.sql_with_params()
+        sql += f" AND rowid IN ({subquery})"
+        params.extend(subquery_params)
+    sql += " ORDER BY rank LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ranked = cursor.fetchall()
+    tasks = {task.pk: task for task in queryset.filter(pk__in=[pk for pk, _ in ranked])}
+    results = []
+    for pk, rank in ranked:
+        task = tasks.get(pk)
+        if task is not None:
+            task.search_rank = rank
+            results.append(task)
+    return results
@@ -0,0 +1,89 @@
+"""Signal receivers that keep derived task data in sync."""
+
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .caching import bump_tasks_version
+from .models import Task, TaskCounter
+from .stats import get_stats_backend
+
+# Sent by bulk operations that bypass the per-instance model signals
+# (bulk_create, bulk_update, queryset update/delete). ``delta`` is a dict
+# with "total", "active" and "completed" changes, or None if unknown.
+tasks_changed = Signal()
+
+# Sent by the detect_overdue job (todos.jobs) for each batch of tasks that
+# became overdue. ``tasks`` is a list of TaskRow objects, ``now`` the time
+# of the check.
+tasks_overdue = Signal()
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Task)
+def update_counter_on_save(sender, instance, created, raw=False, **kwargs):
+    """Adjust the denormalized counters after a task is created or updated."""
+    previous = getattr(instance, '_loaded_is_resolved', None)
+    instance._loaded_is_resolved = instance.is_resolved
+    if raw or get_stats_backend() != 'counter':
+        return
+    if created:
+        if instance.is_resolved:
+            TaskCounter.apply_delta(total=1, completed=1)
+        else:
+            TaskCounter.apply_delta(total=1, active=1)
+    elif previous is None:
+        # The stored state is unknown (e.g. is_resolved was deferred).
+        TaskCounter.rebuild()
+    elif previous != instance.is_resolved:
+        if instance.is_resolved:
+            TaskCounter.apply_delta(active=-1, completed=1)
+        else:
+            TaskCounter.apply_delta(active=1, completed=-1)
+
+
+@receiver(post_delete, sender=Task)
+def update_counter_on_delete(sender, instance, **kwargs):
+    """Adjust the denormalized counters after a task is deleted."""
+    if get_stats_backend() != 'counter':
+        return
+    if instance.is_resolved:
+        TaskCounter.apply_delta(total=-1, completed=-1)
+    else:
+        TaskCounter.apply_delta(total=-1, active=-1)
+
+
+@receiver(tasks_changed, sender=Task)
+def update_counter_on_bulk_change(sender, delta=None, **kwargs):
+    """Adjust the denormalized counters after a bulk operation."""
+    if get_stats_backend() != 'counter':
+        return
+    if delta is None:
+        TaskCounter.rebuild()
+    else:
+        TaskCounter.apply_delta(**delta)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(tasks_changed, sender=Task)
+def invalidate_list_cache(sender, **kwargs):
+    """
+    Move the cached task list to a new version.
+
+    The version row is written in the same transaction as the task, so
+    other connections see the new version exactly when they can see the
+    write, and this connection's next read misses right away.
+    """
+    bump_tasks_version()
+
+
+@receiver(tasks_overdue, sender=Task)
+def log_overdue_tasks(sender, tasks, **kwargs):
+    """Report newly overdue tasks; connect more receivers to notify people."""
+    logger.info(
+        "%d task(s) became overdue: %s",
+        len(tasks), ', '.join(f"#{task.pk} {task.title}" for task in tasks),
+    )
@@ -0,0 +1,48 @@
+"""Dashboard statistics for the task list."""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .models import Task, TaskCounter
+
+STATS_BACKENDS = ('aggregate', 'counter')
+
+
+def get_stats_backend():
+    """Return the configured statistics backend name."""
+    backend = getattr(settings, 'TODOS_STATS_BACKEND', 'aggregate')
+    if backend not in STATS_BACKENDS:
+        raise ImproperlyConfigured(
+            f"TODOS_STATS_BACKEND must be one of {STATS_BACKENDS}, got {backend!r}."
+        )
+    return backend
+
+
+def get_task_stats(now=None):
+    """
+    Return a dict with total, active, completed and overdue task counts.
+
+    The "aggregate" backend computes everything in one conditional-aggregate
+    query. The "counter" backend reads the denormalized TaskCounter row and
+    only counts overdue tasks, which depends on the current time, with an
+    indexed range query.
+    """
+    if now is None:
+        now = timezone.now()
+    if get_stats_backend() == 'counter':
+        counts = TaskCounter.get_counts()
+        counts['overdue'] = Task.objects.overdue(now).count()
+        return counts
+    return Task.objects.stats(now)
+
+
+async def aget_task_stats(now=None):
+    """Async version of get_task_stats()."""
+    if now is None:
+        now = timezone.now()
+    if get_stats_backend() == 'counter':
+        counts = await TaskCounter.aget_counts()
+        counts['overdue'] = await Task.objects.overdue(now).acount()
+        return counts
+    return await Task.objects.astats(now)
@@ -1,9 +1,42 @@
-from django.test import TestCase, Client
-from django.urls import reverse
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import (
+    AsyncClient, TestCase, TransactionTestCase, Client, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
 from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from .models import Task
+from io import StringIO
+import importlib
+from unittest.mock import patch
+import csv
+import json
+from .bulk import archive_resolved_tasks
+from .models import (
+    DESCRIPTION_PREVIEW_CHARS, ArchivedTask, ScheduledJob, Task, TaskCounter, TaskListVersion,
+    TaskRow, _can_return_rows_from_update,
+)
+from .scheduler import JOBS, Job, claim, run_due_jobs, run_job
+from .signals import tasks_overdue
 from .forms import TaskForm
+from .benchmark import SCENARIOS, run_scenarios
+from .caching import card_cache_key, get_cache
+from .datagen import generate_tasks
+from .search import ranked_search, search_tasks
+from .stats import get_task_stats
+from .transfer import import_tasks
+from .templatetags.todos_admin import DateBuckets
+from todo_project import instrumentation
+
+
+# URLconf routing the app to its async views, used by AsyncViewTest.
+urlpatterns = [
+    path('', include('todos.async_urls')),
+]
 
 
 class TaskModelTest(TestCase):
@@ -79,6 +112,62 @@ class TaskModelTest(TestCase):
         self.assertEqual(tasks[2].title, "First Task")
 
 
+class TaskQuerySetTest(TestCase):
+    """Test cases for the TaskQuerySet filters."""
+    
+    def setUp(self):
+        """Set up test data."""
+        now = timezone.now()
+        self.overdue = Task.objects.create(title="Overdue", due_date=now - timedelta(days=1))
+        self.future = Task.objects.create(title="Future", due_date=now + timedelta(days=1))
+        self.no_due = Task.objects.create(title="No Due Date")
+        self.resolved = Task.objects.create(
+            title="Resolved Past Due",
+            due_date=now - timedelta(days=1),
+            is_resolved=True
+        )
+    
+    def test_overdue_returns_only_unresolved_past_due(self):
+        """Test overdue() matches Task.is_overdue() for every row."""
+        overdue_ids = set(Task.objects.overdue().values_list('pk', flat=True))
+        expected_ids = {task.pk for task in Task.objects.all() if task.is_overdue()}
+        self.assertEqual(overdue_ids, expected_ids)
+        self.assertEqual(overdue_ids, {self.overdue.pk})
+    
+    def test_overdue_is_single_query(self):
+        """Test overdue filtering runs as one SQL query."""
+        with self.assertNumQueries(1):
+            list(Task.objects.overdue())
+    
+    def test_with_overdue_annotation(self):
+        """Test with_overdue() annotates each task with its overdue state."""
+        flags = {task.pk: task.overdue for task in Task.objects.with_overdue()}
+        self.assertTrue(flags[self.overdue.pk])
+        self.assertFalse(flags[self.future.pk])
+        self.assertFalse(flags[self.no_due.pk])
+        self.assertFalse(flags[self.resolved.pk])
+    
+    def test_list_rows_projection(self):
+        """Test list_rows() loads TaskRow objects with a cut description."""
+        long_task = Task.objects.create(title="Long", description="word " * 500)
+        with CaptureQueriesContext(connection) as queries:
+            rows = {row.pk: row for row in Task.objects.list_rows()}
+        self.assertIn('SUBSTR', queries[0]['sql'].upper())
+        self.assertNotIn('"todos_task"."description" AS', queries[0]['sql'])
+        row = rows[long_task.pk]
+        self.assertIsInstance(row, TaskRow)
+        self.assertEqual(len(row.description_preview), DESCRIPTION_PREVIEW_CHARS)
+        self.assertTrue(row.description_preview.endswith('…'))
+        self.assertTrue(rows[self.overdue.pk].overdue)
+        self.assertFalse(rows[self.resolved.pk].overdue)
+        self.assertIsNone(rows[self.no_due.pk].description_preview)
+    
+    def test_active_and_completed(self):
+        """Test active() and completed() split tasks by resolved state."""
+        self.assertEqual(Task.objects.active().count(), 3)
+        self.assertEqual(Task.objects.completed().count(), 1)
+
+
 class TaskFormTest(TestCase):
     """Test cases for the TaskForm."""
     
@@ -176,6 +265,8 @@ class TaskListViewTest(TestCase):
         
         response = self.client.get(reverse('todos:task_list'), {'filter': 'overdue'})
         self.assertContains(response, "Overdue Task")
+        self.assertNotContains(response, "Active Task 1")
+        self.assertNotContains(response, "Completed Task")
     
     def test_task_list_statistics(self):
         """Test that statistics are displayed correctly."""
@@ -183,6 +274,394 @@ class TaskListViewTest(TestCase):
         self.assertEqual(response.context['total_tasks'], 3)
         self.assertEqual(response.context['active_tasks'], 2)
         self.assertEqual(response.context['completed_tasks'], 1)
+        self.assertEqual(response.context['overdue_tasks'], 0)
+
+
+class TaskStatsTest(TestCase):
+    """Test cases for the dashboard statistics backends."""
+    
+    def setUp(self):
+        """Set up test data."""
+        past_date = timezone.now() - timedelta(days=1)
+        Task.objects.create(title="Active Task", is_resolved=False)
+        Task.objects.create(title="Overdue Task", due_date=past_date, is_resolved=False)
+        Task.objects.create(title="Completed Task", due_date=past_date, is_resolved=True)
+    
+    def test_aggregate_stats_single_query(self):
+        """Test that the aggregate backend computes all counts in one query."""
+        with self.assertNumQueries(1):
+            stats = get_task_stats()
+        self.assertEqual(stats, {'total': 3, 'active': 2, 'completed': 1, 'overdue': 1})
+    
+    @override_settings(TODOS_STATS_BACKEND='counter')
+    def test_counter_backend_tracks_saves_and_deletes(self):
+        """Test that the counter backend follows creates, toggles and deletes."""
+        self.assertEqual(get_task_stats()['total'], 3)
+        
+        task = Task.objects.create(title="New Task")
+        self.assertEqual(
+            get_task_stats(),
+            {'total': 4, 'active': 3, 'completed': 1, 'overdue': 1}
+        )
+        
+        task = Task.objects.get(pk=task.pk)
+        task.is_resolved = True
+        task.save()
+        self.assertEqual(
+            get_task_stats(),
+            {'total': 4, 'active': 2, 'completed': 2, 'overdue': 1}
+        )
+        
+        task.delete()
+        self.assertEqual(
+            get_task_stats(),
+            {'total': 3, 'active': 2, 'completed': 1, 'overdue': 1}
+        )
+    
+    @override_settings(TODOS_STATS_BACKEND='counter')
+    def test_counter_backend_reads_counter_row(self):
+        """Test that the counter backend reads the stored row without counting tasks."""
+        TaskCounter.rebuild()
+        with self.assertNumQueries(2):
+            stats = get_task_stats()
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['overdue'], 1)
+
+
+class TaskListPaginationTest(TestCase):
+    """Test cases for cursor pagination of the task list."""
+    
+    def setUp(self):
+        """Set up test data with identical creation times to exercise the id tiebreaker."""
+        self.client = Client()
+        # Rows written with bulk_create/update() bypass the cache-busting signals.
+        get_cache().clear()
+        Task.objects.bulk_create([Task(title=f"Task {i:02d}") for i in range(25)])
+        Task.objects.update(created_at=timezone.now())
+        self.expected = list(
+            Task.objects.order_by('-created_at', '-id').values_list('title', flat=True)
+        )
+    
+    def get_titles(self, response):
+        return [task.title for task in response.context['tasks']]
+    
+    def test_first_page_uses_page_size(self):
+        """Test that the first page holds page_size tasks and links to the next page."""
+        response = self.client.get(reverse('todos:task_list'), {'page_size': 10})
+        self.assertEqual(self.get_titles(response), self.expected[:10])
+        self.assertTrue(response.context['page'].has_next)
+        self.assertFalse(response.context['page'].has_previous)
+    
+    def test_walk_forward_and_back(self):
+        """Test that next and previous cursors walk the list without gaps or repeats."""
+        url = reverse('todos:task_list')
+        seen = []
+        pages = []
+        response = self.client.get(url, {'page_size': 10})
+        while True:
+            page = response.context['page']
+            pages.append(self.get_titles(response))
+            seen.extend(self.get_titles(response))
+            if not page.has_next:
+                break
+            response = self.client.get(url, {'page_size': 10, 'cursor': page.next_cursor})
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(titles) for titles in pages], [10, 10, 5])
+        
+        previous = self.client.get(
+            url, {'page_size': 10, 'cursor': response.context['page'].previous_cursor}
+        )
+        self.assertEqual(self.get_titles(previous), pages[1])
+    
+    def test_overdue_filter_is_paginated(self):
+        """Test that the overdue filter paginates like the other filters."""
+        Task.objects.update(due_date=timezone.now() - timedelta(days=1))
+        response = self.client.get(
+            reverse('todos:task_list'), {'filter': 'overdue', 'page_size': 20}
+        )
+        self.assertEqual(len(response.context['tasks']), 20)
+        self.assertContains(response, 'filter=overdue')
+    
+    def test_cached_links_do_not_carry_other_query_parameters(self):
+        """Test that pagination links only hold the parameters the page is cached by."""
+        url = reverse('todos:task_list')
+        self.client.get(url, {'page_size': 10, 'token': 'secret'})
+        response = self.client.get(url, {'page_size': 10})
+        next_cursor = response.context['page'].next_cursor
+        self.assertContains(response, f'href="?page_size=10&amp;cursor={next_cursor}"')
+        self.assertNotContains(response, 'secret')
+    
+    def test_page_size_is_clamped(self):
+        """Test that oversized page sizes are limited to TODOS_MAX_PAGE_SIZE."""
+        with self.settings(TODOS_MAX_PAGE_SIZE=5):
+            response = self.client.get(reverse('todos:task_list'), {'page_size': 1000})
+        self.assertEqual(len(response.context['tasks']), 5)
+    
+    def test_invalid_cursor_returns_404(self):
+        """Test that a malformed cursor returns 404."""
+        response = self.client.get(reverse('todos:task_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskListCacheTest(TestCase):
+    """Test cases for task list caching and conditional responses."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.client = Client()
+        get_cache().clear()
+        self.task = Task.objects.create(title="Cached Task")
+    
+    def test_second_request_served_from_cache(self):
+        """Test that a repeated request skips the list and statistics queries."""
+        url = reverse('todos:task_list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertContains(response, "Cached Task")
+        # Only the validator queries (version row, overdue boundary) remain.
+        self.assertLessEqual(len(ctx.captured_queries), 2)
+    
+    def test_write_invalidates_cache(self):
+        """Test that saving a task makes the next request render fresh data."""
+        url = reverse('todos:task_list')
+        self.client.get(url)
+        self.task.title = "Renamed Task"
+        self.task.save()
+        response = self.client.get(url)
+        self.assertContains(response, "Renamed Task")
+        self.assertNotContains(response, "Cached Task")
+    
+    def test_version_is_shared_through_the_database(self):
+        """Test that a write seen only in the database invalidates this process's pages."""
+        url = reverse('todos:task_list')
+        etag = self.client.get(url)['ETag']
+        # Another worker's write: the row and the version row change, but
+        # nothing reaches this process's cache.
+        Task.objects.filter(pk=self.task.pk).update(
+            title="Renamed Elsewhere", updated_at=timezone.now()
+        )
+        TaskListVersion.bump()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Renamed Elsewhere")
+    
+    def test_task_cards_cached_by_updated_at(self):
+        """Test that task cards come from the card cache until the task changes."""
+        url = reverse('todos:task_list')
+        row = Task.objects.list_rows().get(pk=self.task.pk)
+        get_cache().set(card_cache_key(row), '<div id="cached-card"></div>')
+        self.assertContains(self.client.get(url), 'cached-card')
+        
+        self.task.save()
+        response = self.client.get(url)
+        self.assertNotContains(response, 'cached-card')
+        self.assertContains(response, "Cached Task")
+    
+    def test_bulk_write_invalidates_cache(self):
+        """Test that bulk operations also invalidate the cached list."""
+        url = reverse('todos:task_list')
+        self.client.get(url)
+        self.client.delete(
+            reverse('todos:api:task_bulk'),
+            data=json.dumps({'ids': [self.task.pk]}),
+            content_type='application/json'
+        )
+        self.assertNotContains(self.client.get(url), "Cached Task")
+    
+    def test_etag_returns_304(self):
+        """Test that a matching If-None-Match returns 304 until a task changes."""
+        url = reverse('todos:task_list')
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        
+        etag = response['ETag']
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        
+        Task.objects.create(title="Another Task")
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+    
+    def test_etag_changes_when_task_becomes_overdue(self):
+        """Test that a task passing its due date changes the ETag without a write."""
+        url = reverse('todos:task_list')
+        etag = self.client.get(url)['ETag']
+        Task.objects.filter(pk=self.task.pk).update(
+            due_date=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+
+class TaskSearchTest(TestCase):
+    """Test cases for full-text search."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.client = Client()
+        get_cache().clear()
+        self.title_match = Task.objects.create(title="Quarterly report", description="Numbers")
+        self.description_match = Task.objects.create(
+            title="Email Bob", description="Ask about the quarterly report draft"
+        )
+        self.other = Task.objects.create(title="Buy groceries", description="Milk and eggs")
+    
+    def search(self, text):
+        return ranked_search(Task.objects.all(), text, 10)
+    
+    def test_matches_title_and_description_ranked(self):
+        """Test that title matches rank above description matches."""
+        self.assertEqual(self.search("quarterly"), [self.title_match, self.description_match])
+    
+    def test_prefix_and_multiple_words(self):
+        """Test that words match as prefixes and all words must match."""
+        self.assertEqual(self.search("groc"), [self.other])
+        self.assertEqual(self.search("report draft"), [self.description_match])
+    
+    def test_index_follows_updates_and_deletes(self):
+        """Test that the search index tracks edits and deletions."""
+        self.other.title = "Buy quarterly snacks"
+        self.other.save()
+        self.assertIn(self.other, self.search("snacks"))
+        self.assertEqual(self.search("groceries"), [])
+        
+        self.other.delete()
+        self.assertEqual(self.search("snacks"), [])
+    
+    def test_operator_characters_are_harmless(self):
+        """Test that FTS syntax characters in user input do not raise errors."""
+        self.assertEqual(self.search('"quarterly* (report'), [self.title_match, self.description_match])
+        self.assertEqual(self.search('***'), [])
+    
+    def test_search_combines_with_filters(self):
+        """Test that search respects the status filter."""
+        self.description_match.is_resolved = True
+        self.description_match.save()
+        self.assertEqual(ranked_search(Task.objects.active(), "quarterly", 10), [self.title_match])
+        self.assertEqual(
+            set(search_tasks(Task.objects.all(), "quarterly")),
+            {self.title_match, self.description_match}
+        )
+    
+    def test_task_list_search(self):
+        """Test searching from the task list view."""
+        response = self.client.get(reverse('todos:task_list'), {'q': 'groceries'})
+        self.assertContains(response, "Buy groceries")
+        self.assertNotContains(response, "Quarterly report")
+    
+    def test_admin_search_uses_index(self):
+        """Test that the admin changelist search goes through the same backend."""
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+        response = self.client.get(reverse('admin:todos_task_changelist'), {'q': 'milk'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.other])
+
+
+class TaskAdminTest(TestCase):
+    """Test cases for the task admin changelist at large row counts."""
+    
+    def setUp(self):
+        """Log in as a superuser and create more tasks than one page holds."""
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+        get_cache().clear()
+        generate_tasks(150, seed=3)
+        self.url = reverse('admin:todos_task_changelist')
+    
+    def test_keyset_pagination(self):
+        """Test that the default ordering is paged with cursors, newest first."""
+        response = self.client.get(self.url)
+        cl = response.context['cl']
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual([task.pk for task in cl.result_list], expected[:100])
+        self.assertContains(response, 'Older')
+        self.assertNotIn('cursor', cl.get_query_string({'is_resolved__exact': '1'}))
+        
+        response = self.client.get(self.url, {'cursor': cl.keyset_page.next_cursor})
+        cl = response.context['cl']
+        self.assertEqual([task.pk for task in cl.result_list], expected[100:])
+        self.assertContains(response, 'Newer')
+        
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 302)  # IncorrectLookupParameters
+    
+    def test_sorting_uses_numbered_pages(self):
+        """Test that sorting by a column falls back to the standard paginator."""
+        response = self.client.get(self.url, {'o': '1'})
+        cl = response.context['cl']
+        self.assertIsNone(cl.keyset_page)
+        self.assertEqual(cl.result_count, 150)
+    
+    @override_settings(TODOS_ADMIN_EXACT_COUNT_LIMIT=50)
+    def test_large_counts_are_estimated(self):
+        """Test that counts above the limit are not counted in full."""
+        cl = self.client.get(self.url).context['cl']
+        self.assertTrue(cl.count_is_estimate)
+        self.assertEqual(cl.result_count, 50)
+        with self.settings(TODOS_STATS_BACKEND='counter'):
+            TaskCounter.rebuild()
+            cl = self.client.get(self.url).context['cl']
+        self.assertEqual(cl.result_count, 150)
+    
+    @override_settings(TODOS_ADMIN_EXACT_COUNT_LIMIT=50)
+    def test_numbered_pages_are_counted_exactly(self):
+        """Test that sorted lists count every row, so the last page can be reached."""
+        cl = self.client.get(self.url, {'o': '1'}).context['cl']
+        self.assertFalse(cl.count_is_estimate)
+        self.assertEqual(cl.result_count, 150)
+        
+        response = self.client.get(self.url, {'o': '1', 'p': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 50)
+    
+    def test_date_hierarchy_is_cached(self):
+        """Test that the date hierarchy buckets are computed once."""
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(self.url)
+        self.assertLess(len(second), len(first))
+        self.assertContains(response, 'class="toplinks"')
+    
+    def test_date_buckets_match_django(self):
+        """Test that the indexed bucket queries agree with QuerySet.datetimes()."""
+        buckets = DateBuckets(Task.objects.all(), 'created_at')
+        for kind in ('year', 'month'):
+            self.assertEqual(
+                buckets.datetimes('created_at', kind),
+                list(Task.objects.datetimes('created_at', kind)),
+            )
+        month = Task.objects.datetimes('created_at', 'month')[0]
+        in_month = Task.objects.filter(created_at__year=month.year, created_at__month=month.month)
+        self.assertEqual(
+            DateBuckets(in_month, 'created_at').datetimes('created_at', 'day'),
+            list(in_month.datetimes('created_at', 'day')),
+        )
+    
+    def test_bulk_actions(self):
+        """Test that resolve, reopen and delete run as set-based statements."""
+        pks = list(Task.objects.active().values_list('pk', flat=True)[:5])
+        data = {'action': 'resolve_selected', '_selected_action': pks}
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, data)
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "todos_task"') for q in queries), 1)
+        self.assertFalse(Task.objects.filter(pk__in=pks, is_resolved=False).exists())
+        
+        self.client.post(self.url, {'action': 'reopen_selected', '_selected_action': pks})
+        self.assertFalse(Task.objects.filter(pk__in=pks, is_resolved=True).exists())
+        
+        data = {'action': 'delete_selected_tasks', '_selected_action': pks}
+        response = self.client.post(self.url, data)
+        self.assertContains(response, "delete 5 selected tasks")
+        self.assertEqual(Task.objects.filter(pk__in=pks).count(), 5)
+        self.client.post(self.url, {**data, 'post': 'yes'})
+        self.assertFalse(Task.objects.filter(pk__in=pks).exists())
+        
+        action_form = self.client.get(self.url).context['action_form']
+        choices = [name for name, label in action_form.fields['action'].choices]
+        self.assertNotIn('delete_selected', choices)
+        self.assertIn('delete_selected_tasks', choices)
 
 
 class TaskCreateViewTest(TestCase):
@@ -272,6 +751,24 @@ class TaskEditViewTest(TestCase):
         self.assertEqual(self.task.description, 'Updated description')
         self.assertTrue(self.task.is_resolved)
     
+    def test_task_edit_writes_only_changed_fields(self):
+        """Test that editing only writes the columns the user changed."""
+        form_data = {
+            'title': 'Original Title',
+            'description': 'Original description',
+            'is_resolved': True
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse('todos:task_edit', args=[self.task.pk]), data=form_data)
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "todos_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"is_resolved"', updates[0])
+        self.assertNotIn('"title"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+        
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_resolved)
+    
     def test_task_edit_view_404(self):
         """Test that editing non-existent task returns 404."""
         response = self.client.get(reverse('todos:task_edit', args=[99999]))
@@ -351,6 +848,659 @@ class TaskToggleResolvedViewTest(TestCase):
         """Test that toggling non-existent task returns 404."""
         response = self.client.get(reverse('todos:task_toggle_resolved', args=[99999]))
         self.assertEqual(response.status_code, 404)
+    
+    def toggle_statements(self, pk):
+        with CaptureQueriesContext(connection) as ctx:
+            result = Task.objects.toggle_resolved(pk)
+        return result, [query['sql'].split()[0].upper() for query in ctx.captured_queries]
+    
+    def test_toggle_is_single_update_without_select(self):
+        """Test that toggling runs one UPDATE ... RETURNING and no SELECT."""
+        if not _can_return_rows_from_update(connection):
+            self.skipTest("The test database has no UPDATE ... RETURNING.")
+        result, statements = self.toggle_statements(self.task.pk)
+        self.assertEqual(result, ("Test Task", True))
+        self.assertEqual(statements, ['UPDATE'])
+        self.assertIsNone(Task.objects.toggle_resolved(99999))
+    
+    def test_toggle_reads_back_without_returning(self):
+        """Test the fallback for backends without UPDATE ... RETURNING."""
+        with patch('todos.models._can_return_rows_from_update', return_value=False):
+            result, statements = self.toggle_statements(self.task.pk)
+            self.assertIsNone(Task.objects.toggle_resolved(99999))
+        self.assertEqual(result, ("Test Task", True))
+        self.assertEqual(statements.count('UPDATE'), 1)
+        self.assertEqual(statements.count('SELECT'), 1)
+        self.assertLess(statements.index('UPDATE'), statements.index('SELECT'))
+    
+    def test_toggle_updates_timestamp(self):
+        """Test that toggling bumps updated_at even though save() is not called."""
+        before = self.task.updated_at
+        Task.objects.toggle_resolved(self.task.pk)
+        self.task.refresh_from_db()
+        self.assertGreater(self.task.updated_at, before)
+
+
+class TaskToggleConcurrencyTest(TransactionTestCase):
+    """Test that concurrent toggles never lose an update."""
+    
+    THREADS = 8
+    TOGGLES_PER_THREAD = 25
+    
+    def setUp(self):
+        """Skip on in-memory SQLite, which cannot be shared between threads."""
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Requires a test database that allows multiple connections.")
+    
+    def toggle_many(self, pk):
+        client = Client()
+        try:
+            for _ in range(self.TOGGLES_PER_THREAD):
+                response = client.get(reverse('todos:task_toggle_resolved', args=[pk]))
+                self.assertEqual(response.status_code, 302)
+        finally:
+            connection.close()
+    
+    def test_concurrent_toggles(self):
+        """Test that the final state reflects every toggle from every thread."""
+        task = Task.objects.create(title="Contended Task", is_resolved=False)
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            futures = [executor.submit(self.toggle_many, task.pk) for _ in range(self.THREADS)]
+            for future in futures:
+                future.result()
+        
+        task.refresh_from_db()
+        total_toggles = self.THREADS * self.TOGGLES_PER_THREAD
+        self.assertEqual(task.is_resolved, total_toggles % 2 == 1)
+
+
+class TaskAPITest(TestCase):
+    """Test cases for the JSON API."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.client = Client()
+        self.task = Task.objects.create(title="API Task", description="Via API")
+    
+    def send_json(self, method, url, data):
+        return getattr(self.client, method)(
+            url, data=json.dumps(data), content_type='application/json'
+        )
+    
+    def test_list_tasks(self):
+        """Test listing tasks returns serialized tasks and cursors."""
+        response = self.client.get(reverse('todos:api:task_list'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['results'][0]['title'], "API Task")
+        self.assertIsNone(data['next_cursor'])
+    
+    def test_create_task(self):
+        """Test creating a single task."""
+        response = self.send_json('post', reverse('todos:api:task_list'), {'title': 'Created'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(title='Created').exists())
+    
+    def test_create_task_invalid(self):
+        """Test that TaskForm validation errors are returned as JSON."""
+        response = self.send_json('post', reverse('todos:api:task_list'), {'description': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()['errors'])
+    
+    def test_detail_patch_and_delete(self):
+        """Test partial update keeps unspecified fields, and delete removes the task."""
+        url = reverse('todos:api:task_detail', args=[self.task.pk])
+        response = self.send_json('patch', url, {'is_resolved': True})
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_resolved)
+        self.assertEqual(self.task.description, "Via API")
+        
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+    
+    def test_form_encoded_body_rejected(self):
+        """Test that a cross-site form POST cannot create tasks."""
+        for name in ('task_list', 'task_bulk'):
+            response = self.client.post(reverse(f'todos:api:{name}'), {'title': 'Forged'})
+            self.assertEqual(response.status_code, 415)
+        response = self.client.post(
+            reverse('todos:api:task_list'), data='{"title": "Forged"}', content_type='text/plain'
+        )
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(Task.objects.filter(title='Forged').exists())
+    
+    def test_detail_patch_writes_only_sent_fields(self):
+        """Test that PATCH updates the sent columns and leaves the rest alone."""
+        url = reverse('todos:api:task_detail', args=[self.task.pk])
+        # A concurrent writer changes the description after the task was read.
+        with patch('todos.api.views.get_object_or_404', return_value=Task.objects.get(pk=self.task.pk)):
+            Task.objects.filter(pk=self.task.pk).update(description="Changed elsewhere")
+            response = self.send_json('patch', url, {'title': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Renamed')
+        self.assertEqual(self.task.description, "Changed elsewhere")
+    
+    def test_boolean_ids_rejected(self):
+        """Test that true/false are not accepted as task ids."""
+        response = self.send_json('patch', reverse('todos:api:task_bulk'), [{'id': True, 'title': 'x'}])
+        self.assertEqual(response.status_code, 400)
+        response = self.send_json('delete', reverse('todos:api:task_bulk'), {'ids': [True]})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+    
+    def test_bulk_create(self):
+        """Test bulk creation inserts all tasks with a single INSERT."""
+        items = [{'title': f'Bulk {i}'} for i in range(50)]
+        with self.assertNumQueries(4):  # SAVEPOINT, INSERT, list version UPDATE, RELEASE
+            response = self.send_json('post', reverse('todos:api:task_bulk'), items)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 50)
+        self.assertEqual(Task.objects.filter(title__startswith='Bulk').count(), 50)
+    
+    def test_bulk_create_is_all_or_nothing(self):
+        """Test that one invalid item prevents the whole batch from being created."""
+        items = [{'title': 'Good'}, {'description': 'missing title'}]
+        response = self.send_json('post', reverse('todos:api:task_bulk'), items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['index'], 1)
+        self.assertFalse(Task.objects.filter(title='Good').exists())
+    
+    def test_bulk_update(self):
+        """Test bulk update changes only the given fields."""
+        other = Task.objects.create(title="Other Task")
+        items = [
+            {'id': self.task.pk, 'is_resolved': True},
+            {'id': other.pk, 'title': 'Renamed'},
+        ]
+        response = self.send_json('patch', reverse('todos:api:task_bulk'), items)
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        other.refresh_from_db()
+        self.assertTrue(self.task.is_resolved)
+        self.assertEqual(self.task.title, "API Task")
+        self.assertEqual(other.title, 'Renamed')
+        self.assertFalse(other.is_resolved)
+    
+    def test_bulk_update_writes_only_sent_fields(self):
+        """Test that each task's UPDATE only sets the fields sent for it."""
+        other = Task.objects.create(title="Other Task")
+        items = [
+            {'id': self.task.pk, 'is_resolved': True},
+            {'id': other.pk, 'title': 'Renamed'},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send_json('patch', reverse('todos:api:task_bulk'), items)
+        self.assertEqual(response.json()['updated'], 2)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "todos_task"')]
+        self.assertEqual(len(updates), 2)
+        self.assertIn('"is_resolved"', updates[0])
+        self.assertNotIn('"title"', updates[0])
+        self.assertIn('"title"', updates[1])
+        self.assertNotIn('"is_resolved"', updates[1])
+    
+    def test_bulk_update_missing_task(self):
+        """Test that updating unknown ids returns 404."""
+        response = self.send_json(
+            'patch', reverse('todos:api:task_bulk'), [{'id': 99999, 'title': 'x'}]
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['missing'], [99999])
+    
+    def test_bulk_delete(self):
+        """Test bulk delete removes tasks without loading them."""
+        ids = [task.pk for task in Task.objects.bulk_create(
+            [Task(title=f'Doomed {i}') for i in range(20)]
+        )]
+        response = self.send_json('delete', reverse('todos:api:task_bulk'), {'ids': ids})
+        self.assertEqual(response.json()['deleted'], 20)
+        self.assertFalse(Task.objects.filter(pk__in=ids).exists())
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+    
+    @override_settings(TODOS_STATS_BACKEND='counter')
+    def test_bulk_operations_keep_counters_in_sync(self):
+        """Test that bulk writes adjust the denormalized counters."""
+        TaskCounter.rebuild()
+        self.send_json('post', reverse('todos:api:task_bulk'), [{'title': 'A'}, {'title': 'B'}])
+        self.send_json(
+            'patch', reverse('todos:api:task_bulk'), [{'id': self.task.pk, 'is_resolved': True}]
+        )
+        self.send_json('delete', reverse('todos:api:task_bulk'), {'ids': [self.task.pk]})
+        self.assertEqual(TaskCounter.get_counts(), {'total': 2, 'active': 2, 'completed': 0})
+
+
+@override_settings(ROOT_URLCONF='todos.tests')
+class AsyncViewTest(TestCase):
+    """Test cases for the async views."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.async_client = AsyncClient()
+        get_cache().clear()
+        self.task = Task.objects.create(title="Async Task", is_resolved=False)
+    
+    async def test_task_list(self):
+        """Test that the async list view renders tasks and statistics."""
+        await Task.objects.acreate(
+            title="Overdue Async Task", due_date=timezone.now() - timedelta(days=1)
+        )
+        response = await self.async_client.get(reverse('todos:task_list'), {'filter': 'overdue'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Overdue Async Task")
+        self.assertEqual([task.title for task in response.context['tasks']], ["Overdue Async Task"])
+        self.assertEqual(response.context['total_tasks'], 2)
+        self.assertEqual(response.context['overdue_tasks'], 1)
+        self.assertTrue(response.has_header('ETag'))
+        
+        response = await self.async_client.get(
+            reverse('todos:task_list'),
+            {'filter': 'overdue'},
+            headers={'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(response.status_code, 304)
+    
+    async def test_task_list_reads_version_asynchronously(self):
+        """Test that the async list view does not make blocking version lookups."""
+        with patch.object(TaskListVersion, 'current', side_effect=AssertionError("sync lookup")):
+            response = await self.async_client.get(reverse('todos:task_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Async Task")
+    
+    async def test_task_create(self):
+        """Test that the async create view saves the task."""
+        response = await self.async_client.post(
+            reverse('todos:task_create'), {'title': 'Created Async'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(await Task.objects.filter(title='Created Async').aexists())
+    
+    async def test_task_edit(self):
+        """Test that the async edit view updates the task."""
+        response = await self.async_client.post(
+            reverse('todos:task_edit', args=[self.task.pk]),
+            {'title': 'Edited Async', 'is_resolved': True}
+        )
+        self.assertEqual(response.status_code, 302)
+        task = await Task.objects.aget(pk=self.task.pk)
+        self.assertEqual(task.title, 'Edited Async')
+        self.assertTrue(task.is_resolved)
+    
+    async def test_task_delete(self):
+        """Test that the async delete view removes the task."""
+        response = await self.async_client.post(reverse('todos:task_delete', args=[self.task.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(await Task.objects.filter(pk=self.task.pk).aexists())
+    
+    async def test_forms_render(self):
+        """Test that the async create, edit and delete pages render their forms."""
+        for url in (
+            reverse('todos:task_create'),
+            reverse('todos:task_edit', args=[self.task.pk]),
+            reverse('todos:task_delete', args=[self.task.pk]),
+        ):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, '<form')
+    
+    async def test_task_toggle_and_404(self):
+        """Test that the async toggle flips the task and 404s for unknown ids."""
+        response = await self.async_client.get(
+            reverse('todos:task_toggle_resolved', args=[self.task.pk])
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue((await Task.objects.aget(pk=self.task.pk)).is_resolved)
+        
+        response = await self.async_client.get(
+            reverse('todos:task_toggle_resolved', args=[99999])
+        )
+        self.assertEqual(response.status_code, 404)
+    
+    async def test_task_export(self):
+        """Test that the async export streams from an async iterator."""
+        response = await self.async_client.get(reverse('todos:task_export'), {'format': 'ndjson'})
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(content)['title'], "Async Task")
+
+
+class DataGenerationTest(TestCase):
+    """Test cases for the synthetic data generator and benchmark scenarios."""
+    
+    def test_generate_tasks(self):
+        """Test that generated tasks are inserted with varied states and dates."""
+        self.assertEqual(generate_tasks(300, seed=1, batch_size=100), 300)
+        stats = Task.objects.stats()
+        self.assertEqual(stats['total'], 300)
+        self.assertGreater(stats['completed'], 0)
+        self.assertGreater(stats['active'], 0)
+        self.assertGreater(stats['overdue'], 0)
+        self.assertGreater(
+            Task.objects.dates('created_at', 'month').count(), 1,
+            "created_at should be spread out rather than set to now"
+        )
+        self.assertEqual(len(ranked_search(Task.objects.all(), "invoice", 5)), 5)
+    
+    def test_run_scenarios(self):
+        """Test that every benchmark scenario runs and reports its measurements."""
+        generate_tasks(50, seed=2)
+        results = run_scenarios(repeat=1)
+        self.assertEqual([row['scenario'] for row in results], list(SCENARIOS))
+        for row in results:
+            self.assertGreater(row['queries'], 0)
+            self.assertGreater(row['latency_ms']['median'], 0)
+        fetched = {row['scenario']: row['fetched_kb'] for row in results if 'fetched_kb' in row}
+        self.assertLess(fetched['list_page_rows'], fetched['list_page_models'])
+
+
+class TaskTransferTest(TestCase):
+    """Test cases for streaming export and chunked import."""
+    
+    def setUp(self):
+        """Create tasks to export."""
+        Task.objects.create(title="Write report", description='Quarterly, "final"')
+        Task.objects.create(
+            title="Ship release", is_resolved=True,
+            due_date=timezone.now() - timedelta(days=1)
+        )
+    
+    def test_export_csv_is_streamed(self):
+        """Test that the export view streams every task as CSV."""
+        response = self.client.get(reverse('todos:task_export'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.csv"')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['title'] for row in rows], ["Write report", "Ship release"])
+        self.assertEqual(rows[0]['description'], 'Quarterly, "final"')
+        self.assertEqual(rows[1]['is_resolved'], 'True')
+    
+    def test_export_ndjson_with_filter(self):
+        """Test that NDJSON export honours the list filter."""
+        response = self.client.get(reverse('todos:task_export'), {'format': 'ndjson', 'filter': 'completed'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['title'], "Ship release")
+    
+    def test_export_unknown_format(self):
+        """Test that an unknown export format is a 404."""
+        response = self.client.get(reverse('todos:task_export'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_export_import_round_trip(self):
+        """Test that exported CSV can be imported again."""
+        output = StringIO()
+        call_command('export_tasks', stdout=output, chunk_size=1)
+        Task.objects.all().delete()
+        result = import_tasks(StringIO(output.getvalue()), 'csv', batch_size=1)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [])
+        imported = Task.objects.get(title="Ship release")
+        self.assertTrue(imported.is_resolved)
+        self.assertIsNotNone(imported.due_date)
+    
+    def test_import_skips_invalid_records(self):
+        """Test that records failing TaskForm validation are reported and skipped."""
+        data = '{"title": "Valid"}\n\n{"description": "no title"}\n{"title": "Also valid", "is_resolved": true}\n'
+        result = import_tasks(StringIO(data), 'ndjson')
+        self.assertEqual(result.created, 2)
+        self.assertEqual([number for number, errors in result.errors], [2])
+        self.assertIn('title', result.errors[0][1])
+        self.assertTrue(Task.objects.get(title="Also valid").is_resolved)
+    
+    def test_import_reports_unparsable_lines(self):
+        """Test that malformed and non-object NDJSON lines are reported, not fatal."""
+        data = '{"title": "First"}\n{"title": \n[1, 2]\n"text"\n{"title": "Last"}\n'
+        result = import_tasks(StringIO(data), 'ndjson', batch_size=1)
+        self.assertEqual(result.created, 2)
+        self.assertEqual([number for number, errors in result.errors], [2, 3, 4])
+        self.assertIn('Malformed JSON', result.errors[0][1]['__all__'][0]['message'])
+        self.assertEqual(result.errors[1][1]['__all__'][0]['message'], "Expected a JSON object.")
+        self.assertTrue(Task.objects.filter(title="Last").exists())
+    
+    def test_import_reports_unparsable_csv_rows(self):
+        """Test that a CSV row the reader rejects is reported, not fatal."""
+        data = f'title\nFirst\n{"x" * (csv.field_size_limit() + 1)}\nLast\n'
+        result = import_tasks(StringIO(data), 'csv', batch_size=1)
+        self.assertEqual(result.created, 2)
+        self.assertEqual([number for number, errors in result.errors], [2])
+        self.assertIn('Malformed CSV', result.errors[0][1]['__all__'][0]['message'])
+        self.assertTrue(Task.objects.filter(title="Last").exists())
+    
+    def test_import_dry_run(self):
+        """Test that a dry run validates without inserting."""
+        result = import_tasks(StringIO('title\nNew task\n'), 'csv', dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Task.objects.filter(title="New task").exists())
+
+
+class ArchiveTest(TestCase):
+    """Test cases for moving old resolved tasks to the archive."""
+    
+    def setUp(self):
+        """Create old and recent tasks."""
+        get_cache().clear()
+        self.now = timezone.now()
+        old = self.now - timedelta(days=200)
+        self.old_resolved = [
+            Task.objects.create(title=f"Old done {i}", description="shipped", is_resolved=True)
+            for i in range(3)
+        ]
+        self.old_open = Task.objects.create(title="Old open")
+        self.recent_resolved = Task.objects.create(title="Recent done", is_resolved=True)
+        Task.objects.filter(pk__in=[t.pk for t in [*self.old_resolved, self.old_open]]).update(updated_at=old)
+    
+    def test_archive_moves_old_resolved_tasks(self):
+        """Test that only resolved tasks older than the cutoff are moved, in batches."""
+        archived = archive_resolved_tasks(self.now - timedelta(days=90), batch_size=2)
+        self.assertEqual(archived, 3)
+        self.assertEqual(
+            set(ArchivedTask.objects.values_list('pk', flat=True)),
+            {task.pk for task in self.old_resolved},
+        )
+        self.assertEqual(
+            set(Task.objects.values_list('title', flat=True)), {"Old open", "Recent done"}
+        )
+        self.assertEqual(Task.objects.stats()['completed'], 1)
+    
+    @override_settings(TODOS_STATS_BACKEND='counter')
+    def test_archive_keeps_counters_exact(self):
+        """Test that archival updates the denormalized counters."""
+        TaskCounter.rebuild()
+        archive_resolved_tasks(self.now - timedelta(days=90))
+        self.assertEqual(TaskCounter.get_counts(), {'total': 2, 'active': 1, 'completed': 1})
+    
+    def test_archived_filter(self):
+        """Test that the archived filter lists archived tasks without actions."""
+        call_command('archive_tasks', days=90, stdout=StringIO())
+        response = self.client.get(reverse('todos:task_list'), {'filter': 'archived'})
+        titles = [task.title for task in response.context['tasks']]
+        self.assertEqual(sorted(titles), ["Old done 0", "Old done 1", "Old done 2"])
+        self.assertNotContains(response, reverse('todos:task_edit', args=[self.old_resolved[0].pk]))
+        
+        response = self.client.get(reverse('todos:task_list'), {'filter': 'archived', 'q': 'done 1'})
+        self.assertEqual([task.title for task in response.context['tasks']], ["Old done 1"])
+        
+        response = self.client.get(reverse('todos:task_list'))
+        self.assertNotIn("Old done 0", [task.title for task in response.context['tasks']])
+    
+    def test_archive_command_dry_run(self):
+        """Test that a dry run only counts the tasks to archive."""
+        output = StringIO()
+        call_command('archive_tasks', days=90, dry_run=True, stdout=output)
+        self.assertIn("3 tasks would be archived", output.getvalue())
+        self.assertFalse(ArchivedTask.objects.exists())
+
+
+class SchedulerTest(TestCase):
+    """Test cases for the scheduler and the overdue detection job."""
+    
+    def setUp(self):
+        """Capture tasks_overdue batches."""
+        self.batches = []
+        receiver = lambda sender, tasks, **kwargs: self.batches.append([task.title for task in tasks])
+        tasks_overdue.connect(receiver, sender=Task, weak=False, dispatch_uid='scheduler-test')
+        self.addCleanup(tasks_overdue.disconnect, sender=Task, dispatch_uid='scheduler-test')
+        self.start = timezone.now()
+    
+    def run_overdue_job(self, now):
+        state = claim(JOBS['detect_overdue'], 'test', now)
+        self.assertIsNotNone(state)
+        self.assertTrue(run_job(JOBS['detect_overdue'], state, now))
+    
+    def test_first_run_sets_watermark(self):
+        """Test that the first run reports nothing and records a watermark."""
+        Task.objects.create(title="Old", due_date=self.start - timedelta(days=1))
+        self.assertIn('detect_overdue', run_due_jobs(now=self.start))
+        self.assertEqual(self.batches, [])
+        self.assertEqual(ScheduledJob.objects.get(name='detect_overdue').watermark, self.start)
+    
+    @override_settings(TODOS_OVERDUE_BATCH_SIZE=2)
+    def test_newly_overdue_tasks_are_sent_in_batches(self):
+        """Test that only tasks due since the watermark are reported, in batches."""
+        self.run_overdue_job(self.start)
+        for minutes in (1, 2, 3):
+            Task.objects.create(title=f"Due {minutes}", due_date=self.start + timedelta(minutes=minutes))
+        Task.objects.create(title="Resolved", due_date=self.start + timedelta(minutes=1), is_resolved=True)
+        Task.objects.create(title="Later", due_date=self.start + timedelta(hours=1))
+        
+        self.run_overdue_job(self.start + timedelta(minutes=5))
+        self.assertEqual(self.batches, [["Due 1", "Due 2"], ["Due 3"]])
+        
+        self.batches.clear()
+        self.run_overdue_job(self.start + timedelta(minutes=10))
+        self.assertEqual(self.batches, [])
+    
+    def test_claim_is_exclusive(self):
+        """Test that a job being run or not yet due cannot be claimed again."""
+        job = JOBS['detect_overdue']
+        self.assertIsNotNone(claim(job, 'first', self.start))
+        self.assertIsNone(claim(job, 'second', self.start))
+        # An expired lease can be taken over.
+        self.assertIsNotNone(claim(job, 'second', self.start + timedelta(seconds=job.lease + 1)))
+    
+    def test_failing_job_records_error(self):
+        """Test that a failing job releases its lock and stores the error."""
+        def fail(watermark, now):
+            raise RuntimeError("boom")
+        job = Job('failing', fail, interval=60)
+        state = claim(job, 'test', self.start)
+        with self.assertLogs('todos.scheduler', 'ERROR'):
+            self.assertFalse(run_job(job, state, self.start))
+        state.refresh_from_db()
+        self.assertEqual(state.last_error, "RuntimeError: boom")
+        self.assertIsNone(state.locked_until)
+        self.assertEqual(state.next_run_at, self.start + timedelta(seconds=60))
+    
+    def test_result_dropped_after_lease_is_lost(self):
+        """Test that a job whose lease was re-claimed does not overwrite the new lease."""
+        job = Job('slow', lambda watermark, now: now, interval=60, lease=10)
+        state = claim(job, 'first', self.start)
+        later = self.start + timedelta(seconds=job.lease + 1)
+        self.assertIsNotNone(claim(job, 'second', later))
+        with self.assertLogs('todos.scheduler', 'WARNING'):
+            self.assertFalse(run_job(job, state, self.start))
+        current = ScheduledJob.objects.get(name='slow')
+        self.assertEqual(current.locked_by, 'second')
+        self.assertIsNone(current.watermark)
+    
+    @override_settings(TODOS_SCHEDULER_IN_PROCESS=True)
+    def test_scheduler_not_started_by_app_loading(self):
+        """Test that only the WSGI/ASGI entry points start the in-process scheduler."""
+        with patch('todos.scheduler.start_in_process') as start:
+            apps.get_app_config('todos').ready()
+            start.assert_not_called()
+            importlib.reload(importlib.import_module('todo_project.wsgi'))
+            start.assert_called_with()
+    
+    def test_run_scheduler_command(self):
+        """Test that run_scheduler --once runs the due jobs."""
+        output = StringIO()
+        call_command('run_scheduler', once=True, stdout=output)
+        self.assertIn('detect_overdue', output.getvalue())
+
+
+class DatabaseSettingsTest(TestCase):
+    """Test cases for the database connection profile."""
+    
+    def test_sqlite_pragmas(self):
+        """Test that SQLite connections run in WAL mode with relaxed syncing."""
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite profile only.")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 20000)
+
+
+INSTRUMENTED = {
+    'TODO_METRICS': True,
+    'MIDDLEWARE': ['todo_project.instrumentation.InstrumentationMiddleware', *settings.MIDDLEWARE],
+    'TEMPLATES': [{
+        **settings.TEMPLATES[0],
+        'BACKEND': 'todo_project.instrumentation.InstrumentedDjangoTemplates',
+    }],
+}
+
+
+@override_settings(**INSTRUMENTED)
+class InstrumentationTest(TestCase):
+    """Test cases for the opt-in request instrumentation."""
+    
+    def setUp(self):
+        """Start each test with empty histograms and cache."""
+        instrumentation.registry.reset()
+        get_cache().clear()
+        Task.objects.create(title="Measured task")
+    
+    def test_server_timing_header(self):
+        """Test that responses carry db, template, view and total timings."""
+        response = self.client.get(reverse('todos:task_list'))
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'view;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertNotIn('desc="0 queries"', timing)
+    
+    def test_metrics_endpoint_aggregates_requests(self):
+        """Test that the metrics endpoint exposes per-view histograms."""
+        self.client.get(reverse('todos:task_list'))
+        self.client.get(reverse('todos:task_list'))
+        response = self.client.get(reverse('metrics'))
+        body = response.content.decode()
+        self.assertIn('# TYPE todo_request_duration_ms histogram', body)
+        self.assertIn('todo_request_duration_ms_count{view="todos:task_list"} 2', body)
+        self.assertIn('todo_sql_queries_bucket{view="todos:task_list",le="+Inf"} 2', body)
+    
+    def test_async_views_are_measured(self):
+        """Test that queries run by async views are attributed to the request."""
+        with override_settings(ROOT_URLCONF='todos.tests'):
+            response = self.client.get('/')
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+    
+    def test_repeated_queries_are_logged(self):
+        """Test that one query shape executed many times is reported as N+1."""
+        metrics = instrumentation.RequestMetrics()
+        for pk in range(6):
+            metrics.record_query(f'SELECT * FROM "todos_task" WHERE "id" = {pk}', 0.001)
+        metrics.record_query('SELECT COUNT(*) FROM "todos_task"', 0.001)
+        repeated = metrics.repeated_queries(5)
+        self.assertEqual(repeated, [('SELECT * FROM "todos_task" WHERE "id" = ?', 6)])
+    
+    def test_sql_shape_collapses_placeholder_lists(self):
+        """Test that IN lists of different lengths share a shape."""
+        self.assertEqual(
+            instrumentation.sql_shape('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+            instrumentation.sql_shape('SELECT 1 FROM t WHERE id IN (%s)'),
+        )
+    
+    def test_metrics_disabled_by_default(self):
+        """Test that the metrics endpoint is hidden unless enabled."""
+        with override_settings(TODO_METRICS=False):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 404)
 
 
 class TaskURLTest(TestCase):
@@ -0,0 +1,200 @@
+"""Streaming export and chunked import of tasks as CSV or NDJSON.
+
+Exports read the database with ``.iterator()`` and yield text in chunks,
+so memory use stays flat however many tasks there are. Imports parse the
+input lazily, validate each record with the TaskForm rules and insert
+valid tasks in batched transactions.
+"""
+
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+
+from .bulk import bulk_create_tasks
+from .forms import TaskForm
+from .models import Task
+
+EXPORT_FIELDS = ['id', 'title', 'description', 'due_date', 'is_resolved', 'created_at', 'updated_at']
+
+
+def get_export_chunk_size():
+    return getattr(settings, 'TODOS_EXPORT_CHUNK_SIZE', 2000)
+
+
+class _Echo:
+    """File-like object whose write() returns the data, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+@dataclass
+class InvalidRecord:
+    """An input record that could not be parsed, yielded by a format's read()."""
+    message: str
+
+
+class CSVFormat:
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def __init__(self):
+        self._writer = csv.writer(_Echo())
+
+    def header(self):
+        return self._writer.writerow(EXPORT_FIELDS)
+
+    def encode(self, row):
+        return self._writer.writerow(
+            ['' if row[name] is None else _plain(row[name]) for name in EXPORT_FIELDS]
+        )
+
+    def read(self, stream):
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # The reader starts afresh on the next line.
+                yield InvalidRecord(f"Malformed CSV: {exc}")
+                continue
+            yield record
+
+
+class NDJSONFormat:
+    content_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def header(self):
+        return ''
+
+    def encode(self, row):
+        return json.dumps({name: _plain(value) for name, value in row.items()}) + '\n'
+
+    def read(self, stream):
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield InvalidRecord(f"Malformed JSON: {exc}")
+                continue
+            if isinstance(record, dict):
+                yield record
+            else:
+                yield InvalidRecord("Expected a JSON object.")
+
+
+FORMATS = {'csv': CSVFormat, 'ndjson': NDJSONFormat}
+
+
+def get_format(name):
+    """Return a format instance by name, raising ValueError for unknown names."""
+    try:
+        return FORMATS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown format {name!r}; choose from {', '.join(FORMATS)}.")
+
+
+def _export_rows(queryset):
+    # values() rather than values_list(): its iterable is lazy, which
+    # aiterator() needs to run the query off the event loop.
+    return queryset.order_by('pk').values(*EXPORT_FIELDS)
+
+
+def stream_export(queryset, format_name, chunk_size=None):
+    """Yield ``queryset`` serialized in ``format_name``, ``chunk_size`` rows per chunk."""
+    fmt = get_format(format_name)
+    chunk_size = chunk_size or get_export_chunk_size()
+    chunk = [fmt.header()]
+    for row in _export_rows(queryset).iterator(chunk_size=chunk_size):
+        chunk.append(fmt.encode(row))
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if any(chunk):
+        yield ''.join(chunk)
+
+
+async def astream_export(queryset, format_name, chunk_size=None):
+    """Async version of stream_export, for StreamingHttpResponse under ASGI."""
+    fmt = get_format(format_name)
+    chunk_size = chunk_size or get_export_chunk_size()
+    chunk = [fmt.header()]
+    async for row in _export_rows(queryset).aiterator(chunk_size=chunk_size):
+        chunk.append(fmt.encode(row))
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if any(chunk):
+        yield ''.join(chunk)
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+
+def _clean_record(record, fields):
+    """
+    Validate ``record`` with TaskForm's field rules and return (data, errors).
+
+    The form's fields are reused instead of building a TaskForm per record,
+    which copies every field and dominates the cost of large imports. Only
+    the per-field rules run: TaskForm.clean() and Task.clean() are skipped,
+    so cross-field checks added there must be added here as well.
+    """
+    if isinstance(record, InvalidRecord):
+        return {}, {NON_FIELD_ERRORS: [{'message': record.message, 'code': 'invalid'}]}
+    data, errors = {}, {}
+    for name, form_field in fields.items():
+        value = record.get(name)
+        try:
+            data[name] = form_field.clean(None if value == '' else value)
+        except ValidationError as exc:
+            errors[name] = [{'message': message, 'code': exc.code or ''} for message in exc.messages]
+    return data, errors
+
+
+def import_tasks(stream, format_name, batch_size=1000, dry_run=False):
+    """
+    Import tasks from a text stream.
+
+    Each record is validated with the TaskForm field rules; invalid and
+    unparsable records are reported in ``ImportResult.errors`` as
+    ``(record number, errors)`` and skipped. Valid tasks are inserted ``batch_size`` at a time, each batch
+    in its own transaction. Ids and timestamps in the input are ignored.
+    """
+    fields = TaskForm.base_fields
+    result = ImportResult()
+    batch = []
+    for number, record in enumerate(get_format(format_name).read(stream), start=1):
+        data, errors = _clean_record(record, fields)
+        if errors:
+            result.errors.append((number, errors))
+            continue
+        batch.append(Task(**data))
+        if len(batch) >= batch_size:
+            result.created += _insert(batch, dry_run)
+            batch = []
+    if batch:
+        result.created += _insert(batch, dry_run)
+    return result
+
+
+def _insert(tasks, dry_run):
+    if not dry_run:
+        bulk_create_tasks(tasks)
+    return len(tasks)
@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 app_name = 'todos'
@@ -9,5 +9,7 @@ urlpatterns = [
     path('<int:pk>/edit/', views.task_edit, name='task_edit'),
     path('<int:pk>/delete/', views.task_delete, name='task_delete'),
     path('<int:pk>/toggle/', views.task_toggle_resolved, name='task_toggle_resolved'),
+    path('export/', views.task_export, name='task_export'),
+    path('api/', include('todos.api.urls')),
 ]
 
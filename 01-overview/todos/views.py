@@ -1,30 +1,165 @@
+from django.http import Http404, QueryDict, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.template.loader import get_template, render_to_string
 from django.utils import timezone
-from .models import Task
+from django.views.decorators.http import condition
+from .models import ArchivedTask, Task
 from .forms import TaskForm
+from .bulk import toggle_resolved
+from .caching import (
+    card_cache_key, fragment_timeout, get_cache, get_card_cache_timeout, get_last_modified,
+    get_list_version, get_overdue_boundary, list_cache_key
+)
+from .pagination import InvalidCursor, KeysetPage, KeysetPaginator, get_page_size
+from .search import ranked_search
+from .stats import get_task_stats
+from .transfer import get_format, stream_export
 
 
-def task_list(request):
-    """Display a list of all tasks."""
-    tasks = Task.objects.all()
-    
-    # Filter options
-    filter_type = request.GET.get('filter', 'all')
-    if filter_type == 'active':
-        tasks = tasks.filter(is_resolved=False)
-    elif filter_type == 'completed':
-        tasks = tasks.filter(is_resolved=True)
-    elif filter_type == 'overdue':
-        tasks = [task for task in tasks if task.is_overdue()]
-    
+def _task_list_validators(request):
+    """
+    Return the (etag, last_modified) pair for the task list, once per request.
+
+    Pages carrying one-off flash messages must not be served from a browser
+    cache, so conditional handling is skipped for them.
+    """
+    if not hasattr(request, '_task_list_validators'):
+        if len(messages.get_messages(request)):
+            request._task_list_validators = (None, None)
+        else:
+            version = _list_version(request)
+            request._task_list_validators = _format_validators(
+                version.token, get_overdue_boundary(), get_last_modified(version)
+            )
+    return request._task_list_validators
+
+
+def _list_version(request):
+    """Return the task list version, read once per request."""
+    if not hasattr(request, '_task_list_version'):
+        request._task_list_version = get_list_version()
+    return request._task_list_version
+
+
+def _format_validators(token, overdue_boundary, last_modified):
+    etag = f'"{token}-{overdue_boundary.timestamp() if overdue_boundary else 0}"'
+    last_modified = max(filter(None, [last_modified, overdue_boundary]), default=None)
+    return etag, last_modified
+
+
+def _list_params(request):
+    """Return (filter_type, search_query, cursor, page_size) from the query string."""
+    return (
+        request.GET.get('filter', 'all'),
+        request.GET.get('q', '').strip(),
+        request.GET.get('cursor', ''),
+        get_page_size(request.GET.get('page_size')),
+    )
+
+
+def _list_rows(filter_type, now):
+    """Return the TaskRow queryset behind one of the task list filters."""
+    if filter_type == 'archived':
+        return ArchivedTask.objects.list_rows(now)
+    return Task.objects.for_filter(filter_type, now).list_rows(now)
+
+
+def _render_task_cards(tasks, archived=False):
+    """
+    Return the rendered card of each task, reusing cached cards.
+
+    Cards are fetched and stored with one cache round trip each, and only
+    the cards of tasks changed since they were cached are rendered again.
+    """
+    cache = get_cache()
+    keys = [card_cache_key(task, archived) for task in tasks]
+    cards = cache.get_many(keys)
+    missing = {}
+    template = get_template('todos/includes/task_card.html')
+    for key, task in zip(keys, tasks):
+        if key not in cards:
+            missing[key] = cards[key] = template.render({'task': task, 'archived': archived})
+    if missing:
+        cache.set_many(missing, get_card_cache_timeout())
+    return [cards[key] for key in keys]
+
+
+def _list_query(filter_type, search_query, page_size):
+    """
+    Return the query string of a task list page, without its cursor.
+
+    It is built from the same values as the cache key (left out when they
+    are the defaults), so a cached page never carries another visitor's
+    query parameters in its links.
+    """
+    query = QueryDict(mutable=True)
+    if filter_type != 'all':
+        query['filter'] = filter_type
+    if search_query:
+        query['q'] = search_query
+    if page_size != get_page_size(None):
+        query['page_size'] = page_size
+    return query
+
+
+def _render_list_fragment(page, filter_type, search_query, stats):
+    """
+    Render the cacheable part of the task list page.
+
+    It is rendered without the request, since the result is shared by every
+    request with the same cache key.
+    """
     context = {
-        'tasks': tasks,
+        'tasks': page.object_list,
+        'page': page,
         'filter_type': filter_type,
-        'total_tasks': Task.objects.count(),
-        'active_tasks': Task.objects.filter(is_resolved=False).count(),
-        'completed_tasks': Task.objects.filter(is_resolved=True).count(),
+        'search_query': search_query,
+        'total_tasks': stats['total'],
+        'active_tasks': stats['active'],
+        'completed_tasks': stats['completed'],
+        'overdue_tasks': stats['overdue'],
     }
+    cards = _render_task_cards(page.object_list, archived=filter_type == 'archived')
+    return {
+        'context': context,
+        'html': render_to_string('todos/includes/task_list_content.html', {
+            **context,
+            'task_cards': cards,
+            'list_query': _list_query(filter_type, search_query, page.page_size),
+        }),
+    }
+
+
+@condition(
+    etag_func=lambda request: _task_list_validators(request)[0],
+    last_modified_func=lambda request: _task_list_validators(request)[1],
+)
+def task_list(request):
+    """Display a page of tasks, newest first, using cursor pagination."""
+    filter_type, search_query, cursor, page_size = _list_params(request)
+    
+    cache = get_cache()
+    cache_key = list_cache_key(
+        _list_version(request).token, filter_type, search_query, cursor, page_size
+    )
+    cached = cache.get(cache_key)
+    if cached is None:
+        now = timezone.now()
+        tasks = _list_rows(filter_type, now)
+        if search_query:
+            # Search results are ranked by relevance, so only the best page is shown.
+            page = KeysetPage(ranked_search(tasks, search_query, page_size), page_size)
+        else:
+            try:
+                page = KeysetPaginator(tasks, page_size).get_page(cursor)
+            except InvalidCursor:
+                raise Http404("Invalid page cursor.")
+        
+        cached = _render_list_fragment(page, filter_type, search_query, get_task_stats(now))
+        cache.set(cache_key, cached, fragment_timeout(now))
+    
+    context = {**cached['context'], 'task_list_html': cached['html']}
     return render(request, 'todos/home.html', context)
 
 
@@ -52,7 +187,10 @@ def task_edit(request, pk):
     if request.method == 'POST':
         form = TaskForm(request.POST, instance=task)
         if form.is_valid():
-            task = form.save()
+            task = form.save(commit=False)
+            if form.changed_data:
+                # Only write the columns the user actually changed.
+                task.save(update_fields=[*form.changed_data, 'updated_at'])
             messages.success(request, f'Task "{task.title}" updated successfully!')
             return redirect('todos:task_list')
     else:
@@ -80,10 +218,34 @@ def task_delete(request, pk):
 
 def task_toggle_resolved(request, pk):
     """Toggle the resolved status of a task."""
-    task = get_object_or_404(Task, pk=pk)
-    task.is_resolved = not task.is_resolved
-    task.save()
+    result = toggle_resolved(pk)
+    if result is None:
+        raise Http404("No Task matches the given query.")
+    title, is_resolved = result
     
-    status = 'completed' if task.is_resolved else 'reopened'
-    messages.success(request, f'Task "{task.title}" marked as {status}!')
+    status = 'completed' if is_resolved else 'reopened'
+    messages.success(request, f'Task "{title}" marked as {status}!')
     return redirect('todos:task_list')
+
+
+def _export_params(request):
+    """Return the (format name, format, queryset) of an export request."""
+    format_name = request.GET.get('format', 'csv')
+    try:
+        fmt = get_format(format_name)
+    except ValueError as exc:
+        raise Http404(str(exc))
+    tasks = Task.objects.for_filter(request.GET.get('filter', 'all'), timezone.now())
+    return format_name, fmt, tasks
+
+
+def _export_response(streaming_content, fmt):
+    response = StreamingHttpResponse(streaming_content, content_type=fmt.content_type)
+    response['Content-Disposition'] = f'attachment; filename="tasks.{fmt.extension}"'
+    return response
+
+
+def task_export(request):
+    """Stream all tasks (optionally filtered) as CSV or NDJSON."""
+    format_name, fmt, tasks = _export_params(request)
+    return _export_response(stream_export(tasks, format_name), fmt)
@@ -0,0 +1,57 @@
+"""Benchmark how long the documentation index takes to become searchable.
+
+Compares fitting the index from the zip file with loading it from the
+on-disk cache:
+
+    python benchmark_startup.py [path/to/fastmcp-main.zip]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from index_cache import cache_key, load_index, save_index
+from search import create_index, extract_and_process_files, search_documents, split_documents
+
+
+def timed(func, repeat: int = 3) -> tuple[float, object]:
+    """Run func repeat times and return (median seconds, last result)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    """Time building, saving and loading the index, and a first search."""
+    zip_path = sys.argv[1] if len(sys.argv) > 1 else "fastmcp-main.zip"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = Path(cache_dir) / "index"
+
+        key_time, _ = timed(lambda: cache_key(zip_path))
+        build_time, index = timed(
+            lambda: create_index(split_documents(extract_and_process_files(zip_path))),
+            repeat=1,
+        )
+        save_time, _ = timed(lambda: save_index(index, cache_path), repeat=1)
+        load_time, loaded = timed(lambda: load_index(cache_path))
+        read_time, _ = timed(lambda: load_index(cache_path, mmap=False))
+        search_time, _ = timed(lambda: search_documents(loaded, "getting started"))
+
+    print("=" * 60)
+    print(f"Hash zip file (cache key):  {key_time * 1000:10.1f} ms")
+    print(f"Extract and fit index:      {build_time * 1000:10.1f} ms")
+    print(f"Save index to cache:        {save_time * 1000:10.1f} ms")
+    print(f"Load cache (memory-mapped): {load_time * 1000:10.1f} ms")
+    print(f"Load cache (read fully):    {read_time * 1000:10.1f} ms")
+    print(f"Search on loaded index:     {search_time * 1000:10.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
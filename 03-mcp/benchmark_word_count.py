@@ -0,0 +1,93 @@
+"""Benchmark word counting on multi-megabyte texts.
+
+Compares the old approach (lowercase the whole text, then str.count once
+per word) with the streaming WordCounter:
+
+    python benchmark_word_count.py [size in MB ...]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from word_count import SUBSTRING, WORD, WordCounter, iter_chunks
+
+VOCABULARY = [
+    "data", "Data", "database", "big-data", "metadata", "engineering", "the",
+    "pipeline", "club", "course", "zoomcamp", "learning", "machine", "model",
+    "analytics", "and", "of", "to", "in", "with",
+]
+TEN_WORDS = ["data", "database", "metadata", "engineering", "pipeline",
+             "club", "course", "zoomcamp", "model", "analytics"]
+
+
+def make_text(size_mb: float, seed: int = 42) -> str:
+    """Generate roughly size_mb megabytes of text from VOCABULARY."""
+    rng = random.Random(seed)
+    words = rng.choices(VOCABULARY, k=int(size_mb * 1024 * 1024 / 7))
+    return " ".join(words)
+
+
+def count_with_str_count(text: str, words: list[str]) -> dict[str, int]:
+    """The previous count_word_occurrences(), applied to each word."""
+    text_lower = text.lower()
+    return {word: text_lower.count(word.lower()) for word in words}
+
+
+def count_streaming(text: str, words: list[str] | None, mode: str) -> dict[str, int]:
+    counter = WordCounter(words, mode)
+    for chunk in iter_chunks(text, 1024 * 1024):
+        counter.feed(chunk)
+    counter.finish()
+    return counter.counts()
+
+
+def measure(func) -> tuple[float, float]:
+    """
+    Return (seconds, peak traced MB) of func.
+
+    The time comes from an untraced call, since tracing slows allocation
+    heavy code down.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    """Time each counting approach on generated texts."""
+    sizes = [float(size) for size in sys.argv[1:]] or [5, 20]
+
+    cases = [
+        ("str.count, 1 word", lambda text: count_with_str_count(text, ["data"])),
+        ("str.count, 10 words", lambda text: count_with_str_count(text, TEN_WORDS)),
+        ("substring, 1 word", lambda text: count_streaming(text, ["data"], SUBSTRING)),
+        ("substring, 10 words", lambda text: count_streaming(text, TEN_WORDS, SUBSTRING)),
+        ("whole words, 1 word", lambda text: count_streaming(text, ["data"], WORD)),
+        ("whole words, 10 words", lambda text: count_streaming(text, TEN_WORDS, WORD)),
+        ("whole words, vocabulary", lambda text: count_streaming(text, None, WORD)),
+    ]
+
+    for size in sizes:
+        text = make_text(size)
+        megabytes = len(text) / 1024 / 1024
+        print("=" * 60)
+        print(f"{megabytes:.1f} MB of text")
+        print("-" * 60)
+        for name, func in cases:
+            elapsed, peak = measure(lambda: func(text))
+            print(f"{name:<24} {elapsed * 1000:8.1f} ms {megabytes / elapsed:7.1f} MB/s "
+                  f"{peak:7.1f} MB peak")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
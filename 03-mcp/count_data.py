@@ -1,26 +1,7 @@
 """Count occurrences of 'data' on a web page."""
 
-from web_downloader import download_webpage
-
-
-def count_word_occurrences(text: str, word: str) -> int:
-    """
-    Count case-insensitive occurrences of a word in text.
-    
-    Args:
-        text: The text to search in
-        word: The word to count
-    
-    Returns:
-        The number of occurrences
-    """
-    # Convert to lowercase for case-insensitive matching
-    text_lower = text.lower()
-    word_lower = word.lower()
-    
-    # Count occurrences
-    count = text_lower.count(word_lower)
-    return count
+from web_downloader import stream_webpage
+from word_count import SUBSTRING, WordCounter
 
 
 def main():
@@ -31,14 +12,32 @@ def main():
     print("=" * 60)
     
     try:
-        # Download the webpage content
-        content = download_webpage(url)
+        # Count whole words and substrings in one pass over the page
+        words = WordCounter(["data"])
+        substrings = WordCounter(["data"], mode=SUBSTRING)
+        length = 0
+        chunks = stream_webpage(url)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as stop:
+                # The stream returns whether the page was cut
+                truncated = stop.value
+                break
+            length += len(chunk)
+            words.feed(chunk)
+            substrings.feed(chunk)
+        words.finish()
+        substrings.finish()
         
-        # Count occurrences of "data"
-        count = count_word_occurrences(content, "data")
+        count = words.counts()["data"]
+        substring_count = substrings.counts()["data"]
         
-        print(f"Successfully downloaded {len(content)} characters")
+        print(f"Successfully downloaded {length} characters")
+        if truncated:
+            print("The page was cut at the download size limit; only the first part was counted")
         print(f"\nThe word 'data' appears {count} times (case-insensitive)")
+        print(f"'data' appears {substring_count} times including longer words such as 'database'")
         print("=" * 60)
         
     except Exception as e:
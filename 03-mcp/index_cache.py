@@ -0,0 +1,193 @@
+"""On-disk cache for the fitted documentation search index."""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from minsearch import Index
+from scipy import sparse
+
+# Bump when the cache layout or the way documents are indexed changes.
+CACHE_FORMAT_VERSION = 3
+
+DEFAULT_CACHE_DIR = ".index_cache"
+
+_MATRIX_PARTS = ("data", "indices", "indptr")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash a file without reading it into memory at once.
+
+    Args:
+        path: Path to the file
+        chunk_size: Number of bytes read at a time
+
+    Returns:
+        The hex SHA-256 digest of the file
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _package_version(name: str) -> str:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def cache_key(zip_path: str) -> str:
+    """
+    Build the cache key of the index built from a zip file.
+
+    The key changes when the archive changes, when the cache format changes
+    and when minsearch or scikit-learn are upgraded, since the fitted
+    vectorizers are stored as pickles.
+
+    Args:
+        zip_path: Path to the documentation zip file
+
+    Returns:
+        A short hex string identifying the index
+    """
+    parts = [
+        file_sha256(zip_path),
+        str(CACHE_FORMAT_VERSION),
+        _package_version("minsearch"),
+        _package_version("scikit-learn"),
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+
+def save_index(index: Index, cache_path: str) -> None:
+    """
+    Write a fitted index to a cache directory.
+
+    The index object (vectorizers, documents, filters) is pickled without
+    its TF-IDF matrices, which are stored as .npy arrays so that loading
+    can memory-map them. The directory is written under a temporary name
+    and renamed, so a half-written cache is never read.
+
+    Args:
+        index: The fitted minsearch Index
+        cache_path: Directory to create
+    """
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(tempfile.mkdtemp(prefix=".tmp-", dir=cache_path.parent))
+    try:
+        matrices = index.text_matrices
+        index.text_matrices = {}
+        try:
+            with open(tmp_path / "index.pkl", 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            index.text_matrices = matrices
+
+        fields = []
+        for i, (field, matrix) in enumerate(matrices.items()):
+            matrix = sparse.csr_matrix(matrix)
+            for part in _MATRIX_PARTS:
+                np.save(tmp_path / f"{i}.{part}.npy", getattr(matrix, part))
+            fields.append({"name": field, "shape": list(matrix.shape)})
+
+        meta = {"format_version": CACHE_FORMAT_VERSION, "fields": fields}
+        (tmp_path / "meta.json").write_text(json.dumps(meta))
+
+        try:
+            os.rename(tmp_path, cache_path)
+        except OSError:
+            # Another process stored the same index first.
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+
+def load_index(cache_path: str, mmap: bool = True) -> Index | None:
+    """
+    Load an index written by save_index().
+
+    Args:
+        cache_path: The cache directory
+        mmap: Memory-map the TF-IDF matrices instead of reading them
+
+    Returns:
+        The Index, or None if the cache is missing or was written by an
+        incompatible version
+    """
+    cache_path = Path(cache_path)
+    try:
+        meta = json.loads((cache_path / "meta.json").read_text())
+        if meta.get("format_version") != CACHE_FORMAT_VERSION:
+            return None
+
+        with open(cache_path / "index.pkl", 'rb') as f:
+            index = pickle.load(f)
+
+        # Copy-on-write mapping: pages are shared between processes and
+        # only read from disk when a search touches them.
+        mmap_mode = "c" if mmap else None
+        for i, field in enumerate(meta["fields"]):
+            data, indices, indptr = (
+                np.load(cache_path / f"{i}.{part}.npy", mmap_mode=mmap_mode)
+                for part in _MATRIX_PARTS
+            )
+            index.text_matrices[field["name"]] = sparse.csr_matrix(
+                (data, indices, indptr), shape=tuple(field["shape"]), copy=False
+            )
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+    return index
+
+
+def load_or_build_index(
+    zip_path: str,
+    build: Callable[[], Index],
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> Index:
+    """
+    Return the cached index for a zip file, building and caching it if needed.
+
+    A cache that cannot be loaded is replaced, and caches of other versions
+    of the archive are removed after a rebuild.
+
+    Args:
+        zip_path: Path to the documentation zip file
+        build: Function returning a freshly fitted Index
+        cache_dir: Directory holding the cached indexes
+
+    Returns:
+        The minsearch Index
+    """
+    cache_path = Path(cache_dir) / cache_key(zip_path)
+
+    index = load_index(cache_path)
+    if index is not None:
+        print(f"Loaded search index from {cache_path}")
+        return index
+
+    # A corrupt or incompatible cache would stop save_index() from
+    # replacing it, so the index would be rebuilt on every start.
+    shutil.rmtree(cache_path, ignore_errors=True)
+    index = build()
+    save_index(index, cache_path)
+    print(f"Saved search index to {cache_path}")
+
+    for path in Path(cache_dir).iterdir():
+        if path != cache_path and not path.name.startswith(".tmp-"):
+            shutil.rmtree(path, ignore_errors=True)
+
+    return index
@@ -1,34 +1,71 @@
 """FastMCP server for web page content downloading and documentation search."""
 
-from fastmcp import FastMCP
-import requests
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+
+from fastmcp import Context, FastMCP
+from fastmcp.exceptions import ToolError
 from minsearch import Index
 from search import (
     download_zip_if_needed,
     extract_and_process_files,
     create_index,
+    split_documents,
     search_documents as search_docs,
 )
+from index_cache import load_or_build_index
+from page_cache import get_page_cache
+from web_downloader import (
+    MAX_CONCURRENCY,
+    adownload_webpage,
+    feed_chunks,
+    iter_download_webpages,
+    select_text,
+    stream_webpage,
+    unique_urls,
+)
+from word_count import WORD, WordCounter
 
 mcp = FastMCP("Web Scraper & Documentation Search 🕷️📚")
 
-# Cache for the documentation index
-_documentation_index: Index | None = None
+# The documentation index, built once in a background thread. The lock
+# makes sure concurrent callers share one build instead of racing.
+_index_lock = threading.Lock()
+_index_future: Future | None = None
 
+# Most URLs accepted by one download_webpages call
+MAX_BATCH_URLS = 100
 
-def get_documentation_index() -> Index:
-    """
-    Get or create the FastMCP documentation search index.
-    Downloads and indexes the documentation if not already done.
+# Most bytes of a page read by count_words. Counting streams the page in
+# chunks, so this bounds the work rather than the memory.
+COUNT_MAX_BYTES = 50 * 1024 * 1024
+
+# Seconds a search waits for the index before reporting it is still warming up
+INDEX_WAIT_TIMEOUT = float(os.environ.get("DOCS_INDEX_WAIT_TIMEOUT", "30"))
+
+
+def _build_documentation_index(zip_path: str) -> Index:
+    """Extract the documentation from the zip file and fit a new index."""
+    # Extract and process files
+    documents = extract_and_process_files(zip_path)
     
-    Returns:
-        The minsearch Index object for FastMCP documentation
-    """
-    global _documentation_index
+    if not documents:
+        raise ValueError("No documents found to index!")
     
-    if _documentation_index is not None:
-        return _documentation_index
+    # Split into passages and create index
+    return create_index(split_documents(documents))
+
+
+def _load_documentation_index() -> Index:
+    """
+    Download the documentation if needed and load or build its index.
     
+    The fitted index is cached on disk (see index_cache.py), keyed by the
+    hash of the zip file, so later server starts load it instead of
+    refitting it.
+    """
     # Configuration
     zip_url = "https://github.com/jlowin/fastmcp/archive/refs/heads/main.zip"
     zip_path = "fastmcp-main.zip"
@@ -36,20 +73,107 @@ def get_documentation_index() -> Index:
     # Download zip if needed
     download_zip_if_needed(zip_url, zip_path)
     
-    # Extract and process files
-    documents = extract_and_process_files(zip_path)
+    # Load the cached index, or build and cache it
+    return load_or_build_index(
+        zip_path, lambda: _build_documentation_index(zip_path)
+    )
+
+
+def start_index_warmup() -> Future:
+    """
+    Start building the documentation index in a background thread.
     
-    if not documents:
-        raise ValueError("No documents found to index!")
+    Only one build runs at a time: every caller gets the same future. If
+    the build fails, the next call starts a new one.
+    
+    Returns:
+        A future resolving to the minsearch Index
+    """
+    global _index_future
+    
+    with _index_lock:
+        if _index_future is None or (
+            _index_future.done() and _index_future.exception() is not None
+        ):
+            _index_future = Future()
+            # Mark the future as running so a caller that stops waiting
+            # cannot cancel the build for everyone else.
+            _index_future.set_running_or_notify_cancel()
+            threading.Thread(
+                target=_warm_up_index,
+                args=(_index_future,),
+                name="documentation-index-warmup",
+                daemon=True,
+            ).start()
+        return _index_future
+
+
+def _warm_up_index(future: Future) -> None:
+    # A failed future stays in place, so its error is reported until the
+    # next caller starts a new build.
+    try:
+        index = _load_documentation_index()
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(index)
+
+
+def get_documentation_index(timeout: float | None = None) -> Index:
+    """
+    Get or create the FastMCP documentation search index.
+    Downloads and indexes the documentation if not already done.
+    
+    Args:
+        timeout: Seconds to wait for an index that is still being built
+            (default: wait until it is ready)
     
-    # Create index
-    _documentation_index = create_index(documents)
+    Returns:
+        The minsearch Index object for FastMCP documentation
     
-    return _documentation_index
+    Raises:
+        concurrent.futures.TimeoutError: If the index is not ready in time
+    """
+    return start_index_warmup().result(timeout)
+
+
+async def _await_documentation_index(timeout: float) -> Index:
+    """Wait for the index without blocking the event loop."""
+    future = start_index_warmup()
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        raise ToolError(
+            "The documentation index is still warming up, please try again shortly."
+        )
+
+
+def _documentation_index_status_impl() -> dict:
+    """
+    Report the state of the documentation index.
+    
+    Returns:
+        A dictionary with "status" ("not_started", "warming", "ready" or
+        "failed") and "error" (the failure message, if any)
+    """
+    with _index_lock:
+        future = _index_future
+    if future is None:
+        return {"status": "not_started", "error": None}
+    if not future.done():
+        return {"status": "warming", "error": None}
+    if future.exception() is not None:
+        return {"status": "failed", "error": str(future.exception())}
+    return {"status": "ready", "error": None}
 
 
 @mcp.tool
-def download_webpage(url: str) -> str:
+async def download_webpage(
+    url: str,
+    offset: int = 0,
+    max_chars: int | None = None,
+    section: str | None = None,
+) -> str:
     """
     Download content of a web page using Jina Reader.
     
@@ -57,8 +181,16 @@ def download_webpage(url: str) -> str:
     For example, to download http://datatalks.club, 
     visit https://r.jina.ai/https://datatalks.club.
     
+    Large pages are cut after a size limit (2 MB by default) and end with a
+    truncation marker. Use max_chars to read a page in smaller pieces, or
+    section to get only the part under one heading.
+    
     Args:
         url: The URL of the web page to download (e.g., "https://datatalks.club")
+        offset: Index of the first character to return (default: 0)
+        max_chars: Characters to return at most (default: all); the text then
+            ends with the offset to continue from
+        section: Only return the section whose heading contains this text
     
     Returns:
         The content of the web page as a string (markdown format from Jina Reader)
@@ -66,14 +198,140 @@ def download_webpage(url: str) -> str:
     Raises:
         requests.RequestException: If the request fails
     """
-    # Construct the Jina Reader URL by prepending r.jina.ai
-    jina_url = f"https://r.jina.ai/{url}"
+    # The pooled session (see web_downloader.py) is blocking, so the
+    # request runs in a worker thread and other tool calls keep running.
+    content = await adownload_webpage(url)
+    try:
+        return select_text(content, offset, max_chars, section)
+    except ValueError as e:
+        raise ToolError(str(e))
+
+
+@mcp.tool
+async def download_webpages(
+    urls: list[str],
+    ctx: Context,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_chars_per_page: int | None = None,
+) -> list[dict]:
+    """
+    Download the content of several web pages in parallel using Jina Reader.
+    
+    Prefer this over repeated download_webpage calls when fetching many
+    pages. Repeated URLs are downloaded once, and requests to the same site
+    within this call are limited. Progress is reported as each page
+    completes.
+    
+    Args:
+        urls: The URLs of the web pages to download (at most 100)
+        max_concurrency: Number of pages downloaded at the same time (default: 8)
+        max_chars_per_page: Characters of each page to return at most
+            (default: all, up to the download size limit)
+    
+    Returns:
+        One dictionary per distinct URL, in the order given, with:
+        - url: The requested URL
+        - status: "ok" or "error"
+        - content: The page content (markdown), or None on error
+        - error: The error message, or None
+        - http_status: The HTTP status code, if a response was received
+          (None for pages served from the cache)
+        - elapsed_ms: Download time in milliseconds
+    """
+    urls = unique_urls(urls)
+    if len(urls) > MAX_BATCH_URLS:
+        raise ToolError(f"At most {MAX_BATCH_URLS} URLs can be downloaded per call.")
+    
+    results = {}
+    async for result in iter_download_webpages(urls, max_concurrency=max_concurrency):
+        if result["content"] is not None and max_chars_per_page is not None:
+            result["content"] = select_text(result["content"], max_chars=max_chars_per_page)
+        results[result["url"]] = result
+        await ctx.report_progress(
+            len(results), len(urls), f"{result['url']}: {result['status']}"
+        )
+    
+    return [results[url] for url in urls]
+
+
+def _count_words_impl(url: str, words: list[str] | None, mode: str,
+                      case_sensitive: bool, top: int) -> dict:
+    """
+    Internal implementation of word counting.
     
-    # Make the request
-    response = requests.get(jina_url)
-    response.raise_for_status()  # Raise an exception for bad status codes
+    Returns:
+        A dictionary with the counts, the number of words on the page and
+        whether the page was cut
+    """
+    counter = WordCounter(words, mode, case_sensitive)
+    truncated = feed_chunks(stream_webpage(url, max_bytes=COUNT_MAX_BYTES), counter.feed)
+    counter.finish()
     
-    return response.text
+    counts = counter.counts() if words else dict(counter.most_common(top))
+    return {
+        "url": url,
+        "mode": mode,
+        "counts": counts,
+        "total_words": counter.total_words if mode == WORD else None,
+        "truncated": truncated,
+    }
+
+
+@mcp.tool
+async def count_words(
+    url: str,
+    words: list[str] | None = None,
+    mode: str = WORD,
+    case_sensitive: bool = False,
+    top: int = 20,
+) -> dict:
+    """
+    Count how often words appear on a web page.
+    
+    The page is downloaded with Jina Reader and counted while it streams,
+    in a single pass however many words are counted.
+    
+    Args:
+        url: The URL of the web page (e.g., "https://datatalks.club")
+        words: The words to count (default: report the most frequent words)
+        mode: "word" to count whole words only ("data" does not match
+            "database") or "substring" to count every occurrence
+        case_sensitive: Count "Data" and "data" separately (default: False)
+        top: Number of most frequent words reported when words is not given
+    
+    Returns:
+        A dictionary with:
+        - url: The requested URL
+        - mode: The counting mode
+        - counts: Each word and its number of occurrences
+        - total_words: Number of words on the page (word mode only)
+        - truncated: True if the page was too large to count completely
+    """
+    try:
+        return await asyncio.to_thread(
+            _count_words_impl, url, words, mode, case_sensitive, max(1, top)
+        )
+    except ValueError as e:
+        raise ToolError(str(e))
+
+
+@mcp.tool
+def web_cache_stats() -> dict:
+    """
+    Report how well the downloaded page cache is working.
+    
+    Pages downloaded by download_webpage are cached on disk, so repeated
+    downloads of the same URL are served without a request.
+    
+    Returns:
+        A dictionary with the lookup counters (hits, stale, misses,
+        revalidated), the number of cached pages and the cache size in
+        bytes, or {"enabled": False} if caching is turned off
+    """
+    cache = get_page_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
 
 
 def _search_documentation_impl(query: str, num_results: int = 5) -> list[dict]:
@@ -99,31 +357,29 @@ def _search_documentation_impl(query: str, num_results: int = 5) -> list[dict]:
     # Format results for return
     formatted_results = []
     for result in results:
-        if isinstance(result, dict):
-            formatted_results.append({
-                "filename": result.get("filename", "Unknown"),
-                "content": result.get("content", ""),
-                "score": result.get("score", result.get("_score", 0)),
-            })
-        else:
-            # Handle non-dict results
-            formatted_results.append({
-                "filename": getattr(result, "filename", "Unknown"),
-                "content": getattr(result, "content", ""),
-                "score": getattr(result, "score", getattr(result, "_score", 0)),
-            })
+        formatted_results.append({
+            "filename": result["filename"],
+            "section": result["section"],
+            "start": result["start"],
+            "end": result["end"],
+            "snippet": result["snippet"],
+            "content": result["content"],
+            "score": result.get("score", result.get("_score", 0)),
+        })
     
     return formatted_results
 
 
 @mcp.tool
-def search_documentation(query: str, num_results: int = 5) -> list[dict]:
+async def search_documentation(query: str, num_results: int = 5) -> list[dict]:
     """
     Search the FastMCP documentation for relevant documents.
     
     This tool searches through the FastMCP documentation (downloaded from GitHub)
-    and returns the most relevant documents matching your query. The documentation
-    is automatically downloaded and indexed on first use.
+    and returns the most relevant passages matching your query. Documents are
+    split into passages at their headings, so each result is a short excerpt
+    rather than a whole file. The documentation is downloaded and indexed
+    when the server starts.
     
     Args:
         query: The search query string (e.g., "getting started", "MCP server", "tools")
@@ -132,14 +388,35 @@ def search_documentation(query: str, num_results: int = 5) -> list[dict]:
     Returns:
         A list of dictionaries containing search results. Each result includes:
         - filename: The path to the documentation file
-        - content: The text content of the file
+        - section: The headings the passage is under (e.g. "Tools > Arguments")
+        - start, end: Character offsets of the passage in the file
+        - snippet: The best matching part of the passage, query terms in **bold**
+        - content: The text of the passage
         - score: Relevance score (if available)
     
     Example:
-        search_documentation("how to create a tool") -> Returns top 5 relevant docs
+        search_documentation("how to create a tool") -> Returns top 5 relevant passages
+    """
+    await _await_documentation_index(INDEX_WAIT_TIMEOUT)
+    return await asyncio.to_thread(_search_documentation_impl, query, num_results)
+
+
+@mcp.tool
+def documentation_index_status() -> dict:
+    """
+    Report whether the documentation search index is ready.
+    
+    The index is built in the background when the server starts. While its
+    status is "warming", search_documentation waits for it for a limited
+    time and then asks to retry.
+    
+    Returns:
+        A dictionary with "status" ("not_started", "warming", "ready" or
+        "failed") and "error" (the failure message, if any)
     """
-    return _search_documentation_impl(query, num_results)
+    return _documentation_index_status_impl()
 
 
 if __name__ == "__main__":
+    start_index_warmup()
     mcp.run()
@@ -0,0 +1,380 @@
+"""Persistent cache of downloaded web pages, stored in SQLite."""
+
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Cache file shared by the MCP server and the standalone scripts; an empty
+# value disables caching.
+DEFAULT_PATH = os.environ.get("WEB_CACHE_PATH", ".web_cache.sqlite3")
+
+# Seconds a page is served without asking the server again
+DEFAULT_TTL = float(os.environ.get("WEB_CACHE_TTL", "3600"))
+
+# Compressed size above which the least recently used pages are evicted
+DEFAULT_MAX_BYTES = int(os.environ.get("WEB_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Lookups only update access times and counters, which are kept in memory
+# and written in one transaction after this many lookups or seconds.
+FLUSH_EVERY = 64
+FLUSH_INTERVAL = 5.0
+
+# Row of the stats table holding the total size of the stored bodies
+_SIZE_KEY = "size_bytes"
+
+# Rows deleted per statement, below SQLite's bound parameter limit
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    body_hash TEXT NOT NULL REFERENCES bodies (hash),
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+CREATE INDEX IF NOT EXISTS pages_body_hash ON pages (body_hash);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that equivalent spellings share one cache entry.
+
+    The scheme and host are lowercased, default ports, fragments and
+    trailing "?" are dropped, an empty path becomes "/" and query
+    parameters are sorted.
+
+    Args:
+        url: The URL to normalize
+
+    Returns:
+        The normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+@dataclass
+class CachedPage:
+    """A cached page and the validators needed to revalidate it."""
+    url: str
+    content: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+
+class PageCache:
+    """
+    Cache of page contents keyed by normalized URL.
+
+    Bodies are stored zlib-compressed under the SHA-256 of their content,
+    so pages with identical content are stored once. The cache can be
+    shared by several processes.
+
+    The total size of the bodies is kept in the stats table and updated
+    with every write, so eviction never has to add up the whole cache.
+    Access times and lookup counters are buffered in memory and written
+    in batches (see FLUSH_EVERY); an unflushed batch only affects LRU
+    order and statistics.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # The running total updated by _add_size() starts at zero.
+        self._conn.execute(
+            "INSERT OR IGNORE INTO stats (name, value) VALUES (?, 0)", (_SIZE_KEY,)
+        )
+        self._pending_access = {}
+        self._pending_counts = {}
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush()
+            self._conn.close()
+            self._conn = None
+
+    def get(self, url: str) -> CachedPage | None:
+        """
+        Return the cached page for a URL, fresh or not.
+
+        Counts a hit for a fresh page, a stale lookup for an expired one
+        (which the caller should revalidate) and a miss otherwise.
+
+        Args:
+            url: The page URL
+
+        Returns:
+            The CachedPage, or None if the URL is not cached
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT bodies.data, pages.etag, pages.last_modified, pages.fetched_at "
+                "FROM pages JOIN bodies ON bodies.hash = pages.body_hash "
+                "WHERE pages.url = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                page = None
+            else:
+                page = CachedPage(key, zlib.decompress(row[0]).decode("utf-8"), *row[1:])
+                self._pending_access[key] = time.time()
+                self._count("hits" if page.is_fresh(self.ttl) else "stale")
+            if (sum(self._pending_counts.values()) >= FLUSH_EVERY
+                    or time.monotonic() - self._last_flush >= FLUSH_INTERVAL):
+                self._flush()
+        return page
+
+    def put(self, url: str, content: str, etag: str | None = None,
+            last_modified: str | None = None) -> None:
+        """
+        Store the content of a page, evicting old pages if the cache is full.
+
+        Args:
+            url: The page URL
+            content: The page content
+            etag: The ETag response header, if any
+            last_modified: The Last-Modified response header, if any
+        """
+        key = normalize_url(url)
+        body = content.encode("utf-8")
+        body_hash = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_pending()
+                old = self._conn.execute(
+                    "SELECT body_hash FROM pages WHERE url = ?", (key,)
+                ).fetchone()
+                if self._conn.execute(
+                    "SELECT 1 FROM bodies WHERE hash = ?", (body_hash,)
+                ).fetchone() is None:
+                    data = zlib.compress(body)
+                    self._conn.execute(
+                        "INSERT INTO bodies (hash, data, size) VALUES (?, ?, ?)",
+                        (body_hash, data, len(data)),
+                    )
+                    self._add_size(len(data))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages "
+                    "(url, body_hash, etag, last_modified, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, body_hash, etag, last_modified, now, now),
+                )
+                if old and old[0] != body_hash:
+                    self._delete_orphan_bodies([old[0]])
+                self._evict()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def refresh(self, url: str) -> None:
+        """
+        Mark a cached page as fresh again after a 304 Not Modified response.
+
+        Args:
+            url: The page URL
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop(key, None)
+            self._count("revalidated")
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                    (now, now, key),
+                )
+                self._write_pending()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> dict:
+        """
+        Return cache usage statistics.
+
+        Returns:
+            A dictionary with the lookup counters (hits, stale, misses,
+            revalidated), the number of pages and bodies, and the stored
+            (compressed) size in bytes
+        """
+        with self._lock:
+            self._flush()
+            counters = dict(self._conn.execute("SELECT name, value FROM stats"))
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            bodies = self._conn.execute("SELECT COUNT(*) FROM bodies").fetchone()[0]
+        return {
+            "hits": counters.get("hits", 0),
+            "stale": counters.get("stale", 0),
+            "misses": counters.get("misses", 0),
+            "revalidated": counters.get("revalidated", 0),
+            "pages": pages,
+            "bodies": bodies,
+            "size_bytes": counters.get(_SIZE_KEY, 0),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        """Remove every page and reset the statistics."""
+        with self._lock:
+            self._pending_access.clear()
+            self._pending_counts.clear()
+            self._conn.executescript(
+                "BEGIN; DELETE FROM pages; DELETE FROM bodies; DELETE FROM stats;"
+                f"INSERT INTO stats (name, value) VALUES ('{_SIZE_KEY}', 0); COMMIT;"
+            )
+
+    def _count(self, name: str) -> None:
+        self._pending_counts[name] = self._pending_counts.get(name, 0) + 1
+
+    def _flush(self) -> None:
+        """Write the buffered access times and counters in one transaction."""
+        self._last_flush = time.monotonic()
+        if not self._pending_access and not self._pending_counts:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_pending()
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _write_pending(self) -> None:
+        # Another process may have read the page more recently.
+        self._conn.executemany(
+            "UPDATE pages SET accessed_at = MAX(accessed_at, ?) WHERE url = ?",
+            [(accessed_at, url) for url, accessed_at in self._pending_access.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            list(self._pending_counts.items()),
+        )
+        self._pending_access.clear()
+        self._pending_counts.clear()
+
+    def _add_size(self, delta: int) -> None:
+        self._conn.execute(
+            "UPDATE stats SET value = value + ? WHERE name = ?", (delta, _SIZE_KEY)
+        )
+
+    def _size(self) -> int:
+        row = self._conn.execute(
+            "SELECT value FROM stats WHERE name = ?", (_SIZE_KEY,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _delete_orphan_bodies(self, hashes: list[str]) -> None:
+        """Delete those of the given bodies that no page refers to any more."""
+        placeholders = ", ".join("?" * len(hashes))
+        orphans = (
+            f"FROM bodies WHERE hash IN ({placeholders}) AND NOT EXISTS "
+            "(SELECT 1 FROM pages WHERE pages.body_hash = bodies.hash)"
+        )
+        freed = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) {orphans}", hashes).fetchone()[0]
+        if freed:
+            self._conn.execute(f"DELETE {orphans}", hashes)
+            self._add_size(-freed)
+
+    def _evict(self) -> None:
+        # Drop least recently used pages until the bodies fit. The pages
+        # are collected in one ordered scan and deleted together; the page
+        # just written is the most recent, so it is evicted last. A body
+        # shared with a page that is kept is not freed, hence the loop.
+        while (excess := self._size() - self.max_bytes) > 0:
+            urls, hashes, freed = [], set(), 0
+            for url, body_hash, size in self._conn.execute(
+                "SELECT pages.url, pages.body_hash, bodies.size "
+                "FROM pages JOIN bodies ON bodies.hash = pages.body_hash "
+                "ORDER BY pages.accessed_at"
+            ):
+                urls.append(url)
+                if body_hash not in hashes:
+                    hashes.add(body_hash)
+                    freed += size
+                if freed >= excess:
+                    break
+            if not urls:
+                return
+            # Delete in slices that stay below SQLite's bound parameter limit.
+            hashes = list(hashes)
+            for start in range(0, len(urls), _BATCH):
+                batch = urls[start:start + _BATCH]
+                self._conn.execute(
+                    f"DELETE FROM pages WHERE url IN ({', '.join('?' * len(batch))})", batch
+                )
+            for start in range(0, len(hashes), _BATCH):
+                self._delete_orphan_bodies(hashes[start:start + _BATCH])
+
+
+_cache: PageCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache | None:
+    """
+    Return the shared page cache, or None if WEB_CACHE_PATH is empty.
+
+    Returns:
+        The PageCache stored at DEFAULT_PATH
+    """
+    global _cache
+
+    if not DEFAULT_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache()
+            # Write the buffered access times and counters on exit.
+            atexit.register(_cache.close)
+        return _cache
@@ -1,11 +1,37 @@
 """Search implementation for FastMCP documentation using minsearch."""
 
 import os
+import re
 import zipfile
+import numpy as np
 import requests
 from pathlib import Path
 from minsearch import Index
 
+# Passages are cut at headings, and sections longer than PASSAGE_MAX_CHARS
+# are split into windows overlapping by PASSAGE_OVERLAP characters.
+# Sections shorter than PASSAGE_MIN_CHARS are merged with the next one.
+PASSAGE_MAX_CHARS = 1500
+PASSAGE_OVERLAP = 200
+PASSAGE_MIN_CHARS = 300
+
+SNIPPET_CHARS = 240
+
+# Candidates ranked beyond num_results, to replace overlapping passages
+SEARCH_OVERFETCH = 5
+
+# Relative weight of each text field in the passage score
+BOOST = {
+    "content": 2.0,  # Content matches are twice as important
+    "section": 1.5,  # Section headings summarize the passage
+    "filename": 1.0  # Filename matches have normal importance
+}
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+# Lines that may be a fence or a heading, so the rest are skipped in bulk
+MARKUP_LINE_PATTERN = re.compile(r"^(?:[ \t]*(?:```|~~~)|#)", re.MULTILINE)
+
 
 def download_zip_if_needed(url: str, local_path: str) -> None:
     """
@@ -76,34 +102,232 @@ def extract_and_process_files(zip_path: str) -> list[dict]:
     return documents
 
 
-def create_index(documents: list[dict]) -> Index:
+def _sections(content: str) -> list[tuple[int, str]]:
     """
-    Create a minsearch index from documents.
-    
+    Find where each markdown section starts.
+
+    Lines inside fenced code blocks are not headings, even if they start
+    with "#".
+
+    Returns:
+        (offset, heading path) pairs, e.g. (120, "Installation > Using pip")
+    """
+    sections = [(0, "")]
+    stack = []
+    in_fence = False
+    for line_match in MARKUP_LINE_PATTERN.finditer(content):
+        offset = line_match.start()
+        line_end = content.find("\n", offset)
+        line = content[offset:] if line_end == -1 else content[offset:line_end]
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence and (match := HEADING_PATTERN.match(line)):
+            level = len(match.group(1))
+            stack = [entry for entry in stack if entry[0] < level]
+            stack.append((level, match.group(2)))
+            path = " > ".join(title for _, title in stack)
+            if offset == 0:
+                sections[0] = (0, path)
+            else:
+                sections.append((offset, path))
+    return sections
+
+
+def _windows(content: str, start: int, end: int, max_chars: int, overlap: int):
+    """Yield (start, end) windows covering content[start:end]."""
+    while end - start > max_chars:
+        cut = start + max_chars
+        # Prefer to cut between paragraphs, then lines, then words.
+        for separator in ("\n\n", "\n", " "):
+            position = content.rfind(separator, start + max_chars // 2, cut)
+            if position != -1:
+                cut = position + len(separator)
+                break
+        yield start, cut
+        next_start = max(cut - overlap, start + 1)
+        # Start the next window at a word boundary.
+        space = content.find(" ", next_start, cut)
+        start = space + 1 if space != -1 else next_start
+    yield start, end
+
+
+def _merged_title(titles: list[str]) -> str:
+    """
+    Join the heading paths of merged sections with " | ".
+
+    Ancestors shared with the previous heading are left out, so
+    ["Setup", "Setup > Install", "Setup > Usage"] becomes
+    "Setup | Install | Usage".
+    """
+    if len(titles) == 1:
+        return titles[0]
+    parts, previous = [], []
+    for title in titles:
+        path = title.split(" > ") if title else []
+        shared = 0
+        while shared < min(len(path), len(previous)) and path[shared] == previous[shared]:
+            shared += 1
+        if shared < len(path):
+            parts.append(" > ".join(path[shared:]))
+            previous = path
+    return " | ".join(parts)
+
+
+def split_into_passages(
+    document: dict,
+    max_chars: int = PASSAGE_MAX_CHARS,
+    overlap: int = PASSAGE_OVERLAP,
+    min_chars: int = PASSAGE_MIN_CHARS,
+) -> list[dict]:
+    """
+    Split a document into heading-aware, overlapping passages.
+
+    Args:
+        document: Dictionary with 'filename' and 'content' fields
+        max_chars: Longest passage, in characters
+        overlap: Characters shared by consecutive windows of a long section
+        min_chars: Shorter sections are merged with the following one
+
+    Returns:
+        List of dictionaries with 'filename', 'section' (the heading path,
+        see _merged_title() for merged sections), 'content', and 'start'
+        and 'end' offsets into the document
+    """
+    content = document['content']
+    sections = _sections(content)
+    boundaries = [offset for offset, _ in sections[1:]] + [len(content)]
+
+    passages = []
+    section_start, titles = sections[0][0], [sections[0][1]]
+    for (_, next_title), section_end in zip(sections[1:] + [(None, "")], boundaries):
+        if section_end - section_start < min_chars and section_end < len(content):
+            # Merge with the next section, keeping both headings.
+            titles.append(next_title)
+            continue
+        section_title = _merged_title(titles)
+        for start, end in _windows(content, section_start, section_end, max_chars, overlap):
+            if content[start:end].strip():
+                passages.append({
+                    'filename': document['filename'],
+                    'section': section_title,
+                    'content': content[start:end],
+                    'start': start,
+                    'end': end,
+                })
+        section_start, titles = section_end, [next_title]
+    return passages
+
+
+def split_documents(documents: list[dict]) -> list[dict]:
+    """
+    Split every document into passages with split_into_passages().
+
     Args:
         documents: List of dictionaries with 'filename' and 'content' fields
+
+    Returns:
+        The passages of all documents
+    """
+    passages = [passage for document in documents for passage in split_into_passages(document)]
+    print(f"Split {len(documents)} documents into {len(passages)} passages")
+    return passages
+
+
+def create_index(passages: list[dict]) -> Index:
+    """
+    Create a minsearch index from passages.
+    
+    Args:
+        passages: List of dictionaries with 'filename', 'section' and
+            'content' fields, as returned by split_documents()
     
     Returns:
         Fitted Index object
     """
     print("Creating search index...")
     
-    # Create index with text_fields for content and filename
-    # We'll search primarily on content, but filename can also be searched
+    # Create index with text_fields for content, section heading and filename
+    # We'll search primarily on content, but the others can also be searched
     index = Index(
-        text_fields=["content", "filename"]
+        text_fields=["content", "section", "filename"]
     )
     
-    # Fit the index with documents
-    index.fit(documents)
+    # Fit the index with passages
+    index.fit(passages)
     
-    print(f"Index created with {len(documents)} documents")
+    print(f"Index created with {len(passages)} passages")
     return index
 
 
+def make_snippet(content: str, query: str, max_chars: int = SNIPPET_CHARS) -> str:
+    """
+    Return the part of a passage that best matches a query, with the
+    query terms highlighted in **bold**.
+
+    Args:
+        content: The passage text
+        query: The search query
+        max_chars: Length of the snippet
+
+    Returns:
+        The snippet, with "…" where the passage was cut
+    """
+    terms = sorted({term.lower() for term in re.findall(r"\w\w+", query)}, key=len, reverse=True)
+    if not terms:
+        return " ".join(content[:max_chars].split())
+    pattern = re.compile(r"\b(?:%s)\w*" % "|".join(map(re.escape, terms)), re.IGNORECASE)
+    matches = list(pattern.finditer(content))
+
+    # Pick the window starting at the match followed by the most distinct terms.
+    start = 0
+    best = 0
+    for i, match in enumerate(matches):
+        window_end = match.start() + max_chars
+        found = {m.group(0).lower() for m in matches[i:] if m.end() <= window_end}
+        if len(found) > best:
+            best = len(found)
+            start = match.start()
+    if start:
+        # Give the first match some context, starting at a word boundary.
+        space = content.rfind(" ", 0, max(0, start - max_chars // 4))
+        start = space + 1 if space != -1 else 0
+    end = min(len(content), start + max_chars)
+
+    snippet = " ".join(content[start:end].split())
+    snippet = pattern.sub(lambda m: f"**{m.group(0)}**", snippet)
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(content) else "")
+
+
+def _score_passages(index: Index, query: str) -> np.ndarray:
+    """
+    Score every passage against a query, as Index.search() does.
+
+    The TF-IDF rows are already L2-normalized, so the cosine similarity is
+    a sparse dot product with the query vector. Index.search() calls
+    sklearn's cosine_similarity instead, which normalizes and converts
+    each whole field matrix again on every query.
+    """
+    scores = np.zeros(len(index.docs))
+    for field, matrix in index.text_matrices.items():
+        query_vector = index.vectorizers[field].transform([query])
+        scores += BOOST.get(field, 1.0) * (matrix @ query_vector.T).toarray().ravel()
+    return scores
+
+
+def _top_passages(scores: np.ndarray, count: int) -> np.ndarray:
+    """Return the indices of the count best scoring passages, best first."""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > count:
+        candidates = candidates[np.argpartition(-scores[candidates], count)[:count]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
 def search_documents(index: Index, query: str, num_results: int = 5) -> list[dict]:
     """
-    Search for documents and return the most relevant results.
+    Search for passages and return the most relevant results.
+    
+    Overlapping passages of the same file are reported once, and each
+    result carries a highlighted snippet and its score.
     
     Args:
         index: The minsearch Index object
@@ -111,18 +335,37 @@ def search_documents(index: Index, query: str, num_results: int = 5) -> list[dic
         num_results: Number of results to return (default: 5)
     
     Returns:
-        List of dictionaries containing search results with scores
+        List of passage dictionaries, best first, each with a 'snippet'
+        and a 'score'
     """
-    # Perform search with boost on content field (more important than filename)
-    boost_dict = {
-        "content": 2.0,  # Content matches are twice as important
-        "filename": 1.0  # Filename matches have normal importance
-    }
+    scores = _score_passages(index, query)
     
-    results = index.search(query, boost_dict=boost_dict)
+    selected = []
+    taken = {}  # filename -> (start, end) spans of the selected passages
+    count = num_results + SEARCH_OVERFETCH
+    seen = 0
+    while len(selected) < num_results:
+        ranked = _top_passages(scores, count)
+        for i in ranked[seen:]:
+            passage = index.docs[i]
+            spans = taken.setdefault(passage['filename'], [])
+            if any(start < passage['end'] and passage['start'] < end for start, end in spans):
+                continue
+            spans.append((passage['start'], passage['end']))
+            selected.append((passage, scores[i]))
+            if len(selected) == num_results:
+                break
+        if len(ranked) < count:
+            break  # every matching passage was considered
+        # Too many overlaps: rank further candidates.
+        seen = len(ranked)
+        count *= 2
     
-    # Return top num_results
-    return results[:num_results]
+    # Snippets are only built for the returned passages.
+    return [
+        {**passage, 'snippet': make_snippet(passage['content'], query), 'score': round(float(score), 4)}
+        for passage, score in selected
+    ]
 
 
 def main():
@@ -145,8 +388,8 @@ def main():
         print("No documents found to index!")
         return
     
-    # Step 3: Create index
-    index = create_index(documents)
+    # Step 3: Split into passages and create index
+    index = create_index(split_documents(documents))
     
     # Step 4: Test search
     print("\n" + "=" * 60)
@@ -166,24 +409,11 @@ def main():
         results = search_documents(index, query, num_results=5)
         
         for i, result in enumerate(results, 1):
-            # Handle different result formats - minsearch may return dicts or other formats
-            if isinstance(result, dict):
-                filename = result.get('filename', 'Unknown')
-                score = result.get('score', result.get('_score', 0))
-                content = result.get('content', '')
-            else:
-                # If result is not a dict, try to access attributes
-                filename = getattr(result, 'filename', 'Unknown')
-                score = getattr(result, 'score', getattr(result, '_score', 0))
-                content = getattr(result, 'content', '')
-            
-            print(f"{i}. {filename}")
-            if score:
-                print(f"   Score: {score:.4f}")
-            # Show a snippet of content
-            snippet = content[:100].replace('\n', ' ') if content else ''
-            if snippet:
-                print(f"   Preview: {snippet}...")
+            print(f"{i}. {result['filename']} ({result['start']}-{result['end']})")
+            if result['section']:
+                print(f"   Section: {result['section']}")
+            # Show the highlighted snippet
+            print(f"   Preview: {result['snippet']}")
     
     print("\n" + "=" * 60)
     print("✓ Search implementation test completed!")
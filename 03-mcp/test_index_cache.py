@@ -0,0 +1,131 @@
+"""Tests for the on-disk index cache, using a small zip of markdown files.
+
+    python -m unittest test_index_cache
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import index_cache
+from search import create_index, extract_and_process_files, search_documents, split_documents
+
+DOCS = {
+    "docs-main/docs/tools.md": "# Tools\n\nDecorate a function with @mcp.tool to expose it as a tool.\n",
+    "docs-main/docs/resources.md": "# Resources\n\nResources expose read-only data to the client.\n",
+}
+
+
+def _is_mapped(array) -> bool:
+    # scipy wraps the loaded arrays in views, so look through their bases.
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def _quietly(function, *args):
+    # The search helpers report progress on stdout.
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+class IndexCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.zip_path = str(self.directory / "docs.zip")
+        self.cache_dir = str(self.directory / "cache")
+        self.write_zip(DOCS)
+        self.builds = 0
+
+    def write_zip(self, files: dict) -> None:
+        with zipfile.ZipFile(self.zip_path, "w") as zf:
+            for name, content in files.items():
+                zf.writestr(name, content)
+
+    def build(self):
+        self.builds += 1
+        documents = _quietly(extract_and_process_files, self.zip_path)
+        return _quietly(create_index, _quietly(split_documents, documents))
+
+    def load_or_build(self):
+        return _quietly(index_cache.load_or_build_index, self.zip_path, self.build, self.cache_dir)
+
+    def cache_path(self) -> Path:
+        return Path(self.cache_dir) / index_cache.cache_key(self.zip_path)
+
+    def test_saved_index_loads_with_mapped_matrices(self):
+        """Test that a loaded index searches like the saved one, from memory-mapped arrays."""
+        index = self.build()
+        index_cache.save_index(index, self.cache_path())
+        loaded = index_cache.load_index(self.cache_path())
+        self.assertEqual(
+            search_documents(loaded, "expose a tool"), search_documents(index, "expose a tool")
+        )
+        self.assertTrue(_is_mapped(loaded.text_matrices["content"].data))
+        in_memory = index_cache.load_index(self.cache_path(), mmap=False)
+        self.assertFalse(_is_mapped(in_memory.text_matrices["content"].data))
+
+    def test_key_follows_the_zip_contents(self):
+        """Test that the key only changes when the archive's bytes change."""
+        key = index_cache.cache_key(self.zip_path)
+        os.utime(self.zip_path, (0, 0))
+        self.assertEqual(index_cache.cache_key(self.zip_path), key)
+        with mock.patch.object(index_cache, "CACHE_FORMAT_VERSION", -1):
+            self.assertNotEqual(index_cache.cache_key(self.zip_path), key)
+        self.write_zip({**DOCS, "docs-main/docs/new.md": "# New\n"})
+        self.assertNotEqual(index_cache.cache_key(self.zip_path), key)
+
+    def test_index_is_built_once(self):
+        """Test that the second load reads the cache instead of building."""
+        first = self.load_or_build()
+        second = self.load_or_build()
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(second.docs, first.docs)
+
+    def test_changed_zip_is_rebuilt_and_old_cache_removed(self):
+        """Test that a new archive gets a new index and the stale one is deleted."""
+        self.load_or_build()
+        old_path = self.cache_path()
+        self.write_zip({**DOCS, "docs-main/docs/new.md": "# Prompts\n\nPrompts are templates.\n"})
+        index = self.load_or_build()
+        self.assertEqual(self.builds, 2)
+        self.assertIn("docs/new.md", {doc["filename"] for doc in index.docs})
+        self.assertEqual(os.listdir(self.cache_dir), [self.cache_path().name])
+        self.assertFalse(old_path.exists())
+
+    def test_corrupt_cache_is_rebuilt(self):
+        """Test that an unreadable cache is replaced rather than rebuilt on every start."""
+        self.load_or_build()
+        (self.cache_path() / "index.pkl").write_bytes(b"not a pickle")
+        self.assertIsNone(index_cache.load_index(self.cache_path()))
+        self.load_or_build()
+        self.load_or_build()
+        self.assertEqual(self.builds, 2)
+
+    def test_other_format_version_is_rebuilt(self):
+        """Test that a cache written by another format version is not loaded."""
+        self.load_or_build()
+        meta_path = self.cache_path() / "meta.json"
+        meta = json.loads(meta_path.read_text())
+        meta_path.write_text(json.dumps({**meta, "format_version": index_cache.CACHE_FORMAT_VERSION - 1}))
+        self.assertIsNone(index_cache.load_index(self.cache_path()))
+        self.load_or_build()
+        self.assertEqual(self.builds, 2)
+        self.assertIsNotNone(index_cache.load_index(self.cache_path()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for the background warm-up of the documentation index.
+
+The index build is replaced by a stand-in that waits for the test to let
+it finish:
+
+    python -m unittest test_index_warmup
+"""
+
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from fastmcp.exceptions import ToolError
+
+import main
+
+
+class IndexWarmupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.builds = 0
+        self.failures = 0
+        for name, value in (
+            ("_index_future", None),
+            ("_load_documentation_index", self.build),
+        ):
+            patcher = mock.patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Never leave a warm-up thread waiting after a failed test.
+        self.addCleanup(self.release.set)
+
+    def build(self):
+        self.builds += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise ValueError("No documents found to index!")
+        return f"index {self.builds}"
+
+    def test_concurrent_callers_share_one_build(self):
+        """Test that callers arriving during a build all wait for the same one."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = [pool.submit(main.get_documentation_index, 5) for _ in range(8)]
+            self.assertTrue(self.started.wait(5))
+            self.assertEqual(main._documentation_index_status_impl()["status"], "warming")
+            self.release.set()
+            self.assertEqual({result.result() for result in results}, {"index 1"})
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(main._documentation_index_status_impl()["status"], "ready")
+
+    def test_search_gives_up_waiting_with_a_tool_error(self):
+        """Test that a slow build raises ToolError without cancelling the build."""
+        with self.assertRaises(ToolError):
+            asyncio.run(main._await_documentation_index(0.05))
+        self.release.set()
+        self.assertEqual(main.get_documentation_index(5), "index 1")
+        self.assertEqual(
+            asyncio.run(main._await_documentation_index(5)), "index 1"
+        )
+        self.assertEqual(self.builds, 1)
+
+    def test_failed_build_is_reported_then_retried(self):
+        """Test that a failure is reported and the next caller starts a new build."""
+        self.failures = 1
+        self.release.set()
+        with self.assertRaises(ValueError):
+            main.get_documentation_index(5)
+        self.assertEqual(
+            main._documentation_index_status_impl(),
+            {"status": "failed", "error": "No documents found to index!"},
+        )
+        self.assertEqual(main.get_documentation_index(5), "index 2")
+        self.assertEqual(main._documentation_index_status_impl()["status"], "ready")
+
+
+if __name__ == "__main__":
+    unittest.main()
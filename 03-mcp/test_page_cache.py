@@ -0,0 +1,92 @@
+"""Tests for the SQLite page cache.
+
+    python -m unittest test_page_cache
+"""
+
+import os
+import random
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+import page_cache
+from page_cache import PageCache
+
+
+def _page(seed: int, size: int = 4000) -> str:
+    # Random text, so every page compresses to a similar, known-ish size
+    rng = random.Random(seed)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(size))
+
+
+class PageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+        self.cache = self.open()
+
+    def open(self, **kwargs) -> PageCache:
+        cache = PageCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def stored_size(self, cache: PageCache) -> int:
+        with cache._lock:
+            return cache._conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def test_identical_pages_share_a_body(self):
+        """Test that equal contents are stored and counted once."""
+        self.cache.put("https://a.test/", "same content")
+        self.cache.put("https://b.test/", "same content")
+        stats = self.cache.stats()
+        self.assertEqual((stats["pages"], stats["bodies"]), (2, 1))
+        self.assertEqual(stats["size_bytes"], self.stored_size(self.cache))
+
+    def test_replaced_body_is_deleted(self):
+        """Test that overwriting a page frees its old body."""
+        self.cache.put("https://a.test/", _page(1))
+        self.cache.put("https://a.test/", _page(2))
+        self.assertEqual(self.cache.get("https://a.test/").content, _page(2))
+        stats = self.cache.stats()
+        self.assertEqual(stats["bodies"], 1)
+        self.assertEqual(stats["size_bytes"], self.stored_size(self.cache))
+
+    def test_least_recently_used_pages_are_evicted(self):
+        """Test that eviction keeps the recently read pages and the size limit."""
+        self.cache.max_bytes = 5 * len(zlib.compress(_page(0).encode()))
+        for i in range(10):
+            self.cache.put(f"https://site.test/{i}", _page(i))
+            # Page 0 is read after every write, so it stays the most recent.
+            self.cache.get("https://site.test/0")
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["size_bytes"], self.cache.max_bytes)
+        self.assertEqual(stats["size_bytes"], self.stored_size(self.cache))
+        self.assertEqual(stats["pages"], stats["bodies"])
+        self.assertIsNotNone(self.cache.get("https://site.test/0"))
+        self.assertIsNotNone(self.cache.get("https://site.test/9"))
+        self.assertIsNone(self.cache.get("https://site.test/1"))
+
+    def test_lookups_are_written_in_batches(self):
+        """Test that lookups do not write until a batch is full."""
+        self.cache.put("https://a.test/", "content")
+        statements = []
+        self.cache._conn.set_trace_callback(statements.append)
+        with mock.patch.object(page_cache, "FLUSH_INTERVAL", 3600):
+            for _ in range(page_cache.FLUSH_EVERY - 1):
+                self.cache.get("https://a.test/")
+        self.cache._conn.set_trace_callback(None)
+        self.assertFalse([sql for sql in statements if not sql.startswith("SELECT")])
+        self.assertEqual(self.cache.stats()["hits"], page_cache.FLUSH_EVERY - 1)
+
+    def test_counters_survive_reopening(self):
+        """Test that buffered counters are written when the cache is closed."""
+        self.cache.get("https://missing.test/")
+        self.cache.close()
+        self.assertEqual(self.open().stats()["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
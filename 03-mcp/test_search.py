@@ -0,0 +1,149 @@
+"""Tests for passage splitting, snippets and passage search.
+
+    python -m unittest test_search
+"""
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+import search
+from search import create_index, make_snippet, search_documents, split_into_passages
+
+GUIDE = """# Guide
+Read this first.
+## Install
+Run the installer.
+### Pip
+pip install fastmcp
+## Usage
+Start the server.
+"""
+
+FENCED = """# Setup
+```bash
+# not a heading
+pip install fastmcp
+```
+## Next
+Continue here.
+"""
+
+
+def _index(passages: list[dict]):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return create_index(passages)
+
+
+def _document(content: str, filename: str = "docs/guide.md") -> dict:
+    return {"filename": filename, "content": content}
+
+
+class SplitIntoPassagesTest(unittest.TestCase):
+
+    def test_sections_carry_their_heading_path(self):
+        """Test that each passage is one section, named by its heading path."""
+        passages = split_into_passages(_document(GUIDE), min_chars=0)
+        self.assertEqual([p["section"] for p in passages], [
+            "Guide", "Guide > Install", "Guide > Install > Pip", "Guide > Usage",
+        ])
+        self.assertEqual("".join(p["content"] for p in passages), GUIDE)
+
+    def test_offsets_point_into_the_document(self):
+        """Test that start and end select the passage content."""
+        for passage in split_into_passages(_document(GUIDE), min_chars=0):
+            self.assertEqual(GUIDE[passage["start"]:passage["end"]], passage["content"])
+
+    def test_hash_in_fenced_code_is_not_a_heading(self):
+        """Test that "#" lines inside a code fence stay in their section."""
+        passages = split_into_passages(_document(FENCED), min_chars=0)
+        self.assertEqual([p["section"] for p in passages], ["Setup", "Setup > Next"])
+        self.assertIn("# not a heading", passages[0]["content"])
+
+    def test_merged_sections_keep_every_heading(self):
+        """Test that short sections merged together list all of their headings."""
+        passages = split_into_passages(_document(GUIDE), min_chars=1000)
+        self.assertEqual(len(passages), 1)
+        self.assertEqual(passages[0]["section"], "Guide | Install | Pip | Usage")
+
+    def test_long_sections_are_split_into_overlapping_windows(self):
+        """Test that windows stay under max_chars, overlap and start at words."""
+        content = "# Long\n" + " ".join(f"word{i}" for i in range(200)) + "\n"
+        passages = split_into_passages(_document(content), max_chars=100, overlap=30)
+        self.assertGreater(len(passages), 5)
+        for previous, passage in zip(passages, passages[1:]):
+            self.assertLessEqual(len(passage["content"]), 100)
+            self.assertLess(passage["start"], previous["end"])
+            self.assertEqual(content[passage["start"] - 1], " ")
+        self.assertEqual(passages[0]["start"], 0)
+        self.assertEqual(passages[-1]["end"], len(content))
+
+
+class MakeSnippetTest(unittest.TestCase):
+
+    def test_terms_are_highlighted_around_the_best_match(self):
+        """Test that the snippet centres on the query terms and marks cuts."""
+        content = "filler " * 100 + "Register a tool with the decorator. " + "more " * 100
+        snippet = make_snippet(content, "tool decorator", max_chars=80)
+        self.assertIn("**tool**", snippet)
+        self.assertIn("**decorator**", snippet)
+        self.assertTrue(snippet.startswith("…"))
+        self.assertTrue(snippet.endswith("…"))
+
+    def test_query_without_terms_returns_the_start(self):
+        """Test that a query without words gives the start of the passage."""
+        self.assertEqual(make_snippet("Start  of\nthe passage", "?", max_chars=13), "Start of the")
+
+
+class SearchDocumentsTest(unittest.TestCase):
+
+    def setUp(self):
+        long_section = "# Tools\n" + "Tools are functions the client can call. " * 40
+        self.passages = (
+            split_into_passages(_document(long_section, "docs/tools.md"), max_chars=200, overlap=100)
+            + split_into_passages(_document(GUIDE), min_chars=0)
+        )
+        self.index = _index(self.passages)
+
+    def test_scores_match_minsearch(self):
+        """Test that the fast scorer ranks passages exactly like Index.search()."""
+        for query in ("tools functions", "install pip", "server"):
+            expected = self.index.search(query, boost_dict=search.BOOST, num_results=10)
+            ranked = search._top_passages(search._score_passages(self.index, query), 10)
+            self.assertEqual([self.index.docs[i] for i in ranked], expected)
+
+    def assertNoOverlap(self, results):
+        spans = sorted((r["start"], r["end"]) for r in results if r["filename"] == "docs/tools.md")
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertLessEqual(end, start)
+
+    def test_overlapping_passages_are_reported_once(self):
+        """Test that results never overlap within a file, and are best first."""
+        results = search_documents(self.index, "tools functions", num_results=5)
+        self.assertEqual(len(results), 5)
+        self.assertNoOverlap(results)
+        scores = [r["score"] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all("**" in r["snippet"] for r in results))
+
+    def test_more_candidates_are_ranked_when_overlaps_run_out(self):
+        """Test that overlaps beyond the extra candidates do not shorten the results."""
+        with mock.patch.object(search, "SEARCH_OVERFETCH", 0):
+            results = search_documents(self.index, "tools functions", num_results=5)
+        self.assertEqual(len(results), 5)
+        self.assertNoOverlap(results)
+
+    def test_snippets_are_built_only_for_returned_results(self):
+        """Test that no snippet work is spent on dropped candidates."""
+        with mock.patch.object(search, "make_snippet", return_value="") as snippet:
+            results = search_documents(self.index, "tools functions", num_results=3)
+        self.assertEqual(snippet.call_count, len(results))
+
+    def test_unmatched_query_returns_nothing(self):
+        """Test that a query matching no passage returns no results."""
+        self.assertEqual(search_documents(self.index, "zebra"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
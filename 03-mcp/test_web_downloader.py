@@ -0,0 +1,355 @@
+"""Tests for the web downloader against a local stand-in HTTP server.
+
+The stand-in takes the place of Jina Reader: the downloader prepends its
+URL to the page URL, so the server sees the page URL in the request path
+and answers according to the page's path:
+
+    python -m unittest test_web_downloader
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+import web_downloader
+from page_cache import PageCache
+from word_count import WordCounter
+
+# Validators of the /validated page
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.handle_page(self)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    A reader stand-in whose pages behave according to their path:
+
+    - /slow?delay=S: answers after S seconds
+    - /flaky?fails=N: answers 503 to the first N requests
+    - /hang: answers after 2 seconds, longer than the tests' read timeout
+    - /missing: answers 404
+    - /unknown-charset: answers UTF-8 text labelled with an unknown charset
+    - /validated: answers with an ETag and Last-Modified date, and 304 to a
+      request carrying that ETag
+    - /words?count=N: answers "data " N times
+    - anything else: answers "page <url>"
+
+    Every request is recorded with the client port of its connection and
+    its conditional headers, and the most requests in progress at once are
+    tracked per site and overall.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.active = {}
+        self.max_active = {}
+
+    @property
+    def reader_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests.clear()
+            self.active.clear()
+            self.max_active.clear()
+
+    def count(self, url: str) -> int:
+        with self.lock:
+            return sum(1 for request in self.requests if request["url"] == url)
+
+    def handle_page(self, handler: StandInHandler) -> None:
+        url = handler.path[1:]
+        parts = urlsplit(url)
+        query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        host = parts.hostname or ""
+        with self.lock:
+            self.requests.append({
+                "url": url,
+                "port": handler.client_address[1],
+                "if_none_match": handler.headers.get("If-None-Match"),
+                "if_modified_since": handler.headers.get("If-Modified-Since"),
+            })
+            previous = sum(1 for request in self.requests[:-1] if request["url"] == url)
+            for key in (host, None):
+                self.active[key] = self.active.get(key, 0) + 1
+                self.max_active[key] = max(self.max_active.get(key, 0), self.active[key])
+        try:
+            if parts.path == "/validated" and handler.headers.get("If-None-Match") == ETAG:
+                status, body = 304, b""
+            else:
+                status, body = self.respond(parts.path, query, previous, url)
+            handler.send_response(status)
+            charset = "x-unknown-charset" if parts.path == "/unknown-charset" else "utf-8"
+            handler.send_header("Content-Type", f"text/plain; charset={charset}")
+            handler.send_header("Content-Length", str(len(body)))
+            if parts.path == "/validated":
+                handler.send_header("ETag", ETAG)
+                handler.send_header("Last-Modified", LAST_MODIFIED)
+            handler.end_headers()
+            handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self.lock:
+                for key in (host, None):
+                    self.active[key] -= 1
+
+    def respond(self, path: str, query: dict, previous: int, url: str) -> tuple[int, bytes]:
+        if path == "/slow":
+            time.sleep(float(query.get("delay", "0.2")))
+        elif path == "/flaky" and previous < int(query.get("fails", "1")):
+            return 503, b"busy"
+        elif path == "/hang":
+            time.sleep(2)
+        elif path == "/missing":
+            return 404, b"not found"
+        elif path == "/unknown-charset":
+            return 200, f"café {url}".encode()
+        elif path == "/words":
+            return 200, b"data " * int(query.get("count", "1"))
+        return 200, f"page {url}".encode()
+
+
+class StandInTestCase(unittest.TestCase):
+    """Runs the downloader against a fresh session and the stand-in server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.reset()
+        for name, value in (
+            ("JINA_READER_URL", self.server.reader_url),
+            ("BACKOFF_FACTOR", 0.01),
+            ("_session", None),
+            ("get_page_cache", lambda: None),
+        ):
+            patcher = mock.patch.object(web_downloader, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: web_downloader._session and web_downloader._session.close())
+
+
+class DownloadWebpageTest(StandInTestCase):
+    """Connection reuse, retries and timeouts of download_webpage()."""
+
+    def test_connection_is_reused(self):
+        """Test that consecutive downloads share one pooled connection."""
+        for name in ("a", "b", "c"):
+            url = f"http://site.test/{name}"
+            self.assertEqual(web_downloader.download_webpage(url), f"page {url}")
+        ports = {request["port"] for request in self.server.requests}
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(ports), 1)
+
+    def test_server_errors_are_retried(self):
+        """Test that 5xx responses are retried with backoff until one succeeds."""
+        url = "http://site.test/flaky?fails=2"
+        self.assertEqual(web_downloader.download_webpage(url), f"page {url}")
+        self.assertEqual(self.server.count(url), 3)
+
+    def test_retries_give_up(self):
+        """Test that the last 5xx response is raised once the retries run out."""
+        url = "http://site.test/flaky?fails=100"
+        with self.assertRaises(requests.HTTPError) as raised:
+            web_downloader.download_webpage(url)
+        self.assertEqual(raised.exception.response.status_code, 503)
+        self.assertEqual(self.server.count(url), web_downloader.MAX_RETRIES + 1)
+
+    def test_client_errors_are_not_retried(self):
+        """Test that a 404 is reported without retrying."""
+        url = "http://site.test/missing"
+        with self.assertRaises(requests.HTTPError):
+            web_downloader.download_webpage(url)
+        self.assertEqual(self.server.count(url), 1)
+
+    def test_read_timeout(self):
+        """Test that a server that stops answering fails at the read timeout."""
+        start = time.perf_counter()
+        with self.assertRaises(requests.RequestException):
+            web_downloader.download_webpage("http://site.test/hang", timeout=(1, 0.2))
+        # Every attempt stops at the read timeout instead of waiting for
+        # the 2 second answer.
+        attempts = web_downloader.MAX_RETRIES + 1
+        self.assertLess(time.perf_counter() - start, attempts * 0.2 + 1)
+
+    def test_expired_page_is_revalidated(self):
+        """Test that an expired page is revalidated with its validators and a 304 reuses it."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = PageCache(os.path.join(directory.name, "cache.sqlite3"))
+        self.addCleanup(cache.close)
+        url = "http://site.test/validated"
+        with mock.patch.object(web_downloader, "get_page_cache", lambda: cache):
+            self.assertEqual(web_downloader.download_webpage(url), f"page {url}")
+            self.assertEqual(web_downloader.download_webpage(url), f"page {url}")
+            self.assertEqual(self.server.count(url), 1)
+
+            cache.ttl = 0  # every cached page is now expired
+            self.assertEqual(web_downloader.download_webpage(url), f"page {url}")
+        self.assertEqual(self.server.count(url), 2)
+        request = self.server.requests[-1]
+        self.assertEqual(request["if_none_match"], ETAG)
+        self.assertEqual(request["if_modified_since"], LAST_MODIFIED)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["stale"], stats["revalidated"]), (1, 1, 1))
+
+    def test_unknown_charset_falls_back_to_utf8(self):
+        """Test that a charset Python does not know is decoded as UTF-8."""
+        url = "http://site.test/unknown-charset"
+        self.assertEqual(web_downloader.download_webpage(url), f"café {url}")
+        self.assertEqual("".join(web_downloader.stream_webpage(url)), f"café {url}")
+
+    def test_stream_reports_truncation_out_of_band(self):
+        """Test that a cut stream returns True and yields no marker text."""
+        counter = WordCounter()
+        chunks = web_downloader.stream_webpage("http://site.test/words?count=1000", max_bytes=100)
+        self.assertTrue(web_downloader.feed_chunks(chunks, counter.feed))
+        counter.finish()
+        self.assertEqual(counter.counts(), {"data": 20})
+
+        chunks = web_downloader.stream_webpage("http://site.test/words?count=10", max_bytes=100)
+        self.assertFalse(web_downloader.feed_chunks(chunks, counter.feed))
+
+
+class SelectTextTest(unittest.TestCase):
+    """Parts of a page returned by select_text() and cut by _cap_text()."""
+
+    PAGE = "# Guide\nIntro.\n## Install\nRun pip.\n### Extras\nOptional.\n## Usage\nStart it.\n"
+
+    def test_continuation_marker_gives_the_next_offset(self):
+        """Test that a cut selection says how much is left and where to continue."""
+        selected = web_downloader.select_text(self.PAGE, offset=2, max_chars=10)
+        remaining = len(self.PAGE) - 12
+        self.assertEqual(
+            selected,
+            self.PAGE[2:12] + f"\n\n[... {remaining} more characters, continue with offset=12 ...]",
+        )
+        self.assertEqual(web_downloader.select_text(self.PAGE, offset=12), self.PAGE[12:])
+        self.assertEqual(web_downloader.select_text(self.PAGE, max_chars=len(self.PAGE)), self.PAGE)
+
+    def test_section_runs_to_the_next_heading_of_its_level(self):
+        """Test that a section keeps its subsections and stops at its next sibling."""
+        self.assertEqual(
+            web_downloader.select_text(self.PAGE, section="install"),
+            "## Install\nRun pip.\n### Extras\nOptional.\n",
+        )
+        self.assertEqual(web_downloader.select_text(self.PAGE, section="Usage"), "## Usage\nStart it.\n")
+
+    def test_missing_section_is_an_error(self):
+        """Test that a section no heading matches raises ValueError."""
+        with self.assertRaises(ValueError):
+            web_downloader.select_text(self.PAGE, section="Deploy")
+
+    def test_cap_text_cuts_whole_characters(self):
+        """Test that text is cut at max_bytes of UTF-8 without splitting a character."""
+        self.assertEqual(web_downloader._cap_text("café", 5), ("café", False))
+        self.assertEqual(web_downloader._cap_text("café", 4), ("caf", True))
+        self.assertEqual(web_downloader._cap_text("ab", 1), ("a", True))
+
+    def test_cached_page_is_cut_with_a_marker(self):
+        """Test that a cached page longer than max_bytes ends with the truncation marker."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = PageCache(os.path.join(directory.name, "cache.sqlite3"))
+        self.addCleanup(cache.close)
+        url = "http://site.test/long"
+        cache.put(url, "data " * 100)
+        with mock.patch.object(web_downloader, "get_page_cache", lambda: cache):
+            text = web_downloader.download_webpage(url, max_bytes=12)
+        self.assertEqual(text, "data data da" + web_downloader.TRUNCATION_MARKER.format(max_bytes=12))
+
+
+class DownloadWebpagesTest(StandInTestCase):
+    """Ordering, concurrency limits and errors of batch downloads."""
+
+    def test_results_follow_the_input_order(self):
+        """Test that results come back in the given order, once per distinct URL."""
+        urls = [
+            "http://a.test/slow?delay=0.3",
+            "http://b.test/slow?delay=0.1",
+            "http://c.test/fast",
+            "HTTP://C.test/fast#top",
+        ]
+        results = web_downloader.download_webpages(urls)
+        self.assertEqual([result["url"] for result in results], urls[:3])
+        self.assertEqual([result["content"] for result in results], [f"page {url}" for url in urls[:3]])
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_total_concurrency_is_limited(self):
+        """Test that at most max_concurrency downloads run at once."""
+        urls = [f"http://site{i}.test/slow?delay=0.2" for i in range(8)]
+        results = web_downloader.download_webpages(urls, max_concurrency=3)
+        self.assertTrue(all(result["status"] == "ok" for result in results))
+        self.assertEqual(self.server.max_active[None], 3)
+
+    def test_concurrency_per_site_is_limited(self):
+        """Test that at most per_host downloads of one site run at once."""
+        urls = [f"http://busy.test/slow?delay=0.2&page={i}" for i in range(6)]
+        urls += ["http://quiet.test/slow?delay=0.2"]
+        web_downloader.download_webpages(urls, max_concurrency=8, per_host=2)
+        self.assertEqual(self.server.max_active["busy.test"], 2)
+        # The other site is not held up by the busy one.
+        self.assertEqual(self.server.max_active[None], 3)
+
+    def test_errors_are_reported_per_url(self):
+        """Test that a failing URL does not stop the rest of the batch."""
+        fetch = web_downloader._fetch_webpage
+
+        def failing_fetch(url, *args, **kwargs):
+            if "broken" in url:
+                raise LookupError("unknown encoding: x-unknown")
+            return fetch(url, *args, **kwargs)
+
+        urls = ["http://a.test/ok", "http://a.test/missing", "http://a.test/broken"]
+        with mock.patch.object(web_downloader, "_fetch_webpage", failing_fetch):
+            results = web_downloader.download_webpages(urls)
+        self.assertEqual([result["status"] for result in results], ["ok", "error", "error"])
+        self.assertEqual(results[1]["http_status"], 404)
+        self.assertEqual(results[2]["error"], "LookupError: unknown encoding: x-unknown")
+
+    def test_http_status_is_reported_only_for_responses(self):
+        """Test that a download reports its status and a cached page reports None."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = PageCache(os.path.join(directory.name, "cache.sqlite3"))
+        self.addCleanup(cache.close)
+        url = "http://site.test/validated"
+        with mock.patch.object(web_downloader, "get_page_cache", lambda: cache):
+            self.assertEqual(web_downloader.download_webpages([url])[0]["http_status"], 200)
+            self.assertIsNone(web_downloader.download_webpages([url])[0]["http_status"])
+            cache.ttl = 0  # every cached page is now expired
+            self.assertEqual(web_downloader.download_webpages([url])[0]["http_status"], 304)
+        self.assertEqual(self.server.count(url), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Tests for the streaming word counter.
+
+    python -m unittest test_word_count
+"""
+
+import unittest
+
+from word_count import SUBSTRING, WordCounter, count_words
+
+TEXT = "Data, database and big-data: the data team loves DATA.\nmetadata"
+
+
+def _split_everywhere(text: str):
+    # Every way of cutting the text into two chunks, plus one chunk per character
+    for cut in range(len(text) + 1):
+        yield [text[:cut], text[cut:]]
+    yield list(text)
+
+
+class WordCounterTest(unittest.TestCase):
+
+    def count(self, chunks, *args, **kwargs) -> WordCounter:
+        counter = WordCounter(*args, **kwargs)
+        for chunk in chunks:
+            counter.feed(chunk)
+        counter.finish()
+        return counter
+
+    def test_words_and_substrings(self):
+        """Test that word mode skips longer words and substring mode does not."""
+        self.assertEqual(count_words(TEXT, ["data"]), {"data": 4})
+        self.assertEqual(count_words(TEXT, ["data"], mode=SUBSTRING), {"data": 6})
+
+    def test_self_overlapping_substrings(self):
+        """Test that "aa" is counted like str.count, without overlaps."""
+        for text in ("aaaa", "aaaaa", "baaab", "aabaaa"):
+            for chunks in _split_everywhere(text):
+                counts = self.count(chunks, ["aa"], mode=SUBSTRING).counts()
+                self.assertEqual(counts, {"aa": text.count("aa")}, chunks)
+
+    def test_case_folding(self):
+        """Test that counting ignores case unless asked not to."""
+        self.assertEqual(count_words(TEXT, ["DATA"]), {"data": 4})
+        self.assertEqual(count_words(TEXT, ["data", "DATA"], case_sensitive=True), {"data": 2, "DATA": 1})
+        self.assertEqual(
+            count_words(TEXT, ["Data"], mode=SUBSTRING, case_sensitive=True), {"Data": 1}
+        )
+
+    def test_chunk_boundaries(self):
+        """Test that words and substrings cut between chunks are counted once."""
+        for mode in ("word", SUBSTRING):
+            expected = count_words(TEXT, ["data", "the"], mode=mode)
+            for chunks in _split_everywhere(TEXT):
+                counts = self.count(chunks, ["data", "the"], mode=mode).counts()
+                self.assertEqual(counts, expected, (mode, chunks))
+
+    def test_last_word_is_counted_by_finish(self):
+        """Test that the word at the end of the stream waits for finish()."""
+        counter = WordCounter(["data"])
+        counter.feed("big data")
+        self.assertEqual(counter.counts(), {"data": 0})
+        counter.finish()
+        self.assertEqual(counter.counts(), {"data": 1})
+
+    def test_most_common(self):
+        """Test the most frequent words, with and without target words."""
+        counter = self.count([TEXT], None)
+        self.assertEqual(counter.most_common(1), [("data", 4)])
+        self.assertEqual(counter.total_words, 11)
+        counter = self.count([TEXT], ["team", "data", "missing"])
+        self.assertEqual(counter.most_common(), [("data", 4), ("team", 1), ("missing", 0)])
+
+    def test_invalid_arguments(self):
+        """Test that unknown modes and substring mode without words are rejected."""
+        with self.assertRaises(ValueError):
+            WordCounter(["data"], mode="regex")
+        with self.assertRaises(ValueError):
+            WordCounter(mode=SUBSTRING)
+
+
+if __name__ == "__main__":
+    unittest.main()
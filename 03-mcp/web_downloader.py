@@ -1,27 +1,495 @@
 """Web page content downloader using Jina Reader."""
 
+import asyncio
+import codecs
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Callable, Generator
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from page_cache import get_page_cache, normalize_url
+
+# Jina Reader endpoint; the page URL is appended to it.
+JINA_READER_URL = os.environ.get("JINA_READER_URL", "https://r.jina.ai/")
+
+# Seconds to wait for a connection and for each read from the server
+CONNECT_TIMEOUT = float(os.environ.get("WEB_DOWNLOAD_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("WEB_DOWNLOAD_READ_TIMEOUT", "60"))
+
+# Retries of failed connections and of 429/5xx responses, with exponential
+# backoff (0.5s, 1s, 2s, ...) unless the server sends Retry-After.
+MAX_RETRIES = int(os.environ.get("WEB_DOWNLOAD_RETRIES", "3"))
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Bytes of a page read at most; the rest is dropped and marked as truncated
+MAX_DOWNLOAD_BYTES = int(os.environ.get("WEB_DOWNLOAD_MAX_BYTES", str(2 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+TRUNCATION_MARKER = "\n\n[... truncated after {max_bytes} bytes ...]"
+
+# Connections kept alive per host; matches the number of concurrent downloads
+POOL_SIZE = 16
+
+# Batch downloads: concurrent downloads in total and per site, and the
+# minimum number of seconds between two requests for pages of one site.
+MAX_CONCURRENCY = int(os.environ.get("WEB_DOWNLOAD_CONCURRENCY", "8"))
+PER_HOST_CONCURRENCY = int(os.environ.get("WEB_DOWNLOAD_PER_HOST", "2"))
+PER_HOST_INTERVAL = float(os.environ.get("WEB_DOWNLOAD_HOST_INTERVAL", "0"))
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+# Threads running blocking downloads for async callers. asyncio's default
+# executor scales with the CPU count, which would cap I/O-bound downloads.
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="web-download")
+
+
+def get_session() -> requests.Session:
+    """
+    Return the shared HTTP session.
+
+    Reusing one session keeps connections alive between downloads, so only
+    the first request to a host pays for the TCP and TLS handshakes.
+
+    Returns:
+        The requests Session used for all downloads
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET"}),
+                respect_retry_after_header=True,
+                # Return the last response so raise_for_status() reports it
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=POOL_SIZE,
+                pool_maxsize=POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _iter_decoded(response: requests.Response, max_bytes: int) -> Generator[str, None, bool]:
+    """
+    Yield the decoded text of a streamed response, stopping after max_bytes.
+
+    Returns:
+        Whether the body was cut
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    except LookupError:
+        # The server named a charset Python does not know
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    remaining = max_bytes
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        if len(chunk) > remaining:
+            # A character cut in half at the limit stays in the decoder
+            # and is dropped.
+            yield decoder.decode(chunk[:remaining])
+            return True
+        yield decoder.decode(chunk)
+        remaining -= len(chunk)
+    yield decoder.decode(b"", final=True)
+    return False
+
+
+def _read_capped(response: requests.Response, max_bytes: int) -> tuple[str, bool]:
+    """
+    Read and decode a streamed response, stopping after max_bytes.
+
+    Returns:
+        The decoded text and whether the body was cut
+    """
+    parts = []
+    chunks = _iter_decoded(response, max_bytes)
+    while True:
+        try:
+            parts.append(next(chunks))
+        except StopIteration as stop:
+            return "".join(parts), stop.value
+
 
+def _cap_text(text: str, max_bytes: int) -> tuple[str, bool]:
+    """Cut text to at most max_bytes of UTF-8."""
+    if len(text) * 4 <= max_bytes:
+        return text, False
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text, False
+    return data[:max_bytes].decode("utf-8", errors="ignore"), True
 
-def download_webpage(url: str) -> str:
+
+def download_webpage(url: str, timeout: float | tuple[float, float] | None = None,
+                     use_cache: bool = True, max_bytes: int | None = None) -> str:
     """
     Download content of a web page using Jina Reader.
-    
+
+    The body is streamed and decoded incrementally, and reading stops after
+    max_bytes, so memory use is bounded whatever the size of the page. A cut
+    page ends with a truncation marker.
+
+    Pages are kept in the on-disk page cache (see page_cache.py). A page
+    fetched less than WEB_CACHE_TTL seconds ago is returned without a
+    request; an older one is revalidated with its ETag or Last-Modified
+    date and only downloaded again if it changed. Truncated pages are not
+    cached.
+
     Args:
         url: The URL of the web page to download (e.g., "http://datatalks.club")
-    
+        timeout: Seconds to wait for the server, or a (connect, read) tuple
+            (default: CONNECT_TIMEOUT and READ_TIMEOUT)
+        use_cache: Set to False to always download the page
+        max_bytes: Bytes of the page read at most (default: MAX_DOWNLOAD_BYTES)
+
     Returns:
         The content of the web page as a string
-    
+
     Raises:
-        requests.RequestException: If the request fails
+        requests.RequestException: If the request fails or times out
+    """
+    return _fetch_webpage(url, timeout, use_cache, max_bytes)[0]
+
+
+def _fetch_webpage(url: str, timeout: float | tuple[float, float] | None = None,
+                   use_cache: bool = True, max_bytes: int | None = None
+                   ) -> tuple[str, int | None]:
+    """
+    Download a web page like download_webpage().
+
+    Returns:
+        The page text and the HTTP status of the response, or None if a
+        fresh cached copy was returned without a request
     """
     # Construct the Jina Reader URL by prepending r.jina.ai
-    jina_url = f"https://r.jina.ai/{url}"
-    
-    # Make the request
-    response = requests.get(jina_url)
-    response.raise_for_status()  # Raise an exception for bad status codes
-    
-    return response.text
+    jina_url = f"{JINA_READER_URL}{url}"
+
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if max_bytes is None:
+        max_bytes = MAX_DOWNLOAD_BYTES
+    marker = TRUNCATION_MARKER.format(max_bytes=max_bytes)
+
+    cache = get_page_cache() if use_cache else None
+    cached = cache.get(url) if cache else None
+    if cached and cached.is_fresh(cache.ttl):
+        text, truncated = _cap_text(cached.content, max_bytes)
+        return (text + marker if truncated else text), None
+
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    # Make the request, reading the body in chunks
+    with get_session().get(jina_url, headers=headers, timeout=timeout, stream=True) as response:
+        if cached and response.status_code == 304:
+            cache.refresh(url)
+            text, truncated = _cap_text(cached.content, max_bytes)
+            return (text + marker if truncated else text), response.status_code
+        response.raise_for_status()  # Raise an exception for bad status codes
+        text, truncated = _read_capped(response, max_bytes)
+
+    if truncated:
+        return text + marker, response.status_code
+    if cache:
+        cache.put(
+            url,
+            text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return text, response.status_code
+
+
+def stream_webpage(url: str, timeout: float | tuple[float, float] | None = None,
+                   max_bytes: int | None = None) -> Generator[str, None, bool]:
+    """
+    Download a web page using Jina Reader, yielding its text in chunks.
+
+    Unlike download_webpage(), the page is never held in memory as a
+    whole, so callers that process it chunk by chunk use constant memory,
+    and no truncation marker is added to a cut page: whether the page was
+    cut is the generator's return value, which feed_chunks() passes on.
+    A fresh copy in the page cache is used if there is one; streamed pages
+    are not added to the cache.
+
+    Args:
+        url: The URL of the web page to download
+        timeout: Seconds to wait for the server, or a (connect, read) tuple
+            (default: CONNECT_TIMEOUT and READ_TIMEOUT)
+        max_bytes: Bytes of the page read at most (default: MAX_DOWNLOAD_BYTES)
+
+    Yields:
+        Consecutive pieces of the page text
+
+    Returns:
+        Whether the page was cut after max_bytes
+
+    Raises:
+        requests.RequestException: If the request fails or times out
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if max_bytes is None:
+        max_bytes = MAX_DOWNLOAD_BYTES
+
+    cache = get_page_cache()
+    if cache and (cached := cache.get(url)) and cached.is_fresh(cache.ttl):
+        text, truncated = _cap_text(cached.content, max_bytes)
+        for start in range(0, len(text), CHUNK_SIZE):
+            yield text[start:start + CHUNK_SIZE]
+    else:
+        jina_url = f"{JINA_READER_URL}{url}"
+        with get_session().get(jina_url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            truncated = yield from _iter_decoded(response, max_bytes)
+    return truncated
+
+
+def feed_chunks(chunks: Generator[str, None, bool], *consumers: Callable[[str], None]) -> bool:
+    """
+    Pass every chunk of a stream_webpage() stream to each consumer.
+
+    Args:
+        chunks: The stream, as returned by stream_webpage()
+        *consumers: Functions called with each chunk, in order
+
+    Returns:
+        The stream's return value: whether the page was cut
+    """
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration as stop:
+            return bool(stop.value)
+        for consume in consumers:
+            consume(chunk)
+
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$", re.MULTILINE)
+
+
+def select_text(text: str, offset: int = 0, max_chars: int | None = None,
+                section: str | None = None) -> str:
+    """
+    Return part of a downloaded page.
+
+    Args:
+        text: The page content (markdown)
+        offset: Index of the first character returned
+        max_chars: Characters returned at most; a note at the end gives the
+            offset to continue from
+        section: Return only the markdown section whose heading contains
+            this text (case-insensitive), up to the next heading of the
+            same or a higher level
+
+    Returns:
+        The selected text
+
+    Raises:
+        ValueError: If no heading matches section
+    """
+    if section is not None:
+        headings = list(_HEADING.finditer(text))
+        for i, heading in enumerate(headings):
+            if section.lower() in heading.group(2).lower():
+                level = len(heading.group(1))
+                end = next(
+                    (h.start() for h in headings[i + 1:] if len(h.group(1)) <= level),
+                    len(text),
+                )
+                text = text[heading.start():end]
+                break
+        else:
+            raise ValueError(f"No section heading matches {section!r}")
+
+    offset = max(0, offset)
+    if max_chars is None:
+        return text[offset:]
+    end = offset + max(0, max_chars)
+    selected = text[offset:end]
+    if end < len(text):
+        selected += (
+            f"\n\n[... {len(text) - end} more characters, "
+            f"continue with offset={end} ...]"
+        )
+    return selected
+
+
+async def adownload_webpage(url: str, timeout: float | tuple[float, float] | None = None,
+                            max_bytes: int | None = None) -> str:
+    """
+    Async version of download_webpage(), run in the download thread pool.
+
+    Args:
+        url: The URL of the web page to download
+        timeout: Passed to download_webpage()
+        max_bytes: Passed to download_webpage()
+
+    Returns:
+        The content of the web page as a string
+    """
+    return (await _afetch_webpage(url, timeout, max_bytes))[0]
+
+
+async def _afetch_webpage(url: str, timeout: float | tuple[float, float] | None = None,
+                          max_bytes: int | None = None) -> tuple[str, int | None]:
+    """Async version of _fetch_webpage(), run in the download thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, partial(_fetch_webpage, url, timeout, max_bytes=max_bytes)
+    )
+
+
+def unique_urls(urls: list[str]) -> list[str]:
+    """
+    Drop repeated URLs, comparing them in normalized form.
+
+    Args:
+        urls: The URLs to download
+
+    Returns:
+        The first spelling of each distinct URL, in the original order
+    """
+    seen = set()
+    unique = []
+    for url in urls:
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+class _HostLimiter:
+    """Limits the concurrent requests and the request rate for each host."""
+
+    def __init__(self, concurrency: int, interval: float):
+        self._concurrency = concurrency
+        self._interval = interval
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self._concurrency))
+        async with semaphore:
+            if self._interval > 0:
+                async with self._locks.setdefault(host, asyncio.Lock()):
+                    delay = self._next_start.get(host, 0) - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    self._next_start[host] = time.monotonic() + self._interval
+            yield
+
+
+async def iter_download_webpages(
+    urls: list[str],
+    max_concurrency: int | None = None,
+    per_host: int | None = None,
+    host_interval: float | None = None,
+    timeout: float | tuple[float, float] | None = None,
+    max_bytes: int | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Download several web pages concurrently, yielding each result as it completes.
+
+    Repeated URLs are downloaded once. At most max_concurrency downloads
+    run at a time, at most per_host of them for the same site, and
+    requests for one site start at least host_interval seconds apart.
+    These limits apply to this call: concurrent calls each have their own.
+
+    Args:
+        urls: The URLs of the web pages to download
+        max_concurrency: Concurrent downloads (default: MAX_CONCURRENCY)
+        per_host: Concurrent downloads per site (default: PER_HOST_CONCURRENCY)
+        host_interval: Seconds between requests to one site
+            (default: PER_HOST_INTERVAL)
+        timeout: Passed to download_webpage()
+        max_bytes: Passed to download_webpage()
+
+    Yields:
+        One dictionary per distinct URL with "url", "status" ("ok" or
+        "error"), "content", "error", "http_status" (None when no response
+        was received, including pages served from the page cache) and
+        "elapsed_ms"
+    """
+    if max_concurrency is None:
+        max_concurrency = MAX_CONCURRENCY
+    semaphore = asyncio.Semaphore(min(max(1, max_concurrency), POOL_SIZE))
+    limiter = _HostLimiter(
+        max(1, per_host if per_host is not None else PER_HOST_CONCURRENCY),
+        host_interval if host_interval is not None else PER_HOST_INTERVAL,
+    )
+
+    async def fetch(url: str) -> dict:
+        result = {"url": url, "status": "ok", "content": None, "error": None,
+                  "http_status": None, "elapsed_ms": 0.0}
+        # Wait for the site first, so a download queued behind a busy site
+        # does not hold one of the global slots.
+        async with limiter.slot(urlsplit(url).hostname or ""), semaphore:
+            start = time.perf_counter()
+            try:
+                result["content"], result["http_status"] = await _afetch_webpage(
+                    url, timeout, max_bytes
+                )
+            except requests.RequestException as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+                if e.response is not None:
+                    result["http_status"] = e.response.status_code
+            except Exception as e:
+                # Any other failure (decoding, the page cache, ...) is
+                # reported for this URL instead of ending the batch.
+                result["status"] = "error"
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    tasks = [asyncio.create_task(fetch(url)) for url in unique_urls(urls)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def download_webpages(urls: list[str], **kwargs) -> list[dict]:
+    """
+    Download several web pages concurrently.
+
+    Args:
+        urls: The URLs of the web pages to download
+        **kwargs: Limits passed to iter_download_webpages()
+
+    Returns:
+        One result dictionary per distinct URL, in the order of urls
+    """
+    async def collect():
+        return {result["url"]: result async for result in iter_download_webpages(urls, **kwargs)}
 
+    results = asyncio.run(collect())
+    return [results[url] for url in unique_urls(urls)]
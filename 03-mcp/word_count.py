@@ -0,0 +1,172 @@
+"""Count word frequencies in text that arrives in chunks."""
+
+import re
+from collections import Counter
+from typing import Iterable, Iterator
+
+# A word is a run of letters, digits and underscores, so "big-data" holds
+# the word "data" but "database" does not.
+WORD_PATTERN = re.compile(r"\w+")
+
+WORD = "word"
+SUBSTRING = "substring"
+
+
+def iter_chunks(text: str, size: int = 1024 * 1024) -> Iterator[str]:
+    """
+    Split a string into chunks of at most size characters.
+
+    Args:
+        text: The text to split
+        size: Characters per chunk
+
+    Yields:
+        Consecutive slices of text
+    """
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+class WordCounter:
+    """
+    Counts words over a stream of text chunks in a single pass.
+
+    In "word" mode each chunk is tokenized once and every token is counted,
+    so any number of target words (or the whole vocabulary) costs the same.
+    In "substring" mode each target is counted wherever it appears, like
+    str.count, including inside longer words. Words and substrings cut by a
+    chunk boundary are counted once.
+    """
+
+    def __init__(self, words: Iterable[str] | None = None, mode: str = WORD,
+                 case_sensitive: bool = False):
+        """
+        Args:
+            words: The words to count (default: every word, "word" mode only)
+            mode: "word" for whole words or "substring" for any occurrence
+            case_sensitive: Count "Data" and "data" separately
+
+        Raises:
+            ValueError: For an unknown mode, or "substring" mode without words
+        """
+        if mode not in (WORD, SUBSTRING):
+            raise ValueError(f"mode must be {WORD!r} or {SUBSTRING!r}, got {mode!r}")
+        self.mode = mode
+        self.case_sensitive = case_sensitive
+        self.words = None
+        if words is not None:
+            self.words = list(dict.fromkeys(self._fold(word) for word in words if word))
+        if mode == SUBSTRING and not self.words:
+            raise ValueError("substring mode needs at least one word to count")
+
+        self.total_words = 0
+        self._counts = Counter()
+        # Text held back from the previous chunk: the last, possibly
+        # incomplete word, or the overlap a substring could span.
+        self._carry = ""
+        # Substring mode: absolute offset of self._carry and, per word, the
+        # offset where the next non-overlapping match may start.
+        self._carry_start = 0
+        self._next_start = dict.fromkeys(self.words or (), 0)
+        # Words like "aa" can overlap themselves, so their last match is not
+        # simply the last occurrence and has to be found by scanning.
+        self._self_overlapping = {
+            word for word in self.words or ()
+            if any(word[:k] == word[-k:] for k in range(1, len(word)))
+        }
+
+    def _fold(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def feed(self, chunk: str) -> None:
+        """
+        Count the words in the next chunk of text.
+
+        Args:
+            chunk: The next piece of the text
+        """
+        if not chunk:
+            return
+        text = self._carry + self._fold(chunk)
+        if self.mode == WORD:
+            self._feed_words(text)
+        else:
+            self._feed_substrings(text)
+
+    def _feed_words(self, text: str) -> None:
+        # The last word may continue in the next chunk, so it is held back.
+        end = len(text)
+        while end > 0 and WORD_PATTERN.match(text, end - 1, end):
+            end -= 1
+        self._count_tokens(WORD_PATTERN.findall(text, 0, end))
+        self._carry = text[end:]
+
+    def _count_tokens(self, tokens: list[str]) -> None:
+        self.total_words += len(tokens)
+        self._counts.update(tokens)
+
+    def _feed_substrings(self, text: str) -> None:
+        base = self._carry_start
+        for word in self.words:
+            position = max(0, self._next_start[word] - base)
+            if word in self._self_overlapping:
+                count = 0
+                while (position := text.find(word, position)) != -1:
+                    count += 1
+                    position += len(word)
+                    self._next_start[word] = base + position
+            else:
+                count = text.count(word, position)
+                if count:
+                    self._next_start[word] = base + text.rfind(word) + len(word)
+            self._counts[word] += count
+        keep = max(len(word) for word in self.words) - 1
+        self._carry = text[max(0, len(text) - keep):] if keep else ""
+        self._carry_start = base + len(text) - len(self._carry)
+
+    def finish(self) -> None:
+        """Count the text held back at the end of the stream."""
+        if self.mode == WORD and self._carry:
+            self._count_tokens(WORD_PATTERN.findall(self._carry))
+        self._carry = ""
+
+    def counts(self) -> dict[str, int]:
+        """
+        Return the counts so far.
+
+        Returns:
+            The count of each target word (including zeros), or of every
+            word seen when no targets were given
+        """
+        if self.words is None:
+            return dict(self._counts)
+        return {word: self._counts[word] for word in self.words}
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        """Return the n most frequent words and their counts."""
+        if self.words is None:
+            return self._counts.most_common(n)
+        return Counter(self.counts()).most_common(n)
+
+
+def count_words(chunks: Iterable[str] | str, words: Iterable[str] | None = None,
+                mode: str = WORD, case_sensitive: bool = False) -> dict[str, int]:
+    """
+    Count words in a text, or in a stream of chunks of it, in one pass.
+
+    Args:
+        chunks: The text, or an iterable of consecutive pieces of it
+        words: The words to count (default: every word)
+        mode: "word" for whole words or "substring" for any occurrence
+        case_sensitive: Count "Data" and "data" separately
+
+    Returns:
+        A dictionary mapping each word to its count
+    """
+    if isinstance(chunks, str):
+        chunks = iter_chunks(chunks)
+    counter = WordCounter(words, mode, case_sensitive)
+    for chunk in chunks:
+        counter.feed(chunk)
+    counter.finish()
+    return counter.counts()